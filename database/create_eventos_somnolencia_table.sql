@@ -0,0 +1,49 @@
+-- ============================================
+-- SCRIPT PARA CREAR SOLO LA TABLA EVENTOS_SOMNOLENCIA
+-- Ejecutar este archivo si las demás tablas ya existen (requiere usuarios y viajes)
+-- ============================================
+
+-- Eliminar tabla si existe (para re-crear limpia)
+DROP TABLE IF EXISTS eventos_somnolencia CASCADE;
+
+-- Crear tabla eventos_somnolencia
+CREATE TABLE eventos_somnolencia (
+    id_evento BIGSERIAL PRIMARY KEY,
+    
+    -- Relaciones (el viaje es opcional: el chofer puede monitorearse sin viaje en curso)
+    id_chofer INTEGER NOT NULL REFERENCES usuarios(id_usuario) ON DELETE CASCADE,
+    id_viaje INTEGER REFERENCES viajes(id_viaje) ON DELETE SET NULL,
+    
+    -- Sesión de monitoreo (WebSocket) que detectó el evento
+    id_sesion VARCHAR(32) NOT NULL,
+    
+    -- Información del evento
+    tipo VARCHAR(20) NOT NULL,
+    marca_tiempo TIMESTAMP WITH TIME ZONE NOT NULL,
+    conteo INTEGER NOT NULL DEFAULT 1,
+    duracion_segundos DECIMAL(6, 2),
+    
+    fecha_registro TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    
+    CONSTRAINT chk_evento_tipo CHECK (tipo IN ('microsueno', 'inclinacion', 'bostezo', 'parpadeo', 'frotamiento_ojos'))
+);
+
+-- Índices para consultar el historial por viaje y por chofer en orden temporal
+CREATE INDEX idx_eventos_somnolencia_viaje_tiempo ON eventos_somnolencia(id_viaje, marca_tiempo);
+CREATE INDEX idx_eventos_somnolencia_chofer_tiempo ON eventos_somnolencia(id_chofer, marca_tiempo);
+
+-- Comentario descriptivo
+COMMENT ON TABLE eventos_somnolencia IS 'Eventos de somnolencia del monitoreo en tiempo real por chofer y viaje (insertados por lotes)';
+COMMENT ON COLUMN eventos_somnolencia.conteo IS 'Número del evento: en la sesión (microsueno/inclinacion) o en la ventana del detector (bostezo/parpadeo/frotamiento_ojos); un registro por evento';
+
+-- Verificar que se creó correctamente
+SELECT 
+    table_name, 
+    (SELECT COUNT(*) FROM information_schema.columns WHERE table_name = 'eventos_somnolencia') as columnas
+FROM information_schema.tables 
+WHERE table_name = 'eventos_somnolencia';
+
+-- Mensaje de confirmación
+SELECT 'Tabla eventos_somnolencia creada exitosamente' as mensaje;
+SELECT 'Total de columnas: 9' as info;
+SELECT 'Indices creados: 2 (viaje + tiempo, chofer + tiempo)' as info;
@@ -292,6 +292,31 @@ CREATE TABLE viajes (
     )
 );
 
+-- ============================================
+-- 10. TABLA: eventos_somnolencia
+-- Eventos del monitoreo en tiempo real por chofer y viaje
+-- ============================================
+CREATE TABLE eventos_somnolencia (
+    id_evento BIGSERIAL PRIMARY KEY,
+    
+    -- Relaciones (el viaje es opcional: el chofer puede monitorearse sin viaje en curso)
+    id_chofer INTEGER NOT NULL REFERENCES usuarios(id_usuario) ON DELETE CASCADE,
+    id_viaje INTEGER REFERENCES viajes(id_viaje) ON DELETE SET NULL,
+    
+    -- Sesión de monitoreo (WebSocket) que detectó el evento
+    id_sesion VARCHAR(32) NOT NULL,
+    
+    -- Información del evento
+    tipo VARCHAR(20) NOT NULL,
+    marca_tiempo TIMESTAMP WITH TIME ZONE NOT NULL,
+    conteo INTEGER NOT NULL DEFAULT 1,
+    duracion_segundos DECIMAL(6, 2),
+    
+    fecha_registro TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    
+    CONSTRAINT chk_evento_tipo CHECK (tipo IN ('microsueno', 'inclinacion', 'bostezo', 'parpadeo', 'frotamiento_ojos'))
+);
+
 -- ============================================
 -- ÍNDICES PARA OPTIMIZACIÓN
 -- ============================================
@@ -337,6 +362,10 @@ CREATE INDEX idx_viajes_fecha_asignacion ON viajes(fecha_asignacion DESC);
 CREATE INDEX idx_viajes_origen ON viajes(origen);
 CREATE INDEX idx_viajes_destino ON viajes(destino);
 
+-- Índices en eventos_somnolencia (historial por viaje y por chofer)
+CREATE INDEX idx_eventos_somnolencia_viaje_tiempo ON eventos_somnolencia(id_viaje, marca_tiempo);
+CREATE INDEX idx_eventos_somnolencia_chofer_tiempo ON eventos_somnolencia(id_chofer, marca_tiempo);
+
 -- ============================================
 -- COMENTARIOS EN TABLAS
 -- ============================================
@@ -350,6 +379,7 @@ COMMENT ON TABLE ubicaciones_gps IS 'Tracking GPS durante las sesiones de viaje'
 COMMENT ON TABLE configuracion_usuario IS 'Configuraciones personalizadas por chofer';
 COMMENT ON TABLE reportes IS 'Metadata de reportes PDF/CSV generados';
 COMMENT ON TABLE viajes IS 'Asignación de viajes/rutas a choferes con información de origen y destino';
+COMMENT ON TABLE eventos_somnolencia IS 'Eventos de somnolencia del monitoreo en tiempo real por chofer y viaje (insertados por lotes)';
 
 -- ============================================
 -- DATOS INICIALES
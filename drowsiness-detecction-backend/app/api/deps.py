@@ -1,8 +1,10 @@
+import logging
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.db.session import get_db
 from app.models.user import Usuario
@@ -10,6 +12,8 @@ from app.core.security import decode_token, verify_token_type
 from app.crud.user import user as user_crud
 from app.crud.token_blacklist import token_blacklist
 
+logger = logging.getLogger(__name__)
+
 # OAuth2 scheme para extraer el token del header Authorization
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="/api/v1/auth/login",
@@ -157,4 +161,49 @@ def get_current_token(token: str = Depends(oauth2_scheme)) -> str:
     Returns:
         Token JWT
     """
-    return token
\ No newline at end of file
+    return token
+
+
+def _chofer_activo(db: Session, token: str, id_usuario: int) -> Optional[int]:
+    # mismas comprobaciones que get_current_user: token no invalidado y usuario activo, aquí además chofer
+    if token_blacklist.is_blacklisted(db, token=token):
+        return None
+    usuario = db.query(Usuario).filter(Usuario.id_usuario == id_usuario).first()
+    if usuario is None or not usuario.is_chofer or not user_crud.is_active(usuario):
+        return None
+    return id_usuario
+
+
+async def get_websocket_user_id(
+    token: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+) -> Optional[int]:
+    """
+    Dependency para identificar al chofer de un WebSocket de monitoreo
+
+    El cliente envía su access token en ``?token=``. El monitoreo no lo
+    exige: la sesión es anónima sin token, con uno inválido o invalidado
+    (blacklist), o si el usuario no es un chofer activo, porque el id se
+    usa como clave de los eventos de somnolencia. Las consultas corren
+    fuera del event loop; si la BD no responde la sesión sigue anónima.
+
+    Args:
+        token: JWT token del query param
+        db: Sesión de BD
+
+    Returns:
+        id_usuario del chofer o None
+    """
+    if not token:
+        return None
+    try:
+        payload = decode_token(token)
+        verify_token_type(payload, "access")
+        id_usuario = int(payload["sub"])
+    except (HTTPException, KeyError, TypeError, ValueError):
+        return None
+    try:
+        return await run_in_threadpool(_chofer_activo, db, token, id_usuario)
+    except Exception as e:
+        logger.warning(f"No se pudo verificar el token del monitoreo: {str(e).splitlines()[0]}")
+        return None
@@ -1,12 +1,19 @@
-import cv2
-import base64
 import logging
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
+from typing import Optional
+from fastapi import APIRouter, WebSocket, Depends, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_current_user, get_websocket_user_id
 from app.models.user import Usuario
-from app.drowsiness_processor.main import SistemaDeteccionSomnolencia
+from app.crud.viaje import viaje as viaje_crud
+from app.services.monitoring_protocol import negociar_protocolo, validar_perfil, validar_modo_reporte, PERFIL_REPORTE
+from app.services.monitoring_executor import obtener_ejecutor
+from app.services.monitoring_session import SesionMonitoreo, SesionLandmarks
+from app.services.monitoring_metrics import registro_metricas
+from app.services.monitoring_admission import control_admision
+from app.services.monitoring_quality import controlador_nodo
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,9 +21,37 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+async def obtener_viaje_en_curso(db: Session, id_chofer: Optional[int]) -> Optional[int]:
+    """
+    Viaje en curso del chofer, al que se asocian los eventos de la sesión
+    
+    La consulta corre fuera del event loop. Si la BD no responde la sesión
+    sigue sin viaje: el monitoreo no depende de ella.
+    
+    Args:
+        db: Sesión de BD
+        id_chofer: ID del chofer (None: sesión anónima)
+        
+    Returns:
+        id_viaje o None
+    """
+    if id_chofer is None:
+        return None
+    try:
+        viaje = await run_in_threadpool(viaje_crud.get_viaje_en_curso_chofer, db, id_chofer=id_chofer)
+    except Exception as e:
+        logger.warning(f"No se pudo obtener el viaje en curso del chofer {id_chofer}: {str(e).splitlines()[0]}")
+        return None
+    return viaje.id_viaje if viaje is not None else None
+
+
 @router.websocket("/ws")
 async def punto_final_websocket_monitoreo(
     websocket: WebSocket,
+    protocolo: Optional[str] = Query(None),
+    perfil: Optional[str] = Query(None),
+    reporte: Optional[str] = Query(None),
+    id_chofer: Optional[int] = Depends(get_websocket_user_id),
     db: Session = Depends(get_db)
 ):
     """
@@ -24,67 +59,117 @@ async def punto_final_websocket_monitoreo(
     
     Flujo:
     1. Cliente se conecta
-    2. Cliente envía cuadros de video en base64
-    3. Servidor procesa con SistemaDeteccionSomnolencia
-    4. Servidor retorna: imagen_original, imagen_bosquejo, reporte_json
-    """
+    2. Cliente envía cuadros de video
+    3. Servidor procesa con SistemaDeteccionSomnolencia en el ejecutor
+       de monitoreo (hilos o procesos, ver MONITORING_EXECUTOR)
+    4. Servidor retorna: reporte_json, alarma y las imágenes del perfil
+    
+    Envío del reporte (``?reporte=``):
+    - delta (por defecto): reporte completo en el primer mensaje
+      ("tipo": "instantanea") y después solo las secciones que cambian
+      ("tipo": "delta"); sin cambios ni imágenes solo un "keepalive"
+      periódico. ``{"instantanea": true}`` pide de nuevo el completo.
+    - completo: reporte completo y alarma en cada cuadro
+    
+    Protocolos (``?protocolo=`` o subprotocolo ``somnolencia.binario.v1``):
+    - base64 (por defecto): cuadros JPEG en base64 como texto,
+      respuesta JSON con las imágenes en base64
+    - binario: cuadros JPEG crudos como mensajes binarios, respuesta en
+      un sobre binario (ver app/services/monitoring_protocol.py)
     
-    # Inicializar sistema de detección
-    sistema_deteccion_somnolencia = SistemaDeteccionSomnolencia()
+    Marca de tiempo de captura (opcional, reloj de los detectores):
+    - binario: prefijo 0x01 + milisegundos epoch (float64) antes del JPEG
+    - texto: {"cuadro": "<base64>", "marca_tiempo": <ms epoch>}
+    Sin ella se usa la hora de recepción del cuadro.
     
-    await websocket.accept()
-    logger.info("Cliente WebSocket conectado al sistema de monitoreo")
+    Perfiles de respuesta (``?perfil=`` o mensaje de control
+    ``{"perfil": "..."}`` durante la sesión):
+    - reporte: solo reporte_json y alarma (sin codificar imágenes)
+    - bosquejo: reporte + imagen_bosquejo
+    - completo (por defecto): reporte + imagen_bosquejo + imagen_original
+    - vectorial: reporte + puntos de la malla y las manos en int16 y el
+      estado de las advertencias (overlay); el cliente dibuja el bosquejo
     
-    conteo_cuadros = 0
+    Con ``?token=<access token>`` los eventos de somnolencia de la sesión
+    se registran con el id del conductor y su viaje en curso (ver
+    MONITORING_EVENT_SINKS y la tabla eventos_somnolencia).
+    """
     
     try:
-        while True:
-            # Recibir cuadro del cliente
-            datos = await websocket.receive_text()
-            
-            try:
-                # Procesar cuadro con el sistema de detección
-                imagen_original, bosquejo, reporte_json = sistema_deteccion_somnolencia.ejecutar(datos)
-                
-                # Configurar compresión JPEG (80% calidad)
-                parametro_codificacion = [int(cv2.IMWRITE_JPEG_QUALITY), 80]
-                
-                # Codificar bosquejo a base64
-                _, buffer_bosquejo = cv2.imencode('.jpg', bosquejo, parametro_codificacion)
-                bosquejo_base64 = base64.b64encode(buffer_bosquejo).decode('utf-8')
-                
-                # Codificar imagen original a base64
-                _, buffer_imagen_original = cv2.imencode('.jpg', imagen_original, parametro_codificacion)
-                imagen_original_base64 = base64.b64encode(buffer_imagen_original).decode('utf-8')
-                
-                # Enviar respuesta al cliente
-                await websocket.send_json({
-                    "reporte_json": reporte_json,
-                    "imagen_bosquejo": bosquejo_base64,
-                    "imagen_original": imagen_original_base64,
-                })
-                
-                # Logging cada 30 cuadros
-                conteo_cuadros += 1
-                if conteo_cuadros % 30 == 0:
-                    logger.info(f"Cuadros procesados: {conteo_cuadros}")
-                    
-            except Exception as e:
-                logger.error(f"Error al procesar cuadro: {str(e)}", exc_info=True)
-                # Enviar error al cliente pero mantener conexión
-                await websocket.send_json({
-                    "error": str(e),
-                    "reporte_json": {},
-                    "imagen_bosquejo": "",
-                    "imagen_original": "",
-                })
+        protocolo, subprotocolo = negociar_protocolo(websocket, protocolo)
+        perfil = validar_perfil(perfil)
+        reporte = validar_modo_reporte(reporte)
+    except ValueError as e:
+        logger.warning(str(e))
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA, reason=str(e))
+        return
+    
+    await websocket.accept(subprotocol=subprotocolo)
+    logger.info(
+        f"Cliente WebSocket conectado al sistema de monitoreo "
+        f"(protocolo: {protocolo}, perfil: {perfil}, reporte: {reporte})"
+    )
+    
+    id_viaje = await obtener_viaje_en_curso(db, id_chofer)
     
-    except WebSocketDisconnect:
+    try:
+        # Procesamiento en el ejecutor compartido para no bloquear el event loop
+        await SesionMonitoreo(
+            websocket, protocolo, obtener_ejecutor(), perfil, id_chofer, id_viaje, reporte
+        ).ejecutar()
         logger.info("Cliente WebSocket desconectado del sistema de monitoreo")
     except Exception as e:
         logger.error(f"Error en WebSocket de monitoreo: {str(e)}", exc_info=True)
 
 
+@router.websocket("/ws/landmarks")
+async def punto_final_websocket_landmarks(
+    websocket: WebSocket,
+    protocolo: Optional[str] = Query(None),
+    reporte: Optional[str] = Query(None),
+    id_chofer: Optional[int] = Depends(get_websocket_user_id),
+    db: Session = Depends(get_db)
+):
+    """
+    Endpoint WebSocket para monitoreo con landmarks calculados en el cliente
+
+    Para dispositivos que ejecutan el seguimiento de rostro y manos: el
+    cliente envía la malla facial (478 puntos) y las manos (21 puntos cada
+    una) en píxeles con su marca de tiempo, y el servidor ejecuta solo
+    mediciones, características y reportes (sin imagen ni MediaPipe).
+
+    Mensajes (ver app/services/monitoring_protocol.py):
+    - binario: sobre con los segmentos malla_rostro / manos en int16 y
+      metadatos {"marca_tiempo": <ms epoch>}
+    - texto: {"malla_rostro": [[x, y], ...], "manos": [...], "marca_tiempo": <ms epoch>}
+    Una malla vacía indica que no se detectó rostro.
+
+    Respuesta: reporte_json y alarma (sobre binario con
+    ``protocolo=binario``, JSON en otro caso), con el mismo envío por
+    deltas que /ws (``?reporte=delta|completo``).
+    """
+    try:
+        protocolo, subprotocolo = negociar_protocolo(websocket, protocolo)
+        reporte = validar_modo_reporte(reporte)
+    except ValueError as e:
+        logger.warning(str(e))
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA, reason=str(e))
+        return
+
+    await websocket.accept(subprotocol=subprotocolo)
+    logger.info(f"Cliente de landmarks conectado al sistema de monitoreo (protocolo: {protocolo}, reporte: {reporte})")
+
+    id_viaje = await obtener_viaje_en_curso(db, id_chofer)
+
+    try:
+        await SesionLandmarks(
+            websocket, protocolo, obtener_ejecutor(), PERFIL_REPORTE, id_chofer, id_viaje, reporte
+        ).ejecutar()
+        logger.info("Cliente de landmarks desconectado del sistema de monitoreo")
+    except Exception as e:
+        logger.error(f"Error en WebSocket de landmarks: {str(e)}", exc_info=True)
+
+
 @router.get("/status")
 async def estado_monitoreo(
     usuario_actual: Usuario = Depends(get_current_user)
@@ -93,10 +178,58 @@ async def estado_monitoreo(
     Endpoint para verificar el estado del sistema de monitoreo
     
     Requiere autenticación
+    
+    Incluye el uso y la memoria de los pools de motores de inferencia
+    (uno por proceso trabajador).
     """
+    ejecutor = obtener_ejecutor()
     return {
         "estado": "operacional",
         "usuario": usuario_actual.usuario,
         "rol": usuario_actual.rol,
-        "mensaje": "Sistema de monitoreo disponible"
-    }
\ No newline at end of file
+        "mensaje": "Sistema de monitoreo disponible",
+        "sesiones_activas": ejecutor.sesiones_activas,
+        "pools_inferencia": await ejecutor.estadisticas()
+    }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metricas_monitoreo():
+    """
+    Métricas del monitoreo en formato de texto Prometheus
+
+    Sin autenticación, para el scraper. Contadores de cuadros recibidos,
+    procesados, descartados, con error y sin rostro; bytes enviados;
+    sesiones activas e histogramas de latencia por etapa (decodificación,
+    extracción, ..., codificación y el cuadro completo); núcleos
+    reservados y sesiones rechazadas por el control de admisión.
+
+    Los valores son del proceso que atiende la petición: con varios
+    procesos de uvicorn cada uno expone los suyos.
+    """
+    return PlainTextResponse(
+        registro_metricas.exponer() + control_admision.exponer(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@router.get("/ready")
+async def preparacion_monitoreo():
+    """
+    Endpoint de preparación para el balanceador de carga
+
+    Sin autenticación. Responde 200 si el proceso puede admitir al menos
+    una sesión de cuadros más dentro de su presupuesto de CPU y de los
+    motores de inferencia libres, y 503 (con ``Retry-After``) si está
+    lleno; el cuerpo incluye la capacidad en núcleos y motores, las
+    sesiones disponibles y el nivel de calidad del nodo.
+    """
+    estado = control_admision.estado()
+    estado["nivel_calidad_nodo"] = controlador_nodo.nivel if controlador_nodo is not None else 0
+    if estado["listo"]:
+        return estado
+    return JSONResponse(
+        estado,
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(control_admision.sugerir_reintento())}
+    )
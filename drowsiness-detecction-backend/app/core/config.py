@@ -54,6 +54,37 @@ class Settings(BaseSettings):
     EMAIL_FROM_NAME: str = "Sistema Detección Somnolencia"
     EMAIL_FROM_ADDRESS: str = ""  # Se configurará en .env
     
+    # Monitoreo en tiempo real (WebSocket)
+    MONITORING_EXECUTOR: str = "thread"    # "thread" o "process"
+    MONITORING_MAX_WORKERS: int = 4        # Hilos/procesos de inferencia
+    MONITORING_MAILBOX_SLOTS: int = 1      # Cuadros en espera por sesión (se descartan los viejos)
+    MONITORING_JPEG_QUALITY: int = 80
+    MONITORING_INFERENCE_POOL_SIZE: int = 8        # Motores MediaPipe por proceso
+    MONITORING_INFERENCE_CHECKOUT: str = "sesion"  # "sesion" o "cuadro"
+    MONITORING_INFERENCE_POOL_TIMEOUT: float = 5.0 # Segundos de espera por un motor libre (préstamo por cuadro)
+    MONITORING_EYE_RUB_ENABLED: bool = True        # Sin frotamiento de ojos no se ejecuta la inferencia de manos
+    MONITORING_HANDS_INTERVAL: int = 5             # Sin manos visibles, inferir manos cada N cuadros
+    MONITORING_HANDS_MOTION_THRESHOLD: float = 8.0 # Movimiento en la zona de los ojos que adelanta la inferencia
+    MONITORING_PARALLEL_HANDS: bool = True         # Inferir manos en otro hilo mientras se infiere el rostro
+    MONITORING_FACE_ROI_ENABLED: bool = True       # Inferir sobre un recorte alrededor del último rostro
+    MONITORING_FACE_ROI_MARGIN: float = 0.75       # Margen del recorte por lado, en fracción del tamaño del rostro
+    MONITORING_MAX_FRAME_SIZE: int = 640           # Lado mayor de la imagen procesada (0: sin reducir)
+    MONITORING_QUALITY_ADAPTIVE: bool = True       # Bajar la calidad del pipeline cuando crece la latencia
+    MONITORING_QUALITY_TARGET_MS: float = 150.0    # Latencia por cuadro que dispara la bajada de calidad
+    MONITORING_CPU_CORES: float = 0.0              # Núcleos para sesiones de este proceso (0: los del sistema)
+    MONITORING_SESSION_CPU_BUDGET: float = 0.25    # Núcleos reservados por sesión de cuadros
+    MONITORING_LANDMARKS_CPU_BUDGET: float = 0.02  # Núcleos reservados por sesión de landmarks
+    MONITORING_RETRY_AFTER_SECONDS: float = 5.0    # Espera base sugerida a las sesiones rechazadas
+    MONITORING_EVENT_SINKS: str = "csv,db"         # Destinos de los eventos separados por comas: csv, ndjson, db ("": ninguno)
+    MONITORING_EVENTS_DIR: str = "app/drowsiness_processor/reports/eventos"
+    MONITORING_EVENTS_BATCH_SIZE: int = 200        # Filas por escritura
+    MONITORING_EVENTS_FLUSH_SECONDS: float = 2.0   # Espera máxima de una fila antes de escribirse
+    MONITORING_EVENTS_QUEUE_SIZE: int = 10000      # Filas en cola; con la cola llena se descartan
+    MONITORING_EVENTS_MAX_FILE_MB: float = 50.0    # Tamaño al que se rota cada archivo (0: sin rotar)
+    MONITORING_EVENTS_BACKUPS: int = 5             # Archivos rotados que se conservan
+    MONITORING_REPORT_KEEPALIVE_SECONDS: float = 5.0    # Modo delta: mensaje mínimo si no hubo nada que enviar
+    MONITORING_REPORT_COUNTDOWN_BUCKET_SECONDS: float = 10.0  # Modo delta: resolución de las cuentas atrás enviadas
+
     # Configuración de la aplicación
     DEBUG: bool = True
     ENVIRONMENT: str = "development"
@@ -402,6 +402,29 @@ class CRUDViaje(CRUDBase[Viaje, ViajeCreate, ViajeUpdate]):
                 )
             )
         ).order_by(Viaje.fecha_asignacion.desc()).all()
+    
+    def get_viaje_en_curso_chofer(
+        self,
+        db: Session,
+        *,
+        id_chofer: int
+    ) -> Optional[Viaje]:
+        """
+        Obtener el viaje en curso de un chofer (el más reciente si hay varios)
+        
+        Args:
+            db: Sesión de BD
+            id_chofer: ID del chofer
+            
+        Returns:
+            Viaje en curso o None
+        """
+        return db.query(Viaje).filter(
+            and_(
+                Viaje.id_chofer == id_chofer,
+                Viaje.estado == "en_curso"
+            )
+        ).order_by(Viaje.fecha_inicio.desc()).first()
 
 
 # Instancia global de CRUD para viajes
@@ -0,0 +1,193 @@
+"""
+Procesamiento por lotes de videos grabados
+
+Pasa cada cuadro de los videos por SistemaDeteccionSomnolencia.procesamiento_cuadro
+sin dibujar el bosquejo, repartiendo los archivos entre un pool de procesos
+(un sistema y un motor MediaPipe por archivo). El reloj de los detectores es
+el del video (CAP_PROP_POS_MSEC) desplazado a la hora de inicio de la
+grabación, así que las duraciones no dependen de la velocidad de proceso.
+
+Por cada video se escribe en --salida:
+    <video>.csv   filas de ReportesSomnolencia (columnas del monitoreo sin id_sesion ni id_chofer)
+    <video>.json  último reporte (generar_reporte) y estadísticas del archivo
+
+El .json se escribe al terminar el archivo y marca el video como completo:
+al relanzar el mismo comando se saltan los completos y los interrumpidos
+vuelven a empezar desde el principio (el estado de los detectores no se
+puede reanudar a mitad de un video).
+
+Uso (desde drowsiness-detecction-backend):
+    python -m app.drowsiness_processor.batch videos/ --salida resultados/ [--procesos 4]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import logging as log
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional, Tuple
+
+import cv2
+
+from app.drowsiness_processor.main import SistemaDeteccionSomnolencia
+from app.drowsiness_processor.extract_points.hands.hands_scheduler import PlanificadorManos
+
+
+log.basicConfig(level=log.INFO)
+logger = log.getLogger(__name__)
+
+EXTENSIONES_VIDEO = ('.mp4', '.avi', '.mov', '.mkv', '.m4v', '.webm')
+SUFIJO_PARCIAL = '.parcial'
+
+
+def buscar_videos(entradas: List[str]) -> List[Tuple[str, str]]:
+    # (ruta del video, nombre relativo para la salida); los directorios se recorren completos
+    videos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            for raiz, _, archivos in os.walk(entrada):
+                for archivo in sorted(archivos):
+                    if archivo.lower().endswith(EXTENSIONES_VIDEO):
+                        ruta = os.path.join(raiz, archivo)
+                        videos.append((ruta, os.path.relpath(ruta, entrada)))
+        elif os.path.isfile(entrada):
+            videos.append((entrada, os.path.basename(entrada)))
+        else:
+            logger.warning(f'Entrada no encontrada: {entrada}')
+    return sorted(videos, key=lambda video: video[1])
+
+
+def rutas_salida(salida: str, nombre_relativo: str) -> Tuple[str, str]:
+    base = os.path.join(salida, os.path.splitext(nombre_relativo)[0])
+    return base + '.csv', base + '.json'
+
+
+def escribir_json(ruta: str, contenido: dict):
+    # escritura atómica: un resumen a medio escribir no debe contar como completo
+    temporal = ruta + SUFIJO_PARCIAL
+    with open(temporal, 'w') as archivo:
+        json.dump(contenido, archivo, indent=2, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+def inicio_grabacion(ruta: str, captura: cv2.VideoCapture) -> float:
+    # sin metadatos fiables se toma la hora de modificación (fin de la grabación) menos la duración
+    fps = captura.get(cv2.CAP_PROP_FPS)
+    cuadros = captura.get(cv2.CAP_PROP_FRAME_COUNT)
+    duracion = cuadros / fps if fps > 0 and cuadros > 0 else 0.0
+    return os.path.getmtime(ruta) - duracion
+
+
+def procesar_video(ruta: str, nombre_relativo: str, salida: str, inicio: Optional[float] = None,
+                   intervalo_manos: int = 1, frotamiento_ojos: bool = True, lado_maximo: int = 0) -> dict:
+    ruta_csv, ruta_json = rutas_salida(salida, nombre_relativo)
+    os.makedirs(os.path.dirname(ruta_csv) or '.', exist_ok=True)
+    ruta_csv_parcial = ruta_csv + SUFIJO_PARCIAL
+    if os.path.exists(ruta_csv_parcial):
+        os.remove(ruta_csv_parcial)
+
+    captura = cv2.VideoCapture(ruta)
+    if not captura.isOpened():
+        raise ValueError(f'No se pudo abrir el video: {ruta}')
+    try:
+        fps_video = captura.get(cv2.CAP_PROP_FPS)
+        inicio = inicio_grabacion(ruta, captura) if inicio is None else inicio
+        planificador_manos = PlanificadorManos(intervalo=intervalo_manos, habilitado=frotamiento_ojos)
+        sistema = SistemaDeteccionSomnolencia(archivo_reporte=ruta_csv_parcial, planificador_manos=planificador_manos,
+                                              lado_maximo=lado_maximo)
+
+        cuadros = cuadros_con_rostro = alarmas = 0
+        segundos_video = 0.0
+        inicio_reloj = time.perf_counter()
+        inicio_cpu = time.process_time()
+        while True:
+            exito, imagen = captura.read()
+            if not exito:
+                break
+            # posición del cuadro leído; algunos contenedores no la informan y se deriva de los fps
+            segundos_video = captura.get(cv2.CAP_PROP_POS_MSEC) / 1000
+            if segundos_video <= 0 and cuadros > 0 and fps_video > 0:
+                segundos_video = cuadros / fps_video
+            sistema.procesamiento_cuadro(imagen, dibujar=False, marca_tiempo=inicio + segundos_video)
+            cuadros += 1
+            cuadros_con_rostro += sistema.extractor_puntos.malla_rostro.puntos_malla is not None
+            alarmas += sistema.alarma
+        segundos_reloj = time.perf_counter() - inicio_reloj
+        segundos_cpu = time.process_time() - inicio_cpu
+    finally:
+        captura.release()
+
+    os.replace(ruta_csv_parcial, ruta_csv)
+    resumen = {
+        'video': ruta,
+        'inicio': inicio,
+        'duracion_video': round(segundos_video, 3),
+        'cuadros': cuadros,
+        'cuadros_con_rostro': cuadros_con_rostro,
+        'cuadros_con_alarma': alarmas,
+        'segundos_proceso': round(segundos_reloj, 3),
+        'segundos_cpu': round(segundos_cpu, 3),
+        'fps': round(cuadros / segundos_reloj, 2) if segundos_reloj > 0 else 0.0,
+        'reporte': sistema.reporte,
+    }
+    escribir_json(ruta_json, resumen)
+    return resumen
+
+
+def main(argumentos: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Procesamiento por lotes de videos grabados')
+    parser.add_argument('entradas', nargs='+', help='Videos o directorios con videos')
+    parser.add_argument('--salida', required=True, help='Directorio de los reportes por video')
+    parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--inicio', type=float, default=None,
+                        help='Hora de inicio de la grabación (segundos epoch) para todos los videos')
+    parser.add_argument('--intervalo-manos', type=int, default=1,
+                        help='Sin manos visibles, inferir manos cada N cuadros (1: todos)')
+    parser.add_argument('--sin-frotamiento', action='store_true',
+                        help='No detectar frotamiento de ojos (omite la inferencia de manos)')
+    parser.add_argument('--lado-maximo', type=int, default=0,
+                        help='Reducir los cuadros a este lado mayor en píxeles antes de procesar (0: sin reducir)')
+    parser.add_argument('--reprocesar', action='store_true', help='Procesar también los videos ya completos')
+    args = parser.parse_args(argumentos)
+
+    videos = buscar_videos(args.entradas)
+    pendientes = [(ruta, nombre) for ruta, nombre in videos
+                  if args.reprocesar or not os.path.exists(rutas_salida(args.salida, nombre)[1])]
+    logger.info(f'Videos: {len(videos)}, ya completos: {len(videos) - len(pendientes)}, '
+                f'pendientes: {len(pendientes)}, procesos: {args.procesos}')
+    if not pendientes:
+        return 0
+
+    cuadros = 0
+    segundos_cpu = 0.0
+    fallidos = 0
+    inicio_lote = time.perf_counter()
+    # spawn: cada proceso crea sus propios grafos de MediaPipe, igual que el ejecutor de monitoreo
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max(1, args.procesos), mp_context=contexto) as ejecutor:
+        futuros = {ejecutor.submit(procesar_video, ruta, nombre, args.salida, args.inicio,
+                                   args.intervalo_manos, not args.sin_frotamiento, args.lado_maximo): ruta
+                   for ruta, nombre in pendientes}
+        for futuro in as_completed(futuros):
+            try:
+                resumen = futuro.result()
+            except Exception as e:
+                fallidos += 1
+                logger.error(f'Error al procesar {futuros[futuro]}: {str(e)}')
+                continue
+            cuadros += resumen['cuadros']
+            segundos_cpu += resumen['segundos_cpu']
+            logger.info(f"{resumen['video']}: {resumen['cuadros']} cuadros, "
+                        f"{resumen['cuadros_con_alarma']} con alarma, {resumen['fps']} fps")
+
+    segundos_lote = time.perf_counter() - inicio_lote
+    logger.info(f'Procesados {len(pendientes) - fallidos}/{len(pendientes)} videos, {cuadros} cuadros '
+                f'en {segundos_lote:.1f} s: {cuadros / segundos_lote:.1f} fps totales, '
+                f'{cuadros / segundos_cpu if segundos_cpu > 0 else 0.0:.1f} fps por núcleo')
+    return 1 if fallidos else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import numpy as np
+from typing import Dict, List
+
+
+# Grupos de puntos y cantidad de puntos por grupo, en el orden del buffer
+GRUPOS_PUNTOS = {
+    'ojos': 10,
+    'boca': 4,
+    'cabeza': 7,
+    'primera_mano': 5,
+    'segunda_mano': 5,
+}
+DESPLAZAMIENTOS = dict(zip(GRUPOS_PUNTOS, np.cumsum([0] + list(GRUPOS_PUNTOS.values()))[:-1].tolist()))
+TOTAL_PUNTOS = sum(GRUPOS_PUNTOS.values())
+
+DEDOS = ['pulgar', 'dedo_indice', 'dedo_medio', 'dedo_anular', 'dedo_menique']
+# puntos de referencia de los ojos (iris) para la distancia dedo-ojo
+OJOS_REFERENCIA = [('mano_a_ojo_derecho', 8), ('mano_a_ojo_izquierdo', 9)]
+
+
+def _tabla_pares() -> List[tuple]:
+    # (grupo, medida, (grupo, punto), (grupo, punto), solo_vertical)
+    # solo_vertical: distancia solo en y, como los procesadores originales de ojos y cabeza
+    pares = [
+        ('ojos', 'distancia_parpado_superior_derecho', ('ojos', 0), ('ojos', 1), True),
+        ('ojos', 'distancia_parpado_superior_izquierdo', ('ojos', 2), ('ojos', 3), True),
+        ('ojos', 'distancia_parpado_inferior_derecho', ('ojos', 4), ('ojos', 5), True),
+        ('ojos', 'distancia_parpado_inferior_izquierdo', ('ojos', 6), ('ojos', 7), True),
+        ('cabeza', 'distancia_nariz_boca', ('cabeza', 0), ('cabeza', 1), True),
+        ('cabeza', 'distancia_nariz_cabeza', ('cabeza', 2), ('cabeza', 3), True),
+        ('boca', 'distancia_labios', ('boca', 0), ('boca', 1), False),
+        ('boca', 'distancia_menton', ('boca', 2), ('boca', 3), False),
+        # centros de los iris: escala del rostro para las medidas en píxeles
+        ('ojos', 'distancia_interocular', ('ojos', 8), ('ojos', 9), False),
+    ]
+    for mano in ('primera_mano', 'segunda_mano'):
+        for nombre_ojo, punto_ojo in OJOS_REFERENCIA:
+            for indice_dedo, dedo in enumerate(DEDOS):
+                pares.append((mano, (nombre_ojo, dedo), (mano, indice_dedo), ('ojos', punto_ojo), False))
+    return pares
+
+
+PARES = _tabla_pares()
+INDICES_A = np.array([DESPLAZAMIENTOS[g] + i for _, _, (g, i), _, _ in PARES], dtype=np.intp)
+INDICES_B = np.array([DESPLAZAMIENTOS[g] + i for _, _, _, (g, i), _ in PARES], dtype=np.intp)
+SOLO_VERTICAL = np.array([vertical for *_, vertical in PARES], dtype=bool)
+# las distancias dedo-ojo se expresan en distancias interoculares: no dependen de la resolución
+# ni de lo cerca que esté el conductor de la cámara
+ES_DEDO_OJO = np.array([grupo in ('primera_mano', 'segunda_mano') for grupo, *_ in PARES], dtype=bool)
+INDICE_INTEROCULAR = next(i for i, (_, medida, *_) in enumerate(PARES) if medida == 'distancia_interocular')
+# puntos de la cabeza que se devuelven tal cual (detección de cabeza abajo)
+PUNTOS_CABEZA = {'punto_nariz': 4, 'punto_mejilla_derecha': 5, 'punto_mejilla_izquierda': 6}
+
+
+def medir_distancias(puntos: np.ndarray) -> np.ndarray:
+    # (..., TOTAL_PUNTOS, 2) -> (..., len(PARES)); todas las medidas en una sola operación
+    diferencias = puntos[..., INDICES_A, :].astype(np.float64) - puntos[..., INDICES_B, :]
+    diferencias[..., SOLO_VERTICAL, 0] = 0.0
+    distancias = np.hypot(diferencias[..., 0], diferencias[..., 1])
+    escala = np.maximum(distancias[..., INDICE_INTEROCULAR:INDICE_INTEROCULAR + 1], 1e-6)
+    distancias[..., ES_DEDO_OJO] /= escala
+    return distancias
+
+
+class MotorMediciones:
+    """
+    Medidas geométricas de todas las características en un kernel vectorizado.
+
+    Los pares de puntos se declaran una vez (PARES); cada cuadro se copia a un
+    buffer fijo (TOTAL_PUNTOS, 2) y se calculan todas las distancias de
+    párpados, boca, cabeza y dedo-ojo juntas. Las distancias dedo-ojo van en
+    unidades de distancia interocular. Las manos ausentes quedan en NaN y no
+    aparecen en la vista de compatibilidad.
+    """
+
+    def __init__(self):
+        self.puntos = np.full((TOTAL_PUNTOS, 2), np.nan, dtype=np.float32)
+        self.distancias = np.zeros(len(PARES), dtype=np.float64)
+
+    def cargar_puntos(self, puntos: dict, buffer: np.ndarray) -> np.ndarray:
+        for grupo, cantidad in GRUPOS_PUNTOS.items():
+            inicio = DESPLAZAMIENTOS[grupo]
+            if grupo in puntos and len(puntos[grupo].get('distancias', [])) == cantidad:
+                buffer[inicio:inicio + cantidad] = puntos[grupo]['distancias']
+            else:
+                buffer[inicio:inicio + cantidad] = np.nan
+        return buffer
+
+    def medir(self, puntos: dict) -> np.ndarray:
+        self.cargar_puntos(puntos, self.puntos)
+        self.distancias = medir_distancias(self.puntos)
+        return self.distancias
+
+    def vista_compatible(self, puntos: np.ndarray, distancias: np.ndarray) -> Dict[str, dict]:
+        # mismo diccionario que devolvían los procesadores de ojos, cabeza, boca y manos
+        vista: Dict[str, dict] = {'ojos': {}, 'cabeza': {}, 'boca': {}}
+        manos_presentes = {mano for mano in ('primera_mano', 'segunda_mano')
+                           if not np.isnan(puntos[DESPLAZAMIENTOS[mano]]).any()}
+        for mano in manos_presentes:
+            vista[mano] = {nombre_ojo: {} for nombre_ojo, _ in OJOS_REFERENCIA}
+
+        for (grupo, medida, *_), distancia in zip(PARES, distancias.tolist()):
+            if grupo in ('primera_mano', 'segunda_mano'):
+                if grupo in manos_presentes:
+                    nombre_ojo, dedo = medida
+                    vista[grupo][nombre_ojo][dedo] = distancia
+            else:
+                vista[grupo][medida] = distancia
+
+        inicio_cabeza = DESPLAZAMIENTOS['cabeza']
+        for nombre, indice in PUNTOS_CABEZA.items():
+            vista['cabeza'][nombre] = puntos[inicio_cabeza + indice].copy()
+        return vista
+
+    def principal(self, puntos: dict) -> Dict[str, dict]:
+        return self.vista_compatible(self.puntos, self.medir(puntos))
@@ -1,7 +0,0 @@
-from abc import ABC, abstractmethod
-
-
-class ProcesadorRostro(ABC):
-    @abstractmethod
-    def procesar(self, puntos: dict):
-        raise NotImplemented
\ No newline at end of file
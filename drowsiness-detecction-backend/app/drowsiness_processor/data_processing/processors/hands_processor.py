@@ -1,7 +0,0 @@
-from abc import ABC, abstractmethod
-
-
-class ProcesadorManos(ABC):
-    @abstractmethod
-    def procesar(self, puntos_mano: dict, puntos_ojos: dict):
-        raise NotImplemented
\ No newline at end of file
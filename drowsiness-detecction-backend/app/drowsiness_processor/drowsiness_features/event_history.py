@@ -0,0 +1,88 @@
+import math
+from collections import Counter, deque
+from typing import Deque, List, Optional, Tuple
+
+# eventos que conserva cada contador; los más antiguos solo quedan en los agregados
+CAPACIDAD_HISTORIAL = 50
+# histograma de duraciones de todo el viaje para el p95: clases de 0.1 s hasta
+# 60 s (las más largas van a la última); error de cuantil de a lo sumo una clase
+ANCHO_CLASE = 0.1
+CLASES_DURACION = 600
+
+# (número del evento en su contador, marca de tiempo, duración en segundos; None si no se mide)
+Evento = Tuple[int, Optional[float], Optional[float]]
+
+
+def clase_duracion(duracion: float) -> int:
+    # cada clase se representa por su límite superior (3.0 s cae en la clase 30)
+    return min(max(math.ceil(duracion / ANCHO_CLASE - 1e-9), 0), CLASES_DURACION)
+
+
+def percentil_histograma(histograma: Counter, porcentaje: float = 95, maximo: Optional[float] = None) -> float:
+    # rango más cercano sobre las clases; el límite superior no pasa del máximo real
+    total = sum(histograma.values())
+    if not total:
+        return 0.0
+    objetivo = max(math.ceil(porcentaje / 100 * total), 1)
+    acumulado = 0
+    for clase in sorted(histograma):
+        acumulado += histograma[clase]
+        if acumulado >= objetivo:
+            valor = round(clase * ANCHO_CLASE, 2)
+            if maximo is None:
+                return valor
+            # la última clase acumula las duraciones largas: su valor es el máximo
+            return maximo if clase == CLASES_DURACION else min(valor, maximo)
+    return 0.0
+
+
+class HistorialEventos:
+    """
+    Historial acotado de los eventos de un contador.
+
+    Guarda los últimos ``capacidad`` eventos como números en un buffer
+    circular y lleva agregados de todos los registrados: total, suma,
+    máximo y un histograma de clases fijas de las duraciones, del que sale
+    el p95 de todo el viaje (no solo de los eventos conservados).
+    Los textos del reporte se arman solo al pedirlos (``formatear``), así
+    la memoria y el costo de cada reporte no crecen con el viaje.
+    """
+
+    def __init__(self, capacidad: int = CAPACIDAD_HISTORIAL):
+        self.eventos: Deque[Evento] = deque(maxlen=max(capacidad, 1))
+        self.conteo: int = 0
+        self.suma: float = 0.0
+        self.maximo: float = 0.0
+        self.histograma: Counter = Counter()
+
+    def registrar(self, numero: int, duracion: Optional[float], marca_tiempo: Optional[float] = None):
+        self.eventos.append((numero, marca_tiempo, duracion))
+        self.conteo += 1
+        if duracion is not None:
+            self.suma += duracion
+            self.maximo = max(self.maximo, duracion)
+            self.histograma[clase_duracion(duracion)] += 1
+
+    def ultimos(self, cantidad: int) -> List[Evento]:
+        # eventos de la ventana que se reporta (como mucho los conservados)
+        if cantidad <= 0:
+            return []
+        return list(self.eventos)[-cantidad:]
+
+    def formatear(self, plantilla: str) -> List[str]:
+        # plantilla con {numero} y {duracion}, p. ej. "{numero} bostezo: {duracion} segundos"
+        return [plantilla.format(numero=numero, duracion=duracion) for numero, _, duracion in self.eventos]
+
+    def resumen(self) -> dict:
+        return resumir_historiales(self)
+
+
+def resumir_historiales(*historiales: HistorialEventos) -> dict:
+    # agregados de uno o varios historiales (p. ej. las dos manos del frotamiento de ojos)
+    maximo = max((historial.maximo for historial in historiales), default=0.0)
+    return {
+        'total': sum(historial.conteo for historial in historiales),
+        'suma': round(sum(historial.suma for historial in historiales), 2),
+        'maximo': maximo,
+        'p95': percentil_histograma(sum((historial.histograma for historial in historiales), Counter()), maximo=maximo),
+    }
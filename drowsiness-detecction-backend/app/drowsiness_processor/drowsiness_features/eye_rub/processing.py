@@ -1,7 +1,10 @@
-import time
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 from abc import ABC, abstractmethod
 from app.drowsiness_processor.drowsiness_features.processor import ProcesadorSomnolencia
+from app.drowsiness_processor.drowsiness_features.event_history import HistorialEventos, resumir_historiales
+
+# dedo a menos de esta fracción de la distancia interocular del ojo (antes 40 px a ~60 px entre iris)
+UMBRAL_DEDO_OJO = 0.65
 
 
 class Detector(ABC):
@@ -22,15 +25,15 @@ class DeteccionFrotamientoOjos(Detector):
             distancia_ojo.get(dedo, float('inf')) 
             for dedo in ['pulgar', 'dedo_indice', 'dedo_medio', 'dedo_anular', 'dedo_menique']
         ]
-        self.frotamiento_ojos = any(distancia < 40 for distancia in distancias)
+        self.frotamiento_ojos = any(distancia < UMBRAL_DEDO_OJO for distancia in distancias)
         return self.frotamiento_ojos
 
-    def detectar(self, frotamiento_ojos: bool) -> Tuple[bool, float]:
+    def detectar(self, frotamiento_ojos: bool, marca_tiempo: float) -> Tuple[bool, float]:
         if frotamiento_ojos and not self.bandera:
-            self.tiempo_inicio = time.time()
+            self.tiempo_inicio = marca_tiempo
             self.bandera = True
         elif not frotamiento_ojos and self.bandera:
-            self.tiempo_fin = time.time()
+            self.tiempo_fin = marca_tiempo
             duracion_frotamiento_ojos = round(self.tiempo_fin - self.tiempo_inicio, 0)
             self.bandera = False
             if duracion_frotamiento_ojos > 1:
@@ -41,21 +44,26 @@ class DeteccionFrotamientoOjos(Detector):
 
 
 class ContadorFrotamientoOjos:
-    def __init__(self):
+    def __init__(self, lado: str):
+        self.lado = lado
         self.conteo_frotamiento_ojos: int = 0
-        self.duraciones_frotamiento_ojos = []
+        self.historial_frotamiento_ojos = HistorialEventos()
 
-    def incrementar(self, duracion: float, lado: str):
+    def incrementar(self, duracion: float, marca_tiempo: Optional[float] = None):
         self.conteo_frotamiento_ojos += 1
-        self.duraciones_frotamiento_ojos.append(
-            f"{self.conteo_frotamiento_ojos} frotamiento ojo {lado}: {duracion} segundos"
-        )
+        self.historial_frotamiento_ojos.registrar(self.conteo_frotamiento_ojos, duracion, marca_tiempo)
 
     def reiniciar(self):
         self.conteo_frotamiento_ojos = 0
 
     def obtener_duraciones(self):
-        return self.duraciones_frotamiento_ojos
+        # textos del reporte, armados solo cuando se reporta
+        return self.historial_frotamiento_ojos.formatear(
+            "{numero} frotamiento ojo " + self.lado + ": {duracion} segundos"
+        )
+
+    def eventos_ventana(self):
+        return self.historial_frotamiento_ojos.ultimos(self.conteo_frotamiento_ojos)
 
 
 class GeneradorReporte(ABC):
@@ -68,12 +76,16 @@ class GeneradorReporteFrotamientoOjos(GeneradorReporte):
     def generar_reporte(self, datos: Dict[str, Any]) -> Dict[str, Any]:
         conteo_frotamiento_ojos = datos.get("conteo_frotamiento_ojos", 0)
         duraciones_frotamiento_ojos = datos.get("duraciones_frotamiento_ojos", [])
+        resumen_frotamiento_ojos = datos.get("resumen_frotamiento_ojos", {})
+        eventos_frotamiento_ojos = datos.get("eventos_frotamiento_ojos", [])
         tiempo_transcurrido = datos.get("tiempo_transcurrido", 0)
         reporte_frotamiento_ojos = datos.get("reporte_frotamiento_ojos", False)
 
         return {
             'conteo_frotamiento_ojos': conteo_frotamiento_ojos,
             'duraciones_frotamiento_ojos': duraciones_frotamiento_ojos,
+            'resumen_frotamiento_ojos': resumen_frotamiento_ojos,
+            'eventos_frotamiento_ojos': eventos_frotamiento_ojos,
             'mensaje_reporte': f'Contando frotamiento de ojos... {300 - tiempo_transcurrido} segundos restantes.',
             'reporte_frotamiento_ojos': reporte_frotamiento_ojos
         }
@@ -83,13 +95,15 @@ class EstimadorFrotamientoOjos(ProcesadorSomnolencia):
     def __init__(self):
         self.deteccion_frotamiento_ojos_derecho = DeteccionFrotamientoOjos()
         self.deteccion_frotamiento_ojos_izquierdo = DeteccionFrotamientoOjos()
-        self.contador_frotamiento_ojos_derecho = ContadorFrotamientoOjos()
-        self.contador_frotamiento_ojos_izquierdo = ContadorFrotamientoOjos()
+        self.contador_frotamiento_ojos_derecho = ContadorFrotamientoOjos('derecho')
+        self.contador_frotamiento_ojos_izquierdo = ContadorFrotamientoOjos('izquierdo')
         self.generador_reporte_frotamiento_ojos = GeneradorReporteFrotamientoOjos()
-        self.inicio_reporte = time.time()
+        self.inicio_reporte: Optional[float] = None
 
-    def procesar(self, puntos_manos: dict):
-        tiempo_actual = time.time()
+    def procesar(self, puntos_manos: dict, marca_tiempo: float):
+        tiempo_actual = marca_tiempo
+        if self.inicio_reporte is None:
+            self.inicio_reporte = tiempo_actual
         tiempo_transcurrido = round(tiempo_actual - self.inicio_reporte, 0)
 
         frotamiento_ojos_derecho = self.deteccion_frotamiento_ojos_derecho.verificar_frotamiento_ojos(
@@ -100,16 +114,16 @@ class EstimadorFrotamientoOjos(ProcesadorSomnolencia):
         )
 
         es_frotamiento_ojos_derecho, duracion_frotamiento_ojos_derecho = (
-            self.deteccion_frotamiento_ojos_derecho.detectar(frotamiento_ojos_derecho)
+            self.deteccion_frotamiento_ojos_derecho.detectar(frotamiento_ojos_derecho, marca_tiempo)
         )
         es_frotamiento_ojos_izquierdo, duracion_frotamiento_ojos_izquierdo = (
-            self.deteccion_frotamiento_ojos_izquierdo.detectar(frotamiento_ojos_izquierdo)
+            self.deteccion_frotamiento_ojos_izquierdo.detectar(frotamiento_ojos_izquierdo, marca_tiempo)
         )
 
         if es_frotamiento_ojos_derecho:
-            self.contador_frotamiento_ojos_derecho.incrementar(duracion_frotamiento_ojos_derecho, 'derecho')
+            self.contador_frotamiento_ojos_derecho.incrementar(duracion_frotamiento_ojos_derecho, marca_tiempo)
         if es_frotamiento_ojos_izquierdo:
-            self.contador_frotamiento_ojos_izquierdo.incrementar(duracion_frotamiento_ojos_izquierdo, 'izquierdo')
+            self.contador_frotamiento_ojos_izquierdo.incrementar(duracion_frotamiento_ojos_izquierdo, marca_tiempo)
 
         if tiempo_transcurrido >= 300:
             datos_frotamiento_ojos = {
@@ -121,6 +135,16 @@ class EstimadorFrotamientoOjos(ProcesadorSomnolencia):
                     self.contador_frotamiento_ojos_derecho.obtener_duraciones() + 
                     self.contador_frotamiento_ojos_izquierdo.obtener_duraciones()
                 ),
+                "resumen_frotamiento_ojos": resumir_historiales(
+                    self.contador_frotamiento_ojos_derecho.historial_frotamiento_ojos,
+                    self.contador_frotamiento_ojos_izquierdo.historial_frotamiento_ojos
+                ),
+                # los dos ojos en orden temporal
+                "eventos_frotamiento_ojos": sorted(
+                    self.contador_frotamiento_ojos_derecho.eventos_ventana() +
+                    self.contador_frotamiento_ojos_izquierdo.eventos_ventana(),
+                    key=lambda evento: evento[1] or 0.0
+                ),
                 "tiempo_transcurrido": tiempo_transcurrido,
                 "reporte_frotamiento_ojos": True
             }
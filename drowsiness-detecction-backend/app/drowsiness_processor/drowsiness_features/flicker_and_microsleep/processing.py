@@ -1,7 +1,10 @@
-import time
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 from abc import ABC, abstractmethod
 from app.drowsiness_processor.drowsiness_features.processor import ProcesadorSomnolencia
+from app.drowsiness_processor.drowsiness_features.event_history import HistorialEventos
+
+# parpadeos que se conservan: más de los que caben en la ventana de 60 s (~2 por segundo)
+CAPACIDAD_PARPADEOS = 120
 
 
 class Detector(ABC):
@@ -55,12 +58,12 @@ class DeteccionMicrosueno(Detector):
             self.ojos_cerrados = False
         return self.ojos_cerrados
 
-    def detectar(self, estan_ojos_cerrados: bool) -> Tuple[bool, float]:
+    def detectar(self, estan_ojos_cerrados: bool, marca_tiempo: float) -> Tuple[bool, float]:
         if estan_ojos_cerrados and not self.bandera:
-            self.tiempo_inicio = time.time()
+            self.tiempo_inicio = marca_tiempo
             self.bandera = True
         elif not estan_ojos_cerrados and self.bandera:
-            self.tiempo_fin = time.time()
+            self.tiempo_fin = marca_tiempo
             duracion_parpadeo = round(self.tiempo_fin - self.tiempo_inicio, 0)
             self.bandera = False
             if duracion_parpadeo >= 2:
@@ -73,9 +76,15 @@ class DeteccionMicrosueno(Detector):
 class ContadorParpadeos:
     def __init__(self):
         self.conteo_parpadeo: int = 0
+        # el parpadeo no mide duración: solo su marca de tiempo
+        self.historial_parpadeo = HistorialEventos(CAPACIDAD_PARPADEOS)
 
-    def incrementar(self):
+    def incrementar(self, marca_tiempo: Optional[float] = None):
         self.conteo_parpadeo += 1
+        self.historial_parpadeo.registrar(self.conteo_parpadeo, None, marca_tiempo)
+
+    def eventos_ventana(self):
+        return self.historial_parpadeo.ultimos(self.conteo_parpadeo)
 
     def reiniciar(self):
         self.conteo_parpadeo = 0
@@ -84,17 +93,21 @@ class ContadorParpadeos:
 class ContadorMicrosueno:
     def __init__(self):
         self.conteo_microsueno: int = 0
-        self.duraciones_microsueno = []
+        self.historial_microsueno = HistorialEventos()
 
-    def incrementar(self, duracion: float):
+    def incrementar(self, duracion: float, marca_tiempo: Optional[float] = None):
         self.conteo_microsueno += 1
-        self.duraciones_microsueno.append(f"{self.conteo_microsueno} microsueño: {duracion} segundos")
+        self.historial_microsueno.registrar(self.conteo_microsueno, duracion, marca_tiempo)
 
     def reiniciar(self):
         self.conteo_microsueno = 0
 
     def obtener_duraciones(self):
-        return self.duraciones_microsueno
+        # textos del reporte, armados solo cuando se reporta
+        return self.historial_microsueno.formatear("{numero} microsueño: {duracion} segundos")
+
+    def ultimo_evento(self):
+        return self.historial_microsueno.ultimos(1)
 
 
 class GeneradorReporte(ABC):
@@ -106,12 +119,14 @@ class GeneradorReporte(ABC):
 class GeneradorReporteParpadeos(GeneradorReporte):
     def generar_reporte(self, datos: dict[str, bool | int | list]) -> Dict[str, Any]:
         conteo_parpadeo = datos.get("conteo_parpadeo", 0)
+        eventos_parpadeo = datos.get("eventos_parpadeo", [])
         tiempo_transcurrido = datos.get("tiempo_transcurrido", 0)
         reporte_parpadeo = datos.get("reporte_parpadeo", False)
         reporte_microsueno = datos.get("reporte_microsueno", False)
 
         return {
             'conteo_parpadeo': conteo_parpadeo,
+            'eventos_parpadeo': eventos_parpadeo,
             'mensaje_reporte': f'Contando parpadeos... {60 - tiempo_transcurrido} segundos restantes.',
             'reporte_parpadeo': reporte_parpadeo,
             'reporte_microsueno': reporte_microsueno
@@ -122,12 +137,16 @@ class GeneradorReporteMicrosueno(GeneradorReporte):
     def generar_reporte(self, datos: dict[str, bool | int | list]) -> Dict[str, Any]:
         conteo_microsueno = datos.get("conteo_microsueno", 0)
         duraciones_microsueno = datos.get("duraciones_microsueno", [])
+        resumen_microsueno = datos.get("resumen_microsueno", {})
+        eventos_microsueno = datos.get("eventos_microsueno", [])
         reporte_microsueno = datos.get("reporte_microsueno", False)
         reporte_parpadeo = datos.get("reporte_parpadeo", False)
 
         return {
             'conteo_microsueno': conteo_microsueno,
             'duraciones_microsueno': duraciones_microsueno,
+            'resumen_microsueno': resumen_microsueno,
+            'eventos_microsueno': eventos_microsueno,
             'reporte_microsueno': reporte_microsueno,
             'reporte_parpadeo': reporte_parpadeo
         }
@@ -141,26 +160,29 @@ class EstimadorParpadeos(ProcesadorSomnolencia):
         self.contador_microsueno = ContadorMicrosueno()
         self.generador_reporte_parpadeo = GeneradorReporteParpadeos()
         self.generador_reporte_microsueno = GeneradorReporteMicrosueno()
-        self.inicio_reporte = time.time()
+        self.inicio_reporte: Optional[float] = None
 
-    def procesar(self, distancia_ojos: dict):
-        tiempo_actual = time.time()
+    def procesar(self, distancia_ojos: dict, marca_tiempo: float):
+        tiempo_actual = marca_tiempo
+        if self.inicio_reporte is None:
+            self.inicio_reporte = tiempo_actual
         tiempo_transcurrido = round(tiempo_actual - self.inicio_reporte, 0)
 
         es_parpadeo = self.detector_parpadeo.detectar(distancia_ojos)
         if es_parpadeo:
-            self.contador_parpadeo.incrementar()
+            self.contador_parpadeo.incrementar(marca_tiempo)
 
         ojos_cerrados = self.detector_microsueno.ojos_estan_cerrados(distancia_ojos)
-        es_microsueno, duracion_microsueno = self.detector_microsueno.detectar(ojos_cerrados)
+        es_microsueno, duracion_microsueno = self.detector_microsueno.detectar(ojos_cerrados, marca_tiempo)
         if es_microsueno:
-            self.contador_microsueno.incrementar(duracion_microsueno)
+            self.contador_microsueno.incrementar(duracion_microsueno, marca_tiempo)
 
         microsueno = self.contador_microsueno.conteo_microsueno
 
         if tiempo_transcurrido >= 60:
             datos_parpadeos = {
                 "conteo_parpadeo": self.contador_parpadeo.conteo_parpadeo,
+                "eventos_parpadeo": self.contador_parpadeo.eventos_ventana(),
                 "tiempo_transcurrido": tiempo_transcurrido,
                 "reporte_parpadeo": True,
                 "reporte_microsueno": False,
@@ -173,6 +195,8 @@ class EstimadorParpadeos(ProcesadorSomnolencia):
             datos_microsueno = {
                 "conteo_microsueno": self.contador_microsueno.conteo_microsueno,
                 "duraciones_microsueno": self.contador_microsueno.obtener_duraciones(),
+                "resumen_microsueno": self.contador_microsueno.historial_microsueno.resumen(),
+                "eventos_microsueno": self.contador_microsueno.ultimo_evento(),
                 "reporte_microsueno": True,
                 "reporte_parpadeo": False
             }
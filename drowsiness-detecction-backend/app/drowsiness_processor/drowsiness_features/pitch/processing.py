@@ -1,7 +1,7 @@
-import time
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 from abc import ABC, abstractmethod
 from app.drowsiness_processor.drowsiness_features.processor import ProcesadorSomnolencia
+from app.drowsiness_processor.drowsiness_features.event_history import HistorialEventos
 
 
 class Detector(ABC):
@@ -40,12 +40,12 @@ class DeteccionInclinacion(Detector):
             self.posicion_cabeza = 'cabeza arriba'
         return self.cabeza_abajo, self.posicion_cabeza
 
-    def detectar(self, cabeza_abajo: bool) -> Tuple[bool, float]:
+    def detectar(self, cabeza_abajo: bool, marca_tiempo: float) -> Tuple[bool, float]:
         if cabeza_abajo and not self.bandera:
-            self.tiempo_inicio = time.time()
+            self.tiempo_inicio = marca_tiempo
             self.bandera = True
         elif not cabeza_abajo and self.bandera:
-            self.tiempo_fin = time.time()
+            self.tiempo_fin = marca_tiempo
             duracion_inclinacion = round(self.tiempo_fin - self.tiempo_inicio, 0)
             self.bandera = False
             if duracion_inclinacion >= 3.0:
@@ -58,17 +58,21 @@ class DeteccionInclinacion(Detector):
 class ContadorInclinacion:
     def __init__(self):
         self.conteo_inclinacion: int = 0
-        self.duraciones_inclinacion = []
+        self.historial_inclinacion = HistorialEventos()
 
-    def incrementar(self, duracion: float):
+    def incrementar(self, duracion: float, marca_tiempo: Optional[float] = None):
         self.conteo_inclinacion += 1
-        self.duraciones_inclinacion.append(f"{self.conteo_inclinacion} inclinación: {duracion} segundos")
+        self.historial_inclinacion.registrar(self.conteo_inclinacion, duracion, marca_tiempo)
 
     def reiniciar(self):
         self.conteo_inclinacion = 0
 
     def obtener_duraciones(self):
-        return self.duraciones_inclinacion
+        # textos del reporte, armados solo cuando se reporta
+        return self.historial_inclinacion.formatear("{numero} inclinación: {duracion} segundos")
+
+    def ultimo_evento(self):
+        return self.historial_inclinacion.ultimos(1)
 
 
 class GeneradorReporte(ABC):
@@ -81,12 +85,16 @@ class GeneradorReporteInclinacion(GeneradorReporte):
     def generar_reporte(self, datos: Dict[str, Any]) -> dict[str, Any]:
         conteo_inclinacion = datos.get("conteo_inclinacion", 0)
         duraciones_inclinacion = datos.get("duraciones_inclinacion", [])
+        resumen_inclinacion = datos.get("resumen_inclinacion", {})
+        eventos_inclinacion = datos.get("eventos_inclinacion", [])
         cabeza_abajo = datos.get("cabeza_abajo", False)
         reporte_inclinacion = datos.get("reporte_inclinacion", False)
 
         return {
             'conteo_inclinacion': conteo_inclinacion,
             'duraciones_inclinacion': duraciones_inclinacion,
+            'resumen_inclinacion': resumen_inclinacion,
+            'eventos_inclinacion': eventos_inclinacion,
             'cabeza_abajo': cabeza_abajo,
             'reporte_inclinacion': reporte_inclinacion
         }
@@ -98,16 +106,18 @@ class EstimadorInclinacion(ProcesadorSomnolencia):
         self.contador_inclinacion = ContadorInclinacion()
         self.generador_reporte_inclinacion = GeneradorReporteInclinacion()
 
-    def procesar(self, puntos_cabeza: dict):
+    def procesar(self, puntos_cabeza: dict, marca_tiempo: float):
         cabeza_abajo, posicion_cabeza = self.deteccion_inclinacion.verificar_cabeza_abajo(puntos_cabeza)
-        es_inclinacion, duracion_inclinacion = self.deteccion_inclinacion.detectar(cabeza_abajo)
+        es_inclinacion, duracion_inclinacion = self.deteccion_inclinacion.detectar(cabeza_abajo, marca_tiempo)
         if es_inclinacion:
-            self.contador_inclinacion.incrementar(duracion_inclinacion)
+            self.contador_inclinacion.incrementar(duracion_inclinacion, marca_tiempo)
 
         if es_inclinacion:
             datos_inclinacion = {
                 "conteo_inclinacion": self.contador_inclinacion.conteo_inclinacion,
                 "duraciones_inclinacion": self.contador_inclinacion.obtener_duraciones(),
+                "resumen_inclinacion": self.contador_inclinacion.historial_inclinacion.resumen(),
+                "eventos_inclinacion": self.contador_inclinacion.ultimo_evento(),
                 "cabeza_abajo": cabeza_abajo,
                 "reporte_inclinacion": True
             }
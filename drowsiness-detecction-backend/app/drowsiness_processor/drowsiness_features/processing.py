@@ -23,35 +23,36 @@ class ProcesamientoCaracteristicasSomnolencia:
             'bostezo': None
         }
 
-    def principal(self, distancias: dict):
+    def principal(self, distancias: dict, marca_tiempo: float):
+        # un solo reloj por cuadro para todos los estimadores (captura del cliente o reproducción)
         self.caracteristica_procesada['frotamiento_ojos_primera_mano'] = None
         self.caracteristica_procesada['frotamiento_ojos_segunda_mano'] = None
         
         if 'primera_mano' in distancias:
             self.caracteristica_procesada['frotamiento_ojos_primera_mano'] = (
-                self.caracteristicas_somnolencia['frotamiento_ojos_primera_mano'].procesar(distancias['primera_mano'])
+                self.caracteristicas_somnolencia['frotamiento_ojos_primera_mano'].procesar(distancias['primera_mano'], marca_tiempo)
             )
         else:
             self.caracteristica_procesada['frotamiento_ojos_primera_mano'] = (
-                self.caracteristicas_somnolencia['frotamiento_ojos_primera_mano'].procesar({})
+                self.caracteristicas_somnolencia['frotamiento_ojos_primera_mano'].procesar({}, marca_tiempo)
             )
 
         if 'segunda_mano' in distancias:
             self.caracteristica_procesada['frotamiento_ojos_segunda_mano'] = (
-                self.caracteristicas_somnolencia['frotamiento_ojos_segunda_mano'].procesar(distancias['segunda_mano'])
+                self.caracteristicas_somnolencia['frotamiento_ojos_segunda_mano'].procesar(distancias['segunda_mano'], marca_tiempo)
             )
         else:
             self.caracteristica_procesada['frotamiento_ojos_segunda_mano'] = (
-                self.caracteristicas_somnolencia['frotamiento_ojos_segunda_mano'].procesar({})
+                self.caracteristicas_somnolencia['frotamiento_ojos_segunda_mano'].procesar({}, marca_tiempo)
             )
 
         self.caracteristica_procesada['parpadeo_y_microsueno'] = (
-            self.caracteristicas_somnolencia['parpadeo_y_microsueno'].procesar(distancias.get('ojos', {}))
+            self.caracteristicas_somnolencia['parpadeo_y_microsueno'].procesar(distancias.get('ojos', {}), marca_tiempo)
         )
         self.caracteristica_procesada['inclinacion'] = (
-            self.caracteristicas_somnolencia['inclinacion'].procesar(distancias.get('cabeza', {}))
+            self.caracteristicas_somnolencia['inclinacion'].procesar(distancias.get('cabeza', {}), marca_tiempo)
         )
         self.caracteristica_procesada['bostezo'] = (
-            self.caracteristicas_somnolencia['bostezo'].procesar(distancias.get('boca', {}))
+            self.caracteristicas_somnolencia['bostezo'].procesar(distancias.get('boca', {}), marca_tiempo)
         )
         return self.caracteristica_procesada
\ No newline at end of file
@@ -3,5 +3,5 @@ from abc import ABC, abstractmethod
 
 class ProcesadorSomnolencia(ABC):
     @abstractmethod
-    def procesar(self, puntos: dict):
+    def procesar(self, puntos: dict, marca_tiempo: float):
         raise NotImplemented
\ No newline at end of file
@@ -1,7 +1,7 @@
-import time
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 from abc import ABC, abstractmethod
 from app.drowsiness_processor.drowsiness_features.processor import ProcesadorSomnolencia
+from app.drowsiness_processor.drowsiness_features.event_history import HistorialEventos
 
 
 class Detector(ABC):
@@ -27,12 +27,12 @@ class DeteccionBostezo(Detector):
             self.boca_abierta = False
         return self.boca_abierta
 
-    def detectar(self, boca_abierta: bool) -> Tuple[bool, float]:
+    def detectar(self, boca_abierta: bool, marca_tiempo: float) -> Tuple[bool, float]:
         if boca_abierta and not self.bandera:
-            self.tiempo_inicio = time.time()
+            self.tiempo_inicio = marca_tiempo
             self.bandera = True
         elif not boca_abierta and self.bandera:
-            self.tiempo_fin = time.time()
+            self.tiempo_fin = marca_tiempo
             duracion_bostezo = round(self.tiempo_fin - self.tiempo_inicio, 0)
             self.bandera = False
             if duracion_bostezo > 4:
@@ -45,17 +45,21 @@ class DeteccionBostezo(Detector):
 class ContadorBostezo:
     def __init__(self):
         self.conteo_bostezo: int = 0
-        self.duraciones_bostezo = []
+        self.historial_bostezo = HistorialEventos()
 
-    def incrementar(self, duracion: float):
+    def incrementar(self, duracion: float, marca_tiempo: Optional[float] = None):
         self.conteo_bostezo += 1
-        self.duraciones_bostezo.append(f"{self.conteo_bostezo} bostezo: {duracion} segundos")
+        self.historial_bostezo.registrar(self.conteo_bostezo, duracion, marca_tiempo)
 
     def reiniciar(self):
         self.conteo_bostezo = 0
 
     def obtener_duraciones(self):
-        return self.duraciones_bostezo
+        # textos del reporte, armados solo cuando se reporta
+        return self.historial_bostezo.formatear("{numero} bostezo: {duracion} segundos")
+
+    def eventos_ventana(self):
+        return self.historial_bostezo.ultimos(self.conteo_bostezo)
 
 
 class GeneradorReporte(ABC):
@@ -68,12 +72,16 @@ class GeneradorReporteBostezo(GeneradorReporte):
     def generar_reporte(self, datos: Dict[str, Any]) -> Dict[str, Any]:
         conteo_bostezo = datos.get("conteo_bostezo", 0)
         duraciones_bostezo = datos.get("duraciones_bostezo", [])
+        resumen_bostezo = datos.get("resumen_bostezo", {})
+        eventos_bostezo = datos.get("eventos_bostezo", [])
         tiempo_transcurrido = datos.get("tiempo_transcurrido", 0)
         reporte_bostezo = datos.get("reporte_bostezo", False)
 
         return {
             'conteo_bostezo': conteo_bostezo,
             'duraciones_bostezo': duraciones_bostezo,
+            'resumen_bostezo': resumen_bostezo,
+            'eventos_bostezo': eventos_bostezo,
             'mensaje_reporte': f'Contando bostezos... {180 - tiempo_transcurrido} segundos restantes.',
             'reporte_bostezo': reporte_bostezo
         }
@@ -84,21 +92,25 @@ class EstimadorBostezo(ProcesadorSomnolencia):
         self.deteccion_bostezo = DeteccionBostezo()
         self.contador_bostezo = ContadorBostezo()
         self.generador_reporte_bostezo = GeneradorReporteBostezo()
-        self.inicio_reporte = time.time()
+        self.inicio_reporte: Optional[float] = None
 
-    def procesar(self, puntos_boca: dict):
-        tiempo_actual = time.time()
+    def procesar(self, puntos_boca: dict, marca_tiempo: float):
+        tiempo_actual = marca_tiempo
+        if self.inicio_reporte is None:
+            self.inicio_reporte = tiempo_actual
         tiempo_transcurrido = round(tiempo_actual - self.inicio_reporte, 0)
 
         boca_abierta = self.deteccion_bostezo.verificar_boca_abierta(puntos_boca)
-        es_bostezo, duracion_bostezo = self.deteccion_bostezo.detectar(boca_abierta)
+        es_bostezo, duracion_bostezo = self.deteccion_bostezo.detectar(boca_abierta, marca_tiempo)
         if es_bostezo:
-            self.contador_bostezo.incrementar(duracion_bostezo)
+            self.contador_bostezo.incrementar(duracion_bostezo, marca_tiempo)
 
         if tiempo_transcurrido >= 180:
             datos_bostezo = {
                 "conteo_bostezo": self.contador_bostezo.conteo_bostezo,
                 "duraciones_bostezo": self.contador_bostezo.obtener_duraciones(),
+                "resumen_bostezo": self.contador_bostezo.historial_bostezo.resumen(),
+                "eventos_bostezo": self.contador_bostezo.eventos_ventana(),
                 "tiempo_transcurrido": tiempo_transcurrido,
                 "reporte_bostezo": True
             }
@@ -1,15 +1,42 @@
 import mediapipe as mp
 import numpy as np
 import cv2
-from typing import Tuple, Any, List, Dict
+from typing import Tuple, Any, Dict, Optional
+
+from app.drowsiness_processor.extract_points.landmarks import landmarks_a_pixeles
+from app.drowsiness_processor.extract_points.region_tracker import Region, SeguidorRegionRostro
+
+
+# sin refine_landmarks la malla trae 468 puntos; los 10 del iris (468-477) se aproximan
+PUNTOS_SIN_IRIS = 468
+# por ojo: (centro del iris, comisuras del ojo); los 4 puntos del borde siguen al centro en la malla
+OJOS_IRIS = ((468, 33, 133), (473, 362, 263))
+# radio del iris en fracción del ancho del ojo (comisura a comisura)
+RADIO_IRIS = 0.21
+
+
+def completar_iris(malla: np.ndarray) -> np.ndarray:
+    # (468, 3) -> (478, 3): centro entre las comisuras y borde a +x, -y, -x, +y, como el modelo del iris
+    completa = np.empty((PUNTOS_SIN_IRIS + 10, 3), dtype=np.float32)
+    completa[:PUNTOS_SIN_IRIS] = malla
+    for centro, comisura_a, comisura_b in OJOS_IRIS:
+        punto_medio = (malla[comisura_a] + malla[comisura_b]) / 2
+        radio = RADIO_IRIS * abs(float(malla[comisura_a, 0] - malla[comisura_b, 0]))
+        completa[centro:centro + 5] = punto_medio
+        completa[centro + 1:centro + 5, :2] += np.array([[radio, 0], [0, -radio], [-radio, 0], [0, radio]])
+    return completa
 
 
 class InferenciaRostroMalla:
-    def __init__(self, confianza_minima_deteccion=0.6, confianza_minima_seguimiento=0.6):
+    def __init__(self, confianza_minima_deteccion=0.6, confianza_minima_seguimiento=0.6, modo_estatico=False,
+                 refinar=True):
+        self.modo_estatico = modo_estatico
+        # refinar=False: modelo sin iris, más liviano (calidad reducida por carga)
+        self.refinar = refinar
         self.malla_rostro = mp.solutions.face_mesh.FaceMesh(
-            static_image_mode=False,
+            static_image_mode=modo_estatico,
             max_num_faces=1,
-            refine_landmarks=True,
+            refine_landmarks=refinar,
             min_detection_confidence=confianza_minima_deteccion,
             min_tracking_confidence=confianza_minima_seguimiento
         )
@@ -19,61 +46,64 @@ class InferenciaRostroMalla:
         malla_rostro = self.malla_rostro.process(imagen_rgb)
         return bool(malla_rostro.multi_face_landmarks), malla_rostro
 
+    def reiniciar(self):
+        # descarta el estado de seguimiento entre sesiones
+        self.malla_rostro.reset()
+
 
 class ExtractorRostroMalla:
+    # índices de la malla usados por cada característica
+    INDICES_OJOS = np.array([159, 145, 385, 374, 468, 472, 473, 477, 468, 473], dtype=np.intp)
+    INDICES_BOCA = np.array([13, 14, 17, 199], dtype=np.intp)
+    INDICES_CABEZA = np.array([1, 0, 1, 5, 4, 205, 425], dtype=np.intp)
+
     def __init__(self):
         self.puntos: dict = {
             'ojos': {'distancias': []},
             'boca': {'distancias': []},
             'cabeza': {'distancias': []},
         }
+        # (N, 3) float32 reutilizado entre cuadros: x, y en píxeles y z normalizado
+        self.malla: Optional[np.ndarray] = None
 
-    def extraer_puntos(self, imagen_rostro: np.ndarray, info_malla_rostro: Any) -> List[List[int]]:
+    def extraer_puntos(self, imagen_rostro: np.ndarray, info_malla_rostro: Any,
+                       desplazamiento: Optional[Tuple[int, int]] = None) -> np.ndarray:
         h, w, _ = imagen_rostro.shape
-        puntos_malla = [
-            [i, int(pt.x * w), int(pt.y * h)]
-            for rostro in info_malla_rostro.multi_face_landmarks
-            for i, pt in enumerate(rostro.landmark)
-        ]
-        return puntos_malla
-
-    def extraer_puntos_caracteristicas(self, puntos_rostro: List[List[int]], indices_caracteristicas: dict):
-        for caracteristica, indices in indices_caracteristicas.items():
-            for sub_caracteristica, sub_indices in indices.items():
-                self.puntos[caracteristica][sub_caracteristica] = [puntos_rostro[i][1:] for i in sub_indices]
-
-    def obtener_puntos_ojos(self, puntos_rostro: List[List[int]]) -> Dict[str, List[List[int]]]:
-        indices_caracteristicas = {
-            'ojos': {
-                'distancias': [159, 145, 385, 374, 468, 472, 473, 477, 468, 473],
-            }
-        }
-        self.extraer_puntos_caracteristicas(puntos_rostro, indices_caracteristicas)
+        # max_num_faces=1: solo se usa el primer rostro
+        self.malla = landmarks_a_pixeles(info_malla_rostro.multi_face_landmarks[0], w, h, self.malla)
+        if len(self.malla) == PUNTOS_SIN_IRIS:
+            self.malla = completar_iris(self.malla)
+        if desplazamiento is not None:
+            # imagen_rostro es un recorte: se vuelve a coordenadas del cuadro completo
+            self.malla[:, :2] += desplazamiento
+        return self.malla
+
+    def extraer_puntos_caracteristicas(self, malla: np.ndarray, caracteristica: str, indices: np.ndarray):
+        # indexado por arreglo: (K, 2) con x, y de los puntos de la característica
+        self.puntos[caracteristica]['distancias'] = malla[indices, :2]
+
+    def obtener_puntos_ojos(self, malla: np.ndarray) -> Dict[str, np.ndarray]:
+        self.extraer_puntos_caracteristicas(malla, 'ojos', self.INDICES_OJOS)
         return self.puntos['ojos']
 
-    def obtener_puntos_boca(self, puntos_rostro: List[List[int]]) -> Dict[str, List[List[int]]]:
-        indices_caracteristicas = {
-            'boca': {
-                'distancias': [13, 14, 17, 199]
-            }
-        }
-        self.extraer_puntos_caracteristicas(puntos_rostro, indices_caracteristicas)
+    def obtener_puntos_boca(self, malla: np.ndarray) -> Dict[str, np.ndarray]:
+        self.extraer_puntos_caracteristicas(malla, 'boca', self.INDICES_BOCA)
         return self.puntos['boca']
 
-    def obtener_puntos_cabeza(self, puntos_rostro: List[List[int]]) -> Dict[str, List[List[int]]]:
-        indices_caracteristicas = {
-            'cabeza': {
-                'distancias': [1, 0, 1, 5, 4, 205, 425]
-            }
-        }
-        self.extraer_puntos_caracteristicas(puntos_rostro, indices_caracteristicas)
+    def obtener_puntos_cabeza(self, malla: np.ndarray) -> Dict[str, np.ndarray]:
+        self.extraer_puntos_caracteristicas(malla, 'cabeza', self.INDICES_CABEZA)
         return self.puntos['cabeza']
 
 
 class DibujadorRostroMalla:
+    # píxeles que cubre cv2.circle(radio=1, relleno): el centro y sus 4 vecinos
+    DESPLAZAMIENTOS_PUNTO = np.array([[0, 0], [0, -1], [-1, 0], [1, 0], [0, 1]], dtype=np.intp)
+
     def __init__(self, color: Tuple[int, int, int] = (255, 255, 0)):
         self.mp_dibujar = mp.solutions.drawing_utils
         self.config_dibujar = self.mp_dibujar.DrawingSpec(color=color, thickness=1, circle_radius=1)
+        # lienzo reutilizado entre cuadros: el bosquejo devuelto es válido hasta el siguiente cuadro
+        self.lienzo: Optional[np.ndarray] = None
 
     def dibujar(self, imagen_rostro: np.ndarray, info_malla_rostro: Any):
         for malla_rostro in info_malla_rostro.multi_face_landmarks:
@@ -85,40 +115,73 @@ class DibujadorRostroMalla:
                 self.config_dibujar
             )
 
+    def obtener_lienzo(self, forma: Tuple[int, ...]) -> np.ndarray:
+        if self.lienzo is None or self.lienzo.shape != forma:
+            self.lienzo = np.zeros(forma, dtype=np.uint8)
+        else:
+            self.lienzo.fill(0)
+        return self.lienzo
+
     def dibujar_bosquejo(self, imagen_rostro: np.ndarray, info_malla_rostro: Any):
         h, w, _ = imagen_rostro.shape
-        imagen_negra = np.zeros((h, w, 3), dtype=np.uint8)
+        imagen_negra = self.obtener_lienzo(imagen_rostro.shape)
         for malla_rostro in info_malla_rostro.multi_face_landmarks:
-            for pt in malla_rostro.landmark:
-                x = int(pt.x * w)
-                y = int(pt.y * h)
-                z = int(pt.z * 50)
-                cv2.circle(imagen_negra, (x, y), 1, (255 - z, 255 - z, 0 - z), -1)
+            self.rasterizar_puntos(imagen_negra, landmarks_a_pixeles(malla_rostro, w, h))
+        return imagen_negra
+
+    def dibujar_bosquejo_malla(self, imagen_rostro: np.ndarray, malla: np.ndarray):
+        # desde el tensor ya extraído, sin volver a leer los landmarks
+        return self.rasterizar_puntos(self.obtener_lienzo(imagen_rostro.shape), malla)
+
+    def rasterizar_puntos(self, imagen_negra: np.ndarray, malla: np.ndarray):
+        # equivale a cv2.circle(radio 1) por punto con color (255 - z, 255 - z, -z), en bloque
+        h, w, _ = imagen_negra.shape
+        x = malla[:, 0].astype(np.intp)
+        y = malla[:, 1].astype(np.intp)
+        z = (malla[:, 2].astype(np.float64) * 50).astype(np.intp)
+        colores = np.clip(np.stack([255 - z, 255 - z, -z], axis=1), 0, 255).astype(np.uint8)
+
+        # (N, 5) píxeles por punto en orden de punto: el último punto dibujado gana, como en el bucle
+        xs = (x[:, None] + self.DESPLAZAMIENTOS_PUNTO[:, 0]).ravel()
+        ys = (y[:, None] + self.DESPLAZAMIENTOS_PUNTO[:, 1]).ravel()
+        colores = np.repeat(colores, len(self.DESPLAZAMIENTOS_PUNTO), axis=0)
+        dentro = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+        imagen_negra[ys[dentro], xs[dentro]] = colores[dentro]
         return imagen_negra
 
 
 class ProcesadorRostroMalla:
-    def __init__(self):
-        self.inferencia = InferenciaRostroMalla()
+    def __init__(self, inferencia: Optional[InferenciaRostroMalla] = None):
+        # el grafo de MediaPipe puede venir de un pool compartido (ver inference_pool.py)
+        self.inferencia = inferencia
         self.extractor = ExtractorRostroMalla()
         self.dibujador = DibujadorRostroMalla()
-
-    def procesar(self, imagen_rostro: np.ndarray, dibujar: bool = True) -> Tuple[dict, bool, np.ndarray]:
-        h, w, _ = imagen_rostro.shape
-        bosquejo = np.zeros((h, w, 3), dtype=np.uint8)
-        exito, info_malla_rostro = self.inferencia.procesar(imagen_rostro)
+        # malla completa del último cuadro, (N, 3) float32 (None sin rostro)
+        self.puntos_malla: Optional[np.ndarray] = None
+
+    def procesar(self, imagen_rostro: np.ndarray, dibujar: bool = True,
+                 region: Optional[Region] = None) -> Tuple[dict, bool, Optional[np.ndarray]]:
+        # region: recorte (x0, y0, x1, y1) donde buscar el rostro; la malla sale en coordenadas del cuadro
+        if self.inferencia is None:
+            self.inferencia = InferenciaRostroMalla()
+        entrada = SeguidorRegionRostro.recortar(imagen_rostro, region)
+        exito, info_malla_rostro = self.inferencia.procesar(entrada)
         if not exito:
+            self.puntos_malla = None
+            # sin dibujar no se prepara el lienzo del bosquejo
+            bosquejo = self.dibujador.obtener_lienzo(imagen_rostro.shape) if dibujar else None
             return {}, exito, bosquejo
 
-        puntos_rostro = self.extractor.extraer_puntos(imagen_rostro, info_malla_rostro)
+        malla = self.extractor.extraer_puntos(entrada, info_malla_rostro, region[:2] if region else None)
+        self.puntos_malla = malla
         puntos = {
-            'ojos': self.extractor.obtener_puntos_ojos(puntos_rostro),
-            'boca': self.extractor.obtener_puntos_boca(puntos_rostro),
-            'cabeza': self.extractor.obtener_puntos_cabeza(puntos_rostro),
+            'ojos': self.extractor.obtener_puntos_ojos(malla),
+            'boca': self.extractor.obtener_puntos_boca(malla),
+            'cabeza': self.extractor.obtener_puntos_cabeza(malla),
         }
 
         if dibujar:
-            bosquejo = self.dibujador.dibujar_bosquejo(imagen_rostro, info_malla_rostro)
+            bosquejo = self.dibujador.dibujar_bosquejo_malla(imagen_rostro, malla)
             return puntos, exito, bosquejo
 
-        return puntos, exito, bosquejo
\ No newline at end of file
+        return puntos, exito, None
\ No newline at end of file
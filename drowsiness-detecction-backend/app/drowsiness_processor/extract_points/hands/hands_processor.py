@@ -1,15 +1,21 @@
 import numpy as np
 import mediapipe as mp
 import cv2
-from typing import Tuple, Any, List, Dict
+from typing import Tuple, Any, List, Dict, Optional
+
+from app.drowsiness_processor.extract_points.landmarks import landmarks_a_pixeles
+from app.drowsiness_processor.extract_points.region_tracker import Region, SeguidorRegionRostro
 
 
 class InferenciaManos:
-    def __init__(self, confianza_minima_deteccion=0.6, confianza_minima_seguimiento=0.6):
+    def __init__(self, confianza_minima_deteccion=0.6, confianza_minima_seguimiento=0.6, modo_estatico=False,
+                 complejidad=1):
+        # complejidad=0: modelo liviano (calidad reducida por carga)
+        self.complejidad = complejidad
         self.manos = mp.solutions.hands.Hands(
-            static_image_mode=False,
+            static_image_mode=modo_estatico,
             max_num_hands=2,
-            model_complexity=1,
+            model_complexity=complejidad,
             min_detection_confidence=confianza_minima_deteccion,
             min_tracking_confidence=confianza_minima_seguimiento
         )
@@ -19,39 +25,34 @@ class InferenciaManos:
         manos = self.manos.process(imagen_rgb)
         return bool(manos.multi_hand_landmarks), manos
 
+    def reiniciar(self):
+        # descarta el estado de seguimiento entre sesiones
+        self.manos.reset()
+
 
 class ExtractorManos:
+    # puntas de los dedos: pulgar, índice, medio, anular y meñique
+    INDICES_DEDOS = np.array([4, 8, 12, 16, 20], dtype=np.intp)
+
     def __init__(self):
-        self.puntos: dict = {
-            'dedos': {'distancias': []},
-        }
+        # (21, 3) float32 reutilizado por cada posición de mano (max_num_hands=2)
+        self.manos: List[Optional[np.ndarray]] = [None, None]
 
     def contar_manos(self, info_manos):
         return len(info_manos.multi_hand_landmarks)
 
-    def extraer_puntos(self, imagen_rostro: np.ndarray, info_manos: Any, indice_mano: int = 0) -> List[List[int]]:
+    def extraer_puntos(self, imagen_rostro: np.ndarray, info_manos: Any, indice_mano: int = 0,
+                       desplazamiento: Optional[Tuple[int, int]] = None) -> np.ndarray:
         h, w, _ = imagen_rostro.shape
         mano_elegida = info_manos.multi_hand_landmarks[indice_mano]
-        puntos_manos = [
-            [i, int(pt.x * w), int(pt.y * h)]
-            for mano in info_manos.multi_hand_landmarks
-            for i, pt in enumerate(mano_elegida.landmark)
-        ]
-        return puntos_manos
-
-    def extraer_puntos_caracteristicas(self, puntos_manos: List[List[int]], indices_caracteristicas: dict):
-        for caracteristica, indices in indices_caracteristicas.items():
-            for sub_caracteristica, sub_indices in indices.items():
-                self.puntos[caracteristica][sub_caracteristica] = [puntos_manos[i][1:] for i in sub_indices]
-
-    def obtener_puntos_mano(self, puntos_manos: List[List[int]]) -> Dict[str, List[List[int]]]:
-        indices_caracteristicas = {
-            'dedos': {
-                'distancias': [4, 8, 12, 16, 20],
-            }
-        }
-        self.extraer_puntos_caracteristicas(puntos_manos, indices_caracteristicas)
-        return self.puntos['dedos']
+        self.manos[indice_mano] = landmarks_a_pixeles(mano_elegida, w, h, self.manos[indice_mano])
+        if desplazamiento is not None:
+            self.manos[indice_mano][:, :2] += desplazamiento
+        return self.manos[indice_mano]
+
+    def obtener_puntos_mano(self, mano: np.ndarray) -> Dict[str, np.ndarray]:
+        # diccionario nuevo por mano para que la segunda no pise a la primera
+        return {'distancias': mano[self.INDICES_DEDOS, :2]}
 
 
 class DibujadorManos:
@@ -73,35 +74,56 @@ class DibujadorManos:
 
 
 class ProcesadorManos:
-    def __init__(self):
-        self.inferencia = InferenciaManos()
+    def __init__(self, inferencia: Optional[InferenciaManos] = None):
+        # el grafo de MediaPipe puede venir de un pool compartido (ver inference_pool.py)
+        self.inferencia = inferencia
         self.extractor = ExtractorManos()
         self.dibujador = DibujadorManos()
         self.puntos: dict = {
             'primera_mano': {'distancias': []},
             'segunda_mano': {'distancias': []},
         }
-
-    def procesar(self, imagen_mano: np.ndarray, imagen_bosquejo: np.ndarray, dibujar: bool = False) -> Tuple[dict, bool, np.ndarray]:
-        exito, info_manos = self.inferencia.procesar(imagen_mano)
+        # (21, 3) float32 por mano detectada en el último cuadro
+        self.puntos_manos: List[np.ndarray] = []
+
+    def inferir(self, imagen_mano: np.ndarray, region: Optional[Region] = None) -> Tuple[bool, Any]:
+        # solo el grafo de MediaPipe: puede correr en otro hilo mientras se procesa el rostro
+        if self.inferencia is None:
+            self.inferencia = InferenciaManos()
+        return self.inferencia.procesar(SeguidorRegionRostro.recortar(imagen_mano, region))
+
+    def procesar(self, imagen_mano: np.ndarray, imagen_bosquejo: np.ndarray, dibujar: bool = False,
+                 region: Optional[Region] = None,
+                 resultado_inferencia: Optional[Tuple[bool, Any]] = None) -> Tuple[dict, bool, np.ndarray]:
+        # region: el mismo recorte usado para el rostro; los puntos salen en coordenadas del cuadro
+        # resultado_inferencia: salida de inferir() ya ejecutada para esta imagen y región
+        entrada = SeguidorRegionRostro.recortar(imagen_mano, region)
+        desplazamiento = region[:2] if region else None
+        if resultado_inferencia is None:
+            resultado_inferencia = self.inferir(imagen_mano, region)
+        exito, info_manos = resultado_inferencia
         if not exito:
+            self.puntos_manos = []
             return self.puntos, exito, imagen_bosquejo
 
         num_manos = self.extractor.contar_manos(info_manos)
         if num_manos >= 2:
-            puntos_primera_mano = self.extractor.extraer_puntos(imagen_mano, info_manos, indice_mano=0)
-            puntos_segunda_mano = self.extractor.extraer_puntos(imagen_mano, info_manos, indice_mano=1)
+            puntos_primera_mano = self.extractor.extraer_puntos(entrada, info_manos, 0, desplazamiento)
+            puntos_segunda_mano = self.extractor.extraer_puntos(entrada, info_manos, 1, desplazamiento)
             puntos = {
                 'primera_mano': self.extractor.obtener_puntos_mano(puntos_primera_mano),
                 'segunda_mano': self.extractor.obtener_puntos_mano(puntos_segunda_mano),
             }
+            self.puntos_manos = [puntos_primera_mano, puntos_segunda_mano]
         else:
-            puntos_primera_mano = self.extractor.extraer_puntos(imagen_mano, info_manos, indice_mano=0)
+            puntos_primera_mano = self.extractor.extraer_puntos(entrada, info_manos, 0, desplazamiento)
             puntos = {
                 'primera_mano': self.extractor.obtener_puntos_mano(puntos_primera_mano),
             }
+            self.puntos_manos = [puntos_primera_mano]
 
         if dibujar:
-            imagen_bosquejo = self.dibujador.dibujar(imagen_bosquejo, info_manos)
+            # los landmarks están normalizados al recorte: se dibujan sobre la misma zona del bosquejo
+            self.dibujador.dibujar(SeguidorRegionRostro.recortar(imagen_bosquejo, region), info_manos)
             return puntos, exito, imagen_bosquejo
         return puntos, exito, imagen_bosquejo
\ No newline at end of file
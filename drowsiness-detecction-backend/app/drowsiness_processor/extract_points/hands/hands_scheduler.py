@@ -0,0 +1,68 @@
+import numpy as np
+import cv2
+from typing import Optional
+
+
+class PlanificadorManos:
+    """
+    Decide en qué cuadros se ejecuta la inferencia de manos.
+
+    Las manos solo se usan para el frotamiento de ojos. Sin manos en el
+    último cuadro inferido, el modelo se ejecuta cada `intervalo` cuadros o
+    antes si hay movimiento en la región de los ojos; con manos presentes
+    se ejecuta en todos los cuadros (seguimiento de MediaPipe) hasta que
+    desaparecen. Con `habilitado=False` no se ejecuta nunca.
+    intervalo=1 conserva el comportamiento original: todos los cuadros.
+    """
+
+    # región de los ojos comparada entre cuadros, reducida a este tamaño (ancho, alto)
+    TAMANO_REGION = (32, 16)
+
+    def __init__(self, intervalo: int = 1, umbral_movimiento: float = 8.0, habilitado: bool = True):
+        if intervalo < 1:
+            raise ValueError('El intervalo de inferencia de manos debe ser al menos 1')
+        self.intervalo = intervalo
+        self.umbral_movimiento = umbral_movimiento
+        self.habilitado = habilitado
+        self.cuadros_sin_inferir: int = 0
+        self.manos_presentes: bool = False
+        self.region_anterior: Optional[np.ndarray] = None
+
+    def debe_inferir(self, imagen: np.ndarray, malla: np.ndarray, indices_ojos: np.ndarray) -> bool:
+        if not self.habilitado:
+            return False
+        if self.intervalo == 1:
+            return True
+        self.cuadros_sin_inferir += 1
+        # se mide siempre para que la región anterior sea la del cuadro previo
+        movimiento = self.medir_movimiento(imagen, malla, indices_ojos)
+        return (self.manos_presentes or self.cuadros_sin_inferir >= self.intervalo
+                or movimiento > self.umbral_movimiento)
+
+    def registrar(self, manos_detectadas: bool):
+        self.manos_presentes = manos_detectadas
+        self.cuadros_sin_inferir = 0
+
+    def reiniciar(self):
+        # sin rostro: la próxima región no se compara con una de otra posición
+        self.region_anterior = None
+        self.manos_presentes = False
+
+    def medir_movimiento(self, imagen: np.ndarray, malla: np.ndarray, indices_ojos: np.ndarray) -> float:
+        # diferencia media de grises en la zona de los ojos ampliada (donde entra la mano al frotar)
+        puntos = malla[indices_ojos, :2]
+        x0, y0 = puntos.min(axis=0)
+        x1, y1 = puntos.max(axis=0)
+        margen = max(x1 - x0, 1.0) * 0.5
+        h, w = imagen.shape[:2]
+        x0, x1 = int(max(x0 - margen, 0)), int(min(x1 + margen, w))
+        y0, y1 = int(max(y0 - margen, 0)), int(min(y1 + margen, h))
+        if x1 <= x0 or y1 <= y0:
+            self.region_anterior = None
+            return 0.0
+        region = cv2.resize(imagen[y0:y1, x0:x1], self.TAMANO_REGION, interpolation=cv2.INTER_AREA)
+        region = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY).astype(np.int16)
+        anterior, self.region_anterior = self.region_anterior, region
+        if anterior is None:
+            return 0.0
+        return float(np.abs(region - anterior).mean())
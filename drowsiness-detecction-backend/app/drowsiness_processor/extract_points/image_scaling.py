@@ -0,0 +1,60 @@
+import numpy as np
+import cv2
+from typing import Optional, Tuple
+
+Dimensiones = Tuple[int, int]
+
+# (factor, modo de imdecode): libjpeg escala al decodificar, sin leer la imagen completa
+MODOS_REDUCIDOS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+# marcadores SOF que llevan el tamaño del cuadro (C4, C8 y CC usan el mismo rango para otra cosa)
+MARCADORES_SOF = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def dimensiones_jpeg(datos: np.ndarray) -> Optional[Dimensiones]:
+    # (ancho, alto) leídos de la cabecera sin decodificar; None si no es un JPEG reconocible
+    if len(datos) < 4 or datos[0] != 0xFF or datos[1] != 0xD8:
+        return None
+    posicion = 2
+    while posicion + 9 < len(datos):
+        if datos[posicion] != 0xFF:
+            return None
+        marcador = int(datos[posicion + 1])
+        if marcador == 0xFF:
+            # relleno entre segmentos
+            posicion += 1
+            continue
+        longitud = (int(datos[posicion + 2]) << 8) | int(datos[posicion + 3])
+        if marcador in MARCADORES_SOF:
+            alto = (int(datos[posicion + 5]) << 8) | int(datos[posicion + 6])
+            ancho = (int(datos[posicion + 7]) << 8) | int(datos[posicion + 8])
+            return ancho, alto
+        posicion += 2 + longitud
+    return None
+
+
+def decodificar_imagen(datos: np.ndarray, lado_maximo: int = 0) -> Tuple[np.ndarray, Dimensiones]:
+    # imagen con su lado mayor <= lado_maximo (0: sin límite) y (ancho, alto) del cuadro recibido
+    dimensiones = dimensiones_jpeg(datos) if lado_maximo > 0 else None
+    modo = cv2.IMREAD_COLOR
+    if dimensiones is not None:
+        # el mayor factor que no deja la imagen por debajo del límite; el resto lo hace el resize
+        modo = next((modo_reducido for factor, modo_reducido in MODOS_REDUCIDOS
+                     if max(dimensiones) // factor >= lado_maximo), modo)
+    imagen = cv2.imdecode(datos, modo)
+    if imagen is None:
+        raise ValueError('No se pudo decodificar la imagen recibida')
+    if dimensiones is None or modo == cv2.IMREAD_COLOR:
+        # la orientación EXIF puede girar la imagen: el tamaño real es el decodificado
+        dimensiones = (imagen.shape[1], imagen.shape[0])
+    elif (imagen.shape[1] > imagen.shape[0]) != (dimensiones[0] > dimensiones[1]):
+        dimensiones = (dimensiones[1], dimensiones[0])
+    return reducir_imagen(imagen, lado_maximo), dimensiones
+
+
+def reducir_imagen(imagen: np.ndarray, lado_maximo: int = 0) -> np.ndarray:
+    alto, ancho = imagen.shape[:2]
+    if lado_maximo <= 0 or max(alto, ancho) <= lado_maximo:
+        return imagen
+    escala = lado_maximo / max(alto, ancho)
+    return cv2.resize(imagen, (max(round(ancho * escala), 1), max(round(alto * escala), 1)),
+                      interpolation=cv2.INTER_AREA)
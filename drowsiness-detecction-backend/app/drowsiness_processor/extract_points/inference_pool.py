@@ -0,0 +1,193 @@
+import os
+import resource
+import threading
+import logging as log
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.drowsiness_processor.extract_points.face_mesh.face_mesh_processor import InferenciaRostroMalla
+from app.drowsiness_processor.extract_points.hands.hands_processor import InferenciaManos
+from app.drowsiness_processor.quality_levels import NIVELES_CALIDAD
+
+
+log.basicConfig(level=log.INFO)
+logger = log.getLogger(__name__)
+
+MODO_SESION = 'sesion'
+MODO_CUADRO = 'cuadro'
+
+
+class PoolAgotadoError(RuntimeError):
+    pass
+
+
+def memoria_rss_mb() -> float:
+    # memoria residente actual del proceso (Linux), con el pico como respaldo
+    try:
+        with open('/proc/self/statm') as archivo:
+            paginas_residentes = int(archivo.read().split()[1])
+        return paginas_residentes * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class MotorInferencia:
+    """Grafos de MediaPipe (malla facial + manos) sin estado propio del conductor."""
+
+    def __init__(self, modo_estatico: bool = False):
+        self.modo_estatico = modo_estatico
+        self.rostro = InferenciaRostroMalla(modo_estatico=modo_estatico)
+        self.manos = InferenciaManos(modo_estatico=modo_estatico)
+        # variantes por configuración; las livianas se crean al precalentar con variantes_calidad
+        # (o, si no, la primera vez que se piden)
+        self.variantes_rostro: Dict[bool, InferenciaRostroMalla] = {True: self.rostro}
+        self.variantes_manos: Dict[int, InferenciaManos] = {1: self.manos}
+
+    def obtener_rostro(self, refinar: bool = True) -> InferenciaRostroMalla:
+        if refinar not in self.variantes_rostro:
+            self.variantes_rostro[refinar] = InferenciaRostroMalla(modo_estatico=self.modo_estatico, refinar=refinar)
+        return self.variantes_rostro[refinar]
+
+    def obtener_manos(self, complejidad: int = 1) -> InferenciaManos:
+        if complejidad not in self.variantes_manos:
+            self.variantes_manos[complejidad] = InferenciaManos(modo_estatico=self.modo_estatico,
+                                                                complejidad=complejidad)
+        return self.variantes_manos[complejidad]
+
+    def precalentar(self, variantes_calidad: bool = False):
+        # la primera llamada a process() inicializa el grafo y los delegados; con variantes_calidad
+        # también se crean las de NIVELES_CALIDAD, así bajar de calidad no construye grafos en un cuadro
+        if variantes_calidad:
+            for nivel in NIVELES_CALIDAD:
+                self.obtener_rostro(nivel.refinar_malla)
+                self.obtener_manos(nivel.complejidad_manos)
+        imagen = np.zeros((240, 320, 3), dtype=np.uint8)
+        for inferencia in (*self.variantes_rostro.values(), *self.variantes_manos.values()):
+            inferencia.procesar(imagen)
+        self.reiniciar()
+
+    def reiniciar(self):
+        for inferencia in (*self.variantes_rostro.values(), *self.variantes_manos.values()):
+            inferencia.reiniciar()
+
+
+class PoolMotoresInferencia:
+    """
+    Pool de motores de inferencia precalentados, compartido por el proceso.
+
+    modo 'sesion': cada sesión toma un motor al conectarse y lo devuelve al
+    desconectarse (el seguimiento de MediaPipe se conserva entre cuadros).
+    modo 'cuadro': los motores se prestan por cuadro; se crean en modo
+    estático para que el seguimiento de un conductor no contamine a otro.
+
+    Con ``variantes_calidad`` cada motor se crea con las variantes de los
+    modelos que usan los niveles de calidad, y su memoria entra en
+    ``memoria_por_motor_mb``.
+    """
+
+    def __init__(self, tamano: int = 4, modo: str = MODO_SESION, tiempo_espera: float = 5.0,
+                 variantes_calidad: bool = False):
+        if modo not in (MODO_SESION, MODO_CUADRO):
+            raise ValueError(f'Modo de pool no soportado: {modo}')
+        if tamano < 1:
+            raise ValueError('El pool necesita al menos un motor')
+        self.tamano = tamano
+        self.modo = modo
+        self.tiempo_espera = tiempo_espera
+        self.variantes_calidad = variantes_calidad
+        self.disponibles: List[MotorInferencia] = []
+        self.creados: int = 0
+        self.memoria_por_motor_mb: float = 0.0
+        self.condicion = threading.Condition()
+
+    @property
+    def en_uso(self) -> int:
+        return self.creados - len(self.disponibles)
+
+    def crear_motor(self) -> MotorInferencia:
+        memoria_inicial = memoria_rss_mb()
+        motor = MotorInferencia(modo_estatico=self.modo == MODO_CUADRO)
+        motor.precalentar(self.variantes_calidad)
+        # promedio móvil simple del costo en memoria de cada motor
+        memoria_motor = max(memoria_rss_mb() - memoria_inicial, 0.0)
+        self.memoria_por_motor_mb += (memoria_motor - self.memoria_por_motor_mb) / (self.creados + 1)
+        return motor
+
+    def precalentar(self):
+        with self.condicion:
+            while self.creados < self.tamano:
+                self.disponibles.append(self.crear_motor())
+                self.creados += 1
+            self.condicion.notify_all()
+        logger.info(f'Pool de inferencia listo: {self.tamano} motores, '
+                    f'~{self.memoria_por_motor_mb:.1f} MB por motor')
+
+    def obtener(self, tiempo_espera: Optional[float] = None) -> MotorInferencia:
+        tiempo_espera = self.tiempo_espera if tiempo_espera is None else tiempo_espera
+        with self.condicion:
+            if self.disponibles:
+                return self.disponibles.pop()
+            if self.creados >= self.tamano:
+                if not self.condicion.wait_for(lambda: self.disponibles, timeout=tiempo_espera):
+                    raise PoolAgotadoError(f'No hay motores de inferencia libres ({self.tamano} en uso)')
+                return self.disponibles.pop()
+            # creación perezosa si el pool no fue precalentado
+            self.creados += 1
+
+        try:
+            return self.crear_motor()
+        except Exception:
+            with self.condicion:
+                self.creados -= 1
+                self.condicion.notify()
+            raise
+
+    def liberar(self, motor: MotorInferencia):
+        if self.modo == MODO_SESION:
+            motor.reiniciar()
+        with self.condicion:
+            self.disponibles.append(motor)
+            self.condicion.notify()
+
+    @contextmanager
+    def prestar(self, tiempo_espera: Optional[float] = None):
+        motor = self.obtener(tiempo_espera)
+        try:
+            yield motor
+        finally:
+            self.liberar(motor)
+
+    def estadisticas(self) -> dict:
+        with self.condicion:
+            return {
+                'pid': os.getpid(),
+                'modo': self.modo,
+                'tamano': self.tamano,
+                'creados': self.creados,
+                'en_uso': self.en_uso,
+                'disponibles': len(self.disponibles),
+                'memoria_rss_mb': round(memoria_rss_mb(), 1),
+                'memoria_por_motor_mb': round(self.memoria_por_motor_mb, 1),
+            }
+
+
+_pool: Optional[PoolMotoresInferencia] = None
+
+
+def configurar_pool(tamano: int, modo: str = MODO_SESION, tiempo_espera: float = 5.0,
+                    precalentar: bool = True, variantes_calidad: bool = False) -> PoolMotoresInferencia:
+    global _pool
+    _pool = PoolMotoresInferencia(tamano=tamano, modo=modo, tiempo_espera=tiempo_espera,
+                                  variantes_calidad=variantes_calidad)
+    if precalentar:
+        _pool.precalentar()
+    return _pool
+
+
+def obtener_pool() -> PoolMotoresInferencia:
+    global _pool
+    if _pool is None:
+        _pool = PoolMotoresInferencia()
+    return _pool
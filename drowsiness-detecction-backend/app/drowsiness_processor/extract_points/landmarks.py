@@ -0,0 +1,19 @@
+import numpy as np
+from typing import Any, Optional
+
+
+def leer_landmarks(lista_landmarks: Any) -> np.ndarray:
+    # (N, 3) float32 normalizados
+    return np.array([(pt.x, pt.y, pt.z) for pt in lista_landmarks.landmark], dtype=np.float32).reshape(-1, 3)
+
+
+def landmarks_a_pixeles(lista_landmarks: Any, ancho: int, alto: int,
+                        salida: Optional[np.ndarray] = None) -> np.ndarray:
+    # (N, 3) float32: x, y en píxeles truncados (como int(pt.x * w)) y z normalizado
+    normalizados = leer_landmarks(lista_landmarks)
+    if salida is None or salida.shape != normalizados.shape:
+        salida = np.empty(normalizados.shape, dtype=np.float32)
+    salida[:, 0] = np.trunc(normalizados[:, 0].astype(np.float64) * ancho)
+    salida[:, 1] = np.trunc(normalizados[:, 1].astype(np.float64) * alto)
+    salida[:, 2] = normalizados[:, 2]
+    return salida
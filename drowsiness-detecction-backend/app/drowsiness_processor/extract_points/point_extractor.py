@@ -1,9 +1,13 @@
 import numpy as np
-from typing import Tuple
+from concurrent.futures import Executor, Future
+from typing import Tuple, Optional
 import logging as log
 
 from app.drowsiness_processor.extract_points.face_mesh.face_mesh_processor import ProcesadorRostroMalla
 from app.drowsiness_processor.extract_points.hands.hands_processor import ProcesadorManos
+from app.drowsiness_processor.extract_points.hands.hands_scheduler import PlanificadorManos
+from app.drowsiness_processor.extract_points.inference_pool import MotorInferencia
+from app.drowsiness_processor.extract_points.region_tracker import Region, SeguidorRegionRostro
 
 
 log.basicConfig(level=log.INFO)
@@ -11,22 +15,169 @@ logger = log.getLogger(__name__)
 
 
 class ExtractorPuntos:
-    def __init__(self):
+    # cuadros sin inferencia de manos en que se reutilizan las últimas detectadas
+    EDAD_MAXIMA_MANOS = 3
+
+    def __init__(self, motor: Optional[MotorInferencia] = None, planificador_manos: Optional[PlanificadorManos] = None,
+                 seguidor_region: Optional[SeguidorRegionRostro] = None, ejecutor_manos: Optional[Executor] = None):
         self.malla_rostro = ProcesadorRostroMalla()
         self.manos = ProcesadorManos()
+        # sin planificador la inferencia de manos corre en todos los cuadros con rostro
+        self.planificador_manos = planificador_manos or PlanificadorManos()
+        # sin seguidor de región la inferencia recibe siempre el cuadro completo
+        self.seguidor_region = seguidor_region
+        # con ejecutor la inferencia de manos corre en otro hilo mientras se infiere el rostro
+        self.ejecutor_manos = ejecutor_manos
+        self.region_anterior = None
+        # puntos de la última inferencia que vio manos y cuadros transcurridos desde entonces
+        self.manos_recientes: Optional[dict] = None
+        self.edad_manos: int = 0
+        # variante de los modelos (ver NIVELES_CALIDAD); se aplica al asignar el motor
+        self.refinar_malla: bool = True
+        self.complejidad_manos: int = 1
+        self.motor: Optional[MotorInferencia] = None
+        if motor is not None:
+            self.asignar_motor(motor)
+
+    def asignar_motor(self, motor: Optional[MotorInferencia]):
+        # los grafos de MediaPipe se separan del estado del conductor para poder compartirlos
+        self.motor = motor
+        self.malla_rostro.inferencia = motor.obtener_rostro(self.refinar_malla) if motor is not None else None
+        self.manos.inferencia = motor.obtener_manos(self.complejidad_manos) if motor is not None else None
+
+    def configurar_modelos(self, refinar_malla: bool, complejidad_manos: int):
+        if (refinar_malla, complejidad_manos) == (self.refinar_malla, self.complejidad_manos):
+            return
+        self.refinar_malla = refinar_malla
+        self.complejidad_manos = complejidad_manos
+        if self.motor is not None:
+            self.asignar_motor(self.motor)
+            # el seguimiento guardado en la otra variante es de cuadros viejos
+            self.malla_rostro.inferencia.reiniciar()
+            self.manos.inferencia.reiniciar()
 
-    def procesar(self, imagen_rostro: np.ndarray) -> Tuple[dict, bool, np.ndarray]:
-        puntos_rostro, exito_malla, dibujar_bosquejo = self.malla_rostro.procesar(imagen_rostro, dibujar=True)
+    def procesar(self, imagen_rostro: np.ndarray, dibujar: bool = True) -> Tuple[dict, bool, Optional[np.ndarray]]:
+        if self.motor is None:
+            self.asignar_motor(MotorInferencia())
+        inferencia_manos = self.lanzar_inferencia_manos(imagen_rostro)
+        try:
+            puntos_rostro, exito_malla, dibujar_bosquejo, region = self.procesar_rostro(imagen_rostro, dibujar)
+        finally:
+            # el grafo de manos tiene que terminar antes del siguiente cuadro aunque el resultado se descarte
+            resultado_manos = inferencia_manos[1].result() if inferencia_manos is not None else None
         if exito_malla:
-            puntos_manos, exito_manos, dibujar_bosquejo = self.manos.procesar(imagen_rostro, dibujar_bosquejo, dibujar=True)
+            exito_manos = False
+            if inferencia_manos is not None:
+                puntos_manos, exito_manos, dibujar_bosquejo = self.manos.procesar(
+                    imagen_rostro, dibujar_bosquejo, dibujar=dibujar, region=inferencia_manos[0],
+                    resultado_inferencia=resultado_manos
+                )
+                self.registrar_manos(puntos_manos, exito_manos)
+            elif self.ejecutor_manos is None and self.planificador_manos.debe_inferir(
+                    imagen_rostro, self.malla_rostro.puntos_malla, self.malla_rostro.extractor.INDICES_OJOS):
+                puntos_manos, exito_manos, dibujar_bosquejo = self.manos.procesar(
+                    imagen_rostro, dibujar_bosquejo, dibujar=dibujar, region=region
+                )
+                self.registrar_manos(puntos_manos, exito_manos)
+            else:
+                puntos_manos, exito_manos = self.reutilizar_manos()
             if exito_manos:
                 puntos_fusionados = self.fusionar_puntos(puntos_rostro, puntos_manos)
                 return puntos_fusionados, True, dibujar_bosquejo
             else:
                 return puntos_rostro, True, dibujar_bosquejo
         else:
+            # sin rostro no se usan las manos (en paralelo: el resultado ya calculado se descarta)
+            self.manos.puntos_manos = []
+            self.manos_recientes = None
+            self.planificador_manos.reiniciar()
             return puntos_rostro, False, dibujar_bosquejo
 
+    def registrar_manos(self, puntos_manos: dict, exito_manos: bool):
+        self.planificador_manos.registrar(exito_manos)
+        self.manos_recientes = puntos_manos if exito_manos else None
+        self.edad_manos = 0
+
+    def reutilizar_manos(self) -> Tuple[dict, bool]:
+        # cuadro sin inferencia de manos: las últimas detectadas siguen valiendo EDAD_MAXIMA_MANOS
+        # cuadros, así un frotamiento no se corta en los cuadros que el planificador omite
+        self.edad_manos += 1
+        if self.manos_recientes is None or self.edad_manos > self.EDAD_MAXIMA_MANOS:
+            self.manos_recientes = None
+            self.manos.puntos_manos = []
+            return {}, False
+        return self.manos_recientes, True
+
+    def lanzar_inferencia_manos(self, imagen_rostro: np.ndarray) -> Optional[Tuple[Optional[Region], Future]]:
+        # con ejecutor, las manos se infieren en paralelo con el rostro; el planificador y el recorte
+        # usan la malla y la región del cuadro anterior, así que sin rostro previo no se lanza
+        malla_anterior = self.malla_rostro.puntos_malla
+        if self.ejecutor_manos is None or malla_anterior is None:
+            return None
+        if not self.planificador_manos.debe_inferir(imagen_rostro, malla_anterior,
+                                                     self.malla_rostro.extractor.INDICES_OJOS):
+            return None
+        region = self.seguidor_region.region if self.seguidor_region is not None else None
+        return region, self.ejecutor_manos.submit(self.manos.inferir, imagen_rostro, region)
+
+    def procesar_rostro(self, imagen_rostro: np.ndarray, dibujar: bool):
+        # malla en la región del cuadro anterior; si ahí no aparece el rostro, en el cuadro completo
+        region = self.seguidor_region.region if self.seguidor_region is not None else None
+        inferencia = self.malla_rostro.inferencia
+        if region != self.region_anterior and self.malla_rostro.puntos_malla is not None and not inferencia.modo_estatico:
+            # el seguimiento de MediaPipe guarda la posición en coordenadas de la entrada anterior
+            inferencia.reiniciar()
+        self.region_anterior = region
+        puntos_rostro, exito_malla, bosquejo = self.malla_rostro.procesar(imagen_rostro, dibujar, region)
+        if not exito_malla and region is not None:
+            self.seguidor_region.reiniciar()
+            region = self.region_anterior = None
+            puntos_rostro, exito_malla, bosquejo = self.malla_rostro.procesar(imagen_rostro, dibujar)
+        if exito_malla and self.seguidor_region is not None:
+            self.seguidor_region.actualizar(self.malla_rostro.puntos_malla, imagen_rostro.shape)
+        return puntos_rostro, exito_malla, bosquejo, region
+
+    def cargar_landmarks(self, malla: Optional[np.ndarray], manos: Optional[np.ndarray]) -> Tuple[dict, bool]:
+        # landmarks ya calculados por el cliente: malla (N, 2|3) y manos (M, 21, 2|3) en píxeles;
+        # mismo diccionario de puntos que procesar() pero sin inferencia
+        if malla is None or len(malla) == 0:
+            self.malla_rostro.puntos_malla = None
+            self.manos.puntos_manos = []
+            return {}, False
+        malla = self.a_puntos_3d(malla)
+        self.malla_rostro.puntos_malla = malla
+        extractor_rostro = self.malla_rostro.extractor
+        puntos = {
+            'ojos': extractor_rostro.obtener_puntos_ojos(malla),
+            'boca': extractor_rostro.obtener_puntos_boca(malla),
+            'cabeza': extractor_rostro.obtener_puntos_cabeza(malla),
+        }
+        manos = [] if manos is None else [self.a_puntos_3d(mano) for mano in manos[:2]]
+        for nombre, mano in zip(('primera_mano', 'segunda_mano'), manos):
+            puntos[nombre] = self.manos.extractor.obtener_puntos_mano(mano)
+        self.manos.puntos_manos = manos
+        return puntos, True
+
+    @staticmethod
+    def a_puntos_3d(puntos: np.ndarray) -> np.ndarray:
+        # (K, 3) float32 como los extractores; z = 0 si el cliente solo envía x, y
+        puntos = np.asarray(puntos, dtype=np.float32)
+        if puntos.shape[-1] == 3:
+            return puntos
+        return np.concatenate([puntos, np.zeros((len(puntos), 1), dtype=np.float32)], axis=1)
+
+    def obtener_vectores(self, escala: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+        # coordenadas del último cuadro cuantizadas a int16: malla (N, 2) y manos (M, 21, 2);
+        # escala: imagen procesada / cuadro recibido, los puntos vuelven a la resolución del cliente
+        malla = self.malla_rostro.puntos_malla
+        malla = malla[:, :2] if malla is not None else np.empty((0, 2), dtype=np.float32)
+        manos = np.asarray(self.manos.puntos_manos, dtype=np.float32).reshape(-1, 21, 3)[:, :, :2]
+        if escala != 1.0:
+            malla, manos = malla / escala, manos / escala
+        limite = np.iinfo(np.int16)
+        return (np.clip(malla, limite.min, limite.max).astype(np.int16),
+                np.clip(manos, limite.min, limite.max).astype(np.int16))
+
     def fusionar_puntos(self, puntos_rostro: dict, puntos_manos: dict) -> dict:
         puntos_fusionados = {**puntos_rostro, **puntos_manos}
         return puntos_fusionados
\ No newline at end of file
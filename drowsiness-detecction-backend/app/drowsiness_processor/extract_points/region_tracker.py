@@ -0,0 +1,63 @@
+import numpy as np
+from typing import Optional, Tuple
+
+Region = Tuple[int, int, int, int]
+
+
+class SeguidorRegionRostro:
+    """
+    Región de interés alrededor del último rostro detectado.
+
+    La inferencia de rostro y manos recibe solo un recorte con margen
+    alrededor de la malla del cuadro anterior (el margen cubre las manos
+    al frotar los ojos); los landmarks se devuelven al sistema de
+    coordenadas del cuadro completo. La región solo se mueve cuando el
+    rostro se acerca a su borde o cambia mucho de tamaño, para que el
+    seguimiento de MediaPipe trabaje en coordenadas estables. Si en el
+    recorte no se encuentra el rostro se vuelve al cuadro completo.
+    """
+
+    def __init__(self, margen: float = 0.75, fraccion_maxima: float = 0.6):
+        # margen: fracción del tamaño del rostro que se añade por cada lado
+        # fraccion_maxima: si el recorte cubre más que esto del cuadro no compensa recortar
+        self.margen = margen
+        self.fraccion_maxima = fraccion_maxima
+        self.region: Optional[Region] = None
+
+    def reiniciar(self):
+        self.region = None
+
+    def actualizar(self, malla: np.ndarray, forma: Tuple[int, ...]) -> bool:
+        # región para el siguiente cuadro a partir de la malla en coordenadas del cuadro completo;
+        # devuelve True si la región cambió
+        alto, ancho = forma[:2]
+        x0, y0 = malla[:, :2].min(axis=0)
+        x1, y1 = malla[:, :2].max(axis=0)
+        tamano = max(x1 - x0, y1 - y0, 1.0)
+
+        if self.region is not None:
+            rx0, ry0, rx1, ry1 = self.region
+            holgura = tamano * self.margen / 2
+            dentro = (x0 - holgura >= rx0 or rx0 == 0) and (y0 - holgura >= ry0 or ry0 == 0) and \
+                     (x1 + holgura <= rx1 or rx1 == ancho) and (y1 + holgura <= ry1 or ry1 == alto)
+            # el rostro sigue dentro con holgura y no se alejó de la cámara: se conserva la región
+            if dentro and tamano * (1 + 2 * self.margen) > 0.6 * max(rx1 - rx0, ry1 - ry0):
+                return False
+
+        lado = tamano * (1 + 2 * self.margen)
+        centro_x, centro_y = (x0 + x1) / 2, (y0 + y1) / 2
+        region = (int(max(centro_x - lado / 2, 0)), int(max(centro_y - lado / 2, 0)),
+                  int(min(centro_x + lado / 2, ancho)), int(min(centro_y + lado / 2, alto)))
+        if (region[2] - region[0]) * (region[3] - region[1]) > self.fraccion_maxima * ancho * alto:
+            region = None
+        cambio = region != self.region
+        self.region = region
+        return cambio
+
+    @staticmethod
+    def recortar(imagen: np.ndarray, region: Optional[Region]) -> np.ndarray:
+        # vista sin copia; OpenCV y MediaPipe la leen con su paso de fila
+        if region is None:
+            return imagen
+        x0, y0, x1, y1 = region
+        return imagen[y0:y1, x0:x1]
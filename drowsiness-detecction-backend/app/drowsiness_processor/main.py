@@ -1,36 +1,143 @@
 import numpy as np
 import base64
-import cv2
+import time
+from concurrent.futures import Executor
+from typing import Union, Optional, Tuple, Dict
 
 from app.drowsiness_processor.extract_points.point_extractor import ExtractorPuntos
+from app.drowsiness_processor.extract_points.inference_pool import MotorInferencia
+from app.drowsiness_processor.extract_points.hands.hands_scheduler import PlanificadorManos
+from app.drowsiness_processor.extract_points.region_tracker import SeguidorRegionRostro
+from app.drowsiness_processor.extract_points.image_scaling import Dimensiones, decodificar_imagen, reducir_imagen
+from app.drowsiness_processor.quality_levels import NIVELES_CALIDAD, NivelCalidad
 from app.drowsiness_processor.data_processing.main import ProcesamientoPuntos
 from app.drowsiness_processor.drowsiness_features.processing import ProcesamientoCaracteristicasSomnolencia
 from app.drowsiness_processor.visualization.main import VisualizadorReporte
 from app.drowsiness_processor.reports.main import ReportesSomnolencia
 
 
+ARCHIVO_REPORTE = 'app/drowsiness_processor/reports/august/drowsiness_report.csv'
+
+
 class SistemaDeteccionSomnolencia:
-    def __init__(self):
-        self.extractor_puntos = ExtractorPuntos()
+    def __init__(self, motor: Optional[MotorInferencia] = None, archivo_reporte: str = ARCHIVO_REPORTE,
+                 planificador_manos: Optional[PlanificadorManos] = None,
+                 seguidor_region: Optional[SeguidorRegionRostro] = None, lado_maximo: int = 0,
+                 ejecutor_manos: Optional[Executor] = None, reportes: Optional[ReportesSomnolencia] = None):
+        # sin motor se crea uno propio en el primer cuadro; con pool se asigna uno compartido
+        self.extractor_puntos = ExtractorPuntos(motor, planificador_manos, seguidor_region, ejecutor_manos)
         self.procesamiento_puntos = ProcesamientoPuntos()
         self.procesamiento_caracteristicas = ProcesamientoCaracteristicasSomnolencia()
         self.visualizador = VisualizadorReporte()
-        self.reportes = ReportesSomnolencia('app/drowsiness_processor/reports/august/drowsiness_report.csv')
-        self.reporte_json: dict = {}
-
-    def ejecutar(self, imagen_base64: str):
-        # decodificar base64
-        bytes_imagen = base64.b64decode(imagen_base64)
-        # convertir bytes a imagen OpenCV
-        imagen = cv2.imdecode(np.frombuffer(bytes_imagen, np.uint8), cv2.IMREAD_COLOR)
-        return self.procesamiento_cuadro(imagen)
-
-    def procesamiento_cuadro(self, imagen_rostro: np.ndarray):
-        puntos_clave, control_proceso, bosquejo = self.extractor_puntos.procesar(imagen_rostro)
+        # el monitoreo pasa reportes con el escritor de eventos de la sesión; sin ellos, CSV en archivo_reporte
+        self.reportes = reportes if reportes is not None else ReportesSomnolencia(archivo_reporte)
+        # último reporte (generar_reporte); sin rostro se conserva el anterior
+        self.reporte: dict = {}
+        self.alarma: bool = False
+        self.ultima_marca_tiempo: float = 0.0
+        # duración en segundos de cada etapa del último cuadro (solo las que se ejecutaron)
+        self.tiempos_etapas: Dict[str, float] = {}
+        self.rostro_detectado: bool = False
+        # lado mayor de la imagen procesada (0: resolución del cliente); los cuadros más grandes se reducen
+        self.lado_maximo = lado_maximo
+        # escalón de calidad actual; los valores configurados son los del nivel completo
+        self.calidad: NivelCalidad = NIVELES_CALIDAD[0]
+        self.lado_maximo_base = lado_maximo
+        self.intervalo_manos_base = self.extractor_puntos.planificador_manos.intervalo
+        # tamaño del cuadro recibido y factor procesada / recibida, para devolver los puntos en su escala
+        self.dimensiones_originales: Optional[Dimensiones] = None
+        self.escala: float = 1.0
+
+    def aplicar_calidad(self, calidad: NivelCalidad):
+        # cambia resolución, modelos y frecuencia de manos desde el siguiente cuadro
+        if calidad is self.calidad:
+            return
+        self.calidad = calidad
+        self.lado_maximo = calidad.lado_maximo(self.lado_maximo_base)
+        self.extractor_puntos.configurar_modelos(calidad.refinar_malla, calidad.complejidad_manos)
+        self.extractor_puntos.planificador_manos.intervalo = calidad.intervalo_manos(self.intervalo_manos_base)
+
+    def ejecutar(self, datos_imagen: Union[str, bytes, bytearray, memoryview], dibujar: bool = True,
+                 marca_tiempo: Optional[float] = None):
+        # texto: JPEG en base64 (protocolo original); binario: bytes JPEG crudos
+        inicio = time.perf_counter()
+        if isinstance(datos_imagen, str):
+            datos_imagen = base64.b64decode(datos_imagen)
+        # convertir bytes a imagen OpenCV sin copiar el buffer recibido; los JPEG grandes se decodifican reducidos
+        imagen, dimensiones = decodificar_imagen(np.frombuffer(datos_imagen, np.uint8), self.lado_maximo)
+        decodificacion = time.perf_counter() - inicio
+        resultado = self.procesamiento_cuadro(imagen, dibujar, marca_tiempo, dimensiones)
+        self.tiempos_etapas['decodificacion'] = decodificacion
+        return resultado
+
+    def marcar_etapa(self, etapa: str, inicio: float) -> float:
+        ahora = time.perf_counter()
+        self.tiempos_etapas[etapa] = ahora - inicio
+        return ahora
+
+    def ajustar_marca_tiempo(self, marca_tiempo: Optional[float]) -> float:
+        # marca_tiempo: segundos epoch de la captura (cliente o reproducción); sin ella, el reloj local
+        marca_tiempo = time.time() if marca_tiempo is None else marca_tiempo
+        # las duraciones nunca son negativas aunque el reloj de origen retroceda
+        self.ultima_marca_tiempo = max(marca_tiempo, self.ultima_marca_tiempo)
+        return self.ultima_marca_tiempo
+
+    def procesamiento_cuadro(self, imagen_rostro: np.ndarray, dibujar: bool = True,
+                             marca_tiempo: Optional[float] = None, dimensiones_originales: Optional[Dimensiones] = None):
+        # sin dibujar no se genera el bosquejo (None) pero el estado se actualiza igual;
+        # la imagen devuelta y el bosquejo quedan en la resolución procesada
+        marca_tiempo = self.ajustar_marca_tiempo(marca_tiempo)
+        self.dimensiones_originales = dimensiones_originales or (imagen_rostro.shape[1], imagen_rostro.shape[0])
+        imagen_rostro = reducir_imagen(imagen_rostro, self.lado_maximo)
+        self.escala = imagen_rostro.shape[1] / self.dimensiones_originales[0]
+        self.alarma = False
+        self.tiempos_etapas = {}
+        inicio = time.perf_counter()
+        puntos_clave, control_proceso, bosquejo = self.extractor_puntos.procesar(imagen_rostro, dibujar)
+        self.rostro_detectado = control_proceso
+        inicio = self.marcar_etapa('extraccion', inicio)
+        if control_proceso:
+            bosquejo = self.analizar_puntos(puntos_clave, bosquejo, dibujar, marca_tiempo, inicio)
+        return imagen_rostro, bosquejo, self.reporte
+
+    def procesamiento_landmarks(self, malla_rostro: Optional[np.ndarray], manos: Optional[np.ndarray],
+                                marca_tiempo: Optional[float] = None):
+        # landmarks calculados en el dispositivo del cliente: sin imagen ni inferencia
+        marca_tiempo = self.ajustar_marca_tiempo(marca_tiempo)
+        self.dimensiones_originales = None
+        self.escala = 1.0
+        self.alarma = False
+        self.tiempos_etapas = {}
+        inicio = time.perf_counter()
+        puntos_clave, control_proceso = self.extractor_puntos.cargar_landmarks(malla_rostro, manos)
+        self.rostro_detectado = control_proceso
+        inicio = self.marcar_etapa('extraccion', inicio)
         if control_proceso:
-            puntos_procesados = self.procesamiento_puntos.principal(puntos_clave)
-            caracteristicas_somnolencia_procesadas = self.procesamiento_caracteristicas.principal(puntos_procesados)
-            bosquejo = self.visualizador.visualizar_todos_reportes(bosquejo, caracteristicas_somnolencia_procesadas)
-            self.reportes.principal(caracteristicas_somnolencia_procesadas)
-            self.reporte_json = self.reportes.generar_reporte_json(caracteristicas_somnolencia_procesadas)
-        return imagen_rostro, bosquejo, self.reporte_json
\ No newline at end of file
+            self.analizar_puntos(puntos_clave, None, False, marca_tiempo, inicio)
+        return self.reporte
+
+    def analizar_puntos(self, puntos_clave: dict, bosquejo: Optional[np.ndarray], dibujar: bool,
+                        marca_tiempo: float, inicio: float) -> Optional[np.ndarray]:
+        puntos_procesados = self.procesamiento_puntos.principal(puntos_clave)
+        inicio = self.marcar_etapa('mediciones', inicio)
+        caracteristicas_somnolencia_procesadas = self.procesamiento_caracteristicas.principal(
+            puntos_procesados, marca_tiempo
+        )
+        inicio = self.marcar_etapa('caracteristicas', inicio)
+        if dibujar:
+            bosquejo = self.visualizador.visualizar_todos_reportes(
+                bosquejo, caracteristicas_somnolencia_procesadas, marca_tiempo
+            )
+        else:
+            self.visualizador.actualizar_todos_reportes(caracteristicas_somnolencia_procesadas, marca_tiempo)
+        inicio = self.marcar_etapa('visualizacion', inicio)
+        self.reportes.principal(caracteristicas_somnolencia_procesadas, marca_tiempo)
+        self.alarma = self.reportes.hay_alarma(caracteristicas_somnolencia_procesadas)
+        self.reporte = self.reportes.generar_reporte(caracteristicas_somnolencia_procesadas, marca_tiempo)
+        self.marcar_etapa('reportes', inicio)
+        return bosquejo
+
+    def obtener_overlay_vectorial(self) -> Tuple[np.ndarray, np.ndarray, dict]:
+        # alternativa al bosquejo: puntos cuantizados (en píxeles del cuadro recibido) y estado de las advertencias
+        malla_rostro, manos = self.extractor_puntos.obtener_vectores(self.escala)
+        return malla_rostro, manos, self.visualizador.obtener_estado_overlay()
\ No newline at end of file
@@ -0,0 +1,45 @@
+from typing import Tuple
+
+# lado mayor de referencia cuando la resolución completa no tiene límite
+LADO_REFERENCIA = 640
+
+
+class NivelCalidad:
+    """
+    Configuración del pipeline para un escalón de calidad.
+
+    Los niveles son acumulativos: cada uno conserva las reducciones del
+    anterior y agrega una. El nivel lo elige el controlador de carga del
+    servidor (ver app/services/monitoring_quality.py).
+    """
+
+    def __init__(self, nombre: str, factor_resolucion: float = 1.0, refinar_malla: bool = True,
+                 complejidad_manos: int = 1, factor_intervalo_manos: int = 1, bosquejo: bool = True):
+        self.nombre = nombre
+        self.factor_resolucion = factor_resolucion
+        self.refinar_malla = refinar_malla
+        self.complejidad_manos = complejidad_manos
+        self.factor_intervalo_manos = factor_intervalo_manos
+        self.bosquejo = bosquejo
+
+    def lado_maximo(self, lado_base: int) -> int:
+        # lado_base 0 (sin límite) solo se conserva a resolución completa
+        if self.factor_resolucion >= 1.0:
+            return lado_base
+        return int((lado_base or LADO_REFERENCIA) * self.factor_resolucion)
+
+    def intervalo_manos(self, intervalo_base: int) -> int:
+        return intervalo_base * self.factor_intervalo_manos
+
+
+NIVELES_CALIDAD: Tuple[NivelCalidad, ...] = (
+    NivelCalidad('completa'),
+    NivelCalidad('resolucion_reducida', factor_resolucion=0.75),
+    NivelCalidad('malla_sin_iris', factor_resolucion=0.75, refinar_malla=False),
+    NivelCalidad('manos_livianas', factor_resolucion=0.75, refinar_malla=False, complejidad_manos=0),
+    NivelCalidad('manos_espaciadas', factor_resolucion=0.75, refinar_malla=False, complejidad_manos=0,
+                 factor_intervalo_manos=3),
+    NivelCalidad('sin_bosquejo', factor_resolucion=0.75, refinar_malla=False, complejidad_manos=0,
+                 factor_intervalo_manos=3, bosquejo=False),
+)
+NIVEL_MAXIMO = len(NIVELES_CALIDAD) - 1
@@ -0,0 +1,226 @@
+import csv
+import io
+import json
+import os
+import queue
+import threading
+import time
+import logging as log
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional
+
+logger = log.getLogger(__name__)
+
+Fila = dict
+
+# separador de grupos de columnas del CSV original; no forma parte de la fila
+SEPARADOR = '|'
+
+
+class SumideroEventos(ABC):
+    """
+    Destino de las filas de eventos de somnolencia.
+
+    ``escribir`` recibe un lote completo y se llama siempre desde un único
+    hilo (el de EscritorEventos, o el del sistema sin escritor), así que
+    los sumideros no necesitan candados.
+    """
+
+    @abstractmethod
+    def escribir(self, filas: List[Fila]):
+        raise NotImplementedError
+
+    def cerrar(self):
+        pass
+
+
+class SumideroArchivoRotativo(SumideroEventos):
+    # texto por lotes en un archivo que se rota al superar max_bytes: ruta -> ruta.1 -> ... -> ruta.<copias>
+    def __init__(self, ruta: str, max_bytes: int = 0, copias: int = 5):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self.copias = copias
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        if not os.path.exists(ruta):
+            self.crear_archivo()
+
+    def cabecera(self) -> str:
+        return ''
+
+    @abstractmethod
+    def formatear(self, filas: List[Fila]) -> str:
+        raise NotImplementedError
+
+    def crear_archivo(self):
+        with open(self.ruta, mode='w', newline='', encoding='utf-8') as archivo:
+            archivo.write(self.cabecera())
+
+    def escribir(self, filas: List[Fila]):
+        # un solo write por lote; el archivo se abre y cierra por lote para tolerar logrotate externo
+        with open(self.ruta, mode='a', newline='', encoding='utf-8') as archivo:
+            archivo.write(self.formatear(filas))
+            tamano = archivo.tell()
+        if 0 < self.max_bytes <= tamano:
+            self.rotar()
+
+    def rotar(self):
+        for indice in range(self.copias - 1, 0, -1):
+            origen = f'{self.ruta}.{indice}'
+            if os.path.exists(origen):
+                os.replace(origen, f'{self.ruta}.{indice + 1}')
+        if self.copias > 0:
+            os.replace(self.ruta, f'{self.ruta}.1')
+        self.crear_archivo()
+
+
+class SumideroCSV(SumideroArchivoRotativo):
+    # mismas columnas y formato que el reporte CSV original, con las claves de sesión delante
+    def __init__(self, ruta: str, campos: List[str], max_bytes: int = 0, copias: int = 5):
+        self.campos = campos
+        super().__init__(ruta, max_bytes, copias)
+
+    def cabecera(self) -> str:
+        salida = io.StringIO()
+        csv.DictWriter(salida, fieldnames=self.campos).writeheader()
+        return salida.getvalue()
+
+    def formatear(self, filas: List[Fila]) -> str:
+        salida = io.StringIO()
+        escritor = csv.DictWriter(salida, fieldnames=self.campos, extrasaction='ignore')
+        for fila in filas:
+            escritor.writerow(dict(fila, **{
+                'marca_tiempo': datetime.fromtimestamp(fila['marca_tiempo']).strftime('%Y-%m-%d %H:%M:%S'),
+                SEPARADOR: SEPARADOR
+            }))
+        return salida.getvalue()
+
+
+class SumideroNDJSON(SumideroArchivoRotativo):
+    # un objeto JSON por línea; marca_tiempo en segundos epoch
+    def formatear(self, filas: List[Fila]) -> str:
+        return ''.join(json.dumps(fila, ensure_ascii=False) + '\n' for fila in filas)
+
+
+class SumideroBaseDatos(SumideroEventos):
+    """
+    Inserción por lotes en una tabla de SQLAlchemy.
+
+    Cada lote es un único INSERT de varias filas en su propia transacción;
+    ``convertir`` transforma una fila de eventos en los registros de la
+    tabla (puede devolver varios o ninguno). Si la base de datos falla el
+    lote se pierde y se registra el error: el monitoreo no se detiene.
+    """
+
+    def __init__(self, fabrica_sesiones: Callable, tabla, convertir: Callable[[Fila], Iterable[dict]]):
+        self.fabrica_sesiones = fabrica_sesiones
+        self.tabla = tabla
+        self.convertir = convertir
+
+    def escribir(self, filas: List[Fila]):
+        from sqlalchemy import insert
+
+        registros = [registro for fila in filas for registro in self.convertir(fila)]
+        if not registros:
+            return
+        sesion = self.fabrica_sesiones()
+        try:
+            sesion.execute(insert(self.tabla), registros)
+            sesion.commit()
+        except Exception:
+            sesion.rollback()
+            raise
+        finally:
+            sesion.close()
+
+
+_FIN = object()
+
+
+class EscritorEventos:
+    """
+    Escritor en segundo plano de las filas de eventos.
+
+    ``registrar`` solo encola la fila (nunca bloquea el procesamiento de
+    cuadros); un hilo propio las agrupa y las escribe en todos los
+    sumideros cuando el lote llega a ``tamano_lote`` filas o cuando la
+    fila más antigua lleva ``intervalo`` segundos esperando. Con la cola
+    llena las filas nuevas se descartan y se cuentan en ``descartadas``.
+    Un escritor por proceso, compartido por todas sus sesiones.
+    """
+
+    def __init__(self, sumideros: List[SumideroEventos], tamano_lote: int = 100, intervalo: float = 1.0,
+                 capacidad: int = 10000):
+        self.sumideros = list(sumideros)
+        self.tamano_lote = max(tamano_lote, 1)
+        self.intervalo = intervalo
+        self.cola: queue.Queue = queue.Queue(capacidad)
+        self.escritas = 0
+        self.descartadas = 0
+        self.lotes = 0
+        self.errores = 0
+        self.hilo: Optional[threading.Thread] = threading.Thread(
+            target=self.ejecutar, name='eventos-somnolencia', daemon=True)
+        self.hilo.start()
+
+    def registrar(self, fila: Fila):
+        try:
+            self.cola.put_nowait(fila)
+        except queue.Full:
+            self.descartadas += 1
+
+    def ejecutar(self):
+        lote: List[Fila] = []
+        limite = 0.0
+        while True:
+            try:
+                # sin lote pendiente se espera sin límite; con lote, hasta que venza su intervalo
+                fila = self.cola.get(timeout=max(limite - time.monotonic(), 0) if lote else None)
+            except queue.Empty:
+                fila = None
+            if fila is _FIN:
+                self.volcar(lote)
+                return
+            if fila is not None:
+                if not lote:
+                    limite = time.monotonic() + self.intervalo
+                lote.append(fila)
+            if len(lote) >= self.tamano_lote or (lote and time.monotonic() >= limite):
+                self.volcar(lote)
+                lote = []
+
+    def volcar(self, lote: List[Fila]):
+        if not lote:
+            return
+        for sumidero in self.sumideros:
+            try:
+                sumidero.escribir(lote)
+            except Exception as e:
+                self.errores += 1
+                # solo la primera línea: los errores de la BD incluyen los parámetros de todo el lote
+                logger.error(f'Error al escribir {len(lote)} eventos en {type(sumidero).__name__}: '
+                             f'{str(e).splitlines()[0] if str(e) else type(e).__name__}')
+        self.escritas += len(lote)
+        self.lotes += 1
+
+    def cerrar(self, tiempo_espera: float = 5.0):
+        # escribe lo pendiente y detiene el hilo; las filas registradas después se descartan
+        if self.hilo is None:
+            return
+        try:
+            self.cola.put(_FIN, timeout=tiempo_espera)
+            self.hilo.join(tiempo_espera)
+        except queue.Full:
+            logger.warning('Cola de eventos llena al cerrar: se pierden las filas pendientes')
+        self.hilo = None
+        for sumidero in self.sumideros:
+            sumidero.cerrar()
+
+    def estadisticas(self) -> dict:
+        return {
+            'escritas': self.escritas,
+            'pendientes': self.cola.qsize(),
+            'descartadas': self.descartadas,
+            'lotes': self.lotes,
+            'errores': self.errores,
+        }
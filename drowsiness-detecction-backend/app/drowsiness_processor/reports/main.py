@@ -1,96 +1,122 @@
-import csv
-import os
 import json
 from datetime import datetime
+from typing import Optional
 
+from app.drowsiness_processor.reports.event_writer import EscritorEventos, SumideroCSV, SEPARADOR
 
-class ReportesSomnolencia:
-    def __init__(self, nombre_archivo: str):
-        self.nombre_archivo = nombre_archivo
-        self.campos = ['marca_tiempo', 'reporte_frotamiento_ojos_primera_mano', 'conteo_frotamiento_ojos_primera_mano',
-                       'duraciones_frotamiento_ojos_primera_mano', '|',
-                       'reporte_frotamiento_ojos_segunda_mano', 'conteo_frotamiento_ojos_segunda_mano', 'duraciones_frotamiento_ojos_segunda_mano', '|',
-                       'reporte_parpadeo', 'conteo_parpadeo', '|',
-                       'reporte_microsueno', 'conteo_microsueno', 'duraciones_microsueno', '|',
-                       'reporte_inclinacion', 'conteo_inclinacion', 'duraciones_inclinacion', '|',
-                       'reporte_bostezo', 'conteo_bostezo', 'duraciones_bostezo']
 
-        if not os.path.exists(self.nombre_archivo):
-            self.crear_archivo_csv()
+# columnas del reporte CSV; '|' separa los grupos de cada detector
+CAMPOS_REPORTE = ['marca_tiempo', 'reporte_frotamiento_ojos_primera_mano', 'conteo_frotamiento_ojos_primera_mano',
+                  'duraciones_frotamiento_ojos_primera_mano', SEPARADOR,
+                  'reporte_frotamiento_ojos_segunda_mano', 'conteo_frotamiento_ojos_segunda_mano', 'duraciones_frotamiento_ojos_segunda_mano', SEPARADOR,
+                  'reporte_parpadeo', 'conteo_parpadeo', SEPARADOR,
+                  'reporte_microsueno', 'conteo_microsueno', 'duraciones_microsueno', SEPARADOR,
+                  'reporte_inclinacion', 'conteo_inclinacion', 'duraciones_inclinacion', SEPARADOR,
+                  'reporte_bostezo', 'conteo_bostezo', 'duraciones_bostezo']
+# claves que identifican de qué sesión, conductor y viaje es cada fila de eventos
+CAMPOS_CLAVE = ['id_sesion', 'id_chofer', 'id_viaje']
+
 
-    def crear_archivo_csv(self):
-        with open(self.nombre_archivo, mode='w', newline='') as archivo:
-            escritor = csv.DictWriter(archivo, fieldnames=self.campos)
-            escritor.writeheader()
+class ReportesSomnolencia:
+    def __init__(self, nombre_archivo: Optional[str] = None, escritor: Optional[EscritorEventos] = None,
+                 id_sesion: Optional[str] = None, id_chofer: Optional[int] = None, id_viaje: Optional[int] = None):
+        # con escritor las filas se encolan con las claves de la sesión y se escriben en segundo plano;
+        # sin él se añaden en el momento al CSV nombre_archivo (lotes de videos, pruebas)
+        self.nombre_archivo = nombre_archivo
+        self.escritor = escritor
+        self.claves = {'id_sesion': id_sesion, 'id_chofer': id_chofer, 'id_viaje': id_viaje}
+        self.campos = CAMPOS_REPORTE
+        self.sumidero = SumideroCSV(nombre_archivo, CAMPOS_REPORTE) if escritor is None and nombre_archivo else None
 
-    def principal(self, datos_reporte: dict):
+    def principal(self, datos_reporte: dict, marca_tiempo: float):
         if (datos_reporte['frotamiento_ojos_primera_mano']['reporte_frotamiento_ojos'] or
                 datos_reporte['frotamiento_ojos_segunda_mano']['reporte_frotamiento_ojos'] or
                 datos_reporte['parpadeo_y_microsueno']['reporte_parpadeo'] or
                 datos_reporte['parpadeo_y_microsueno']['reporte_microsueno'] or
                 datos_reporte['inclinacion']['reporte_inclinacion'] or
                 datos_reporte['bostezo']['reporte_bostezo']):
-            fila = {
-                'marca_tiempo': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'reporte_frotamiento_ojos_primera_mano': datos_reporte.get('frotamiento_ojos_primera_mano', {}).get('reporte_frotamiento_ojos', False),
-                'conteo_frotamiento_ojos_primera_mano': datos_reporte.get('frotamiento_ojos_primera_mano', {}).get('conteo_frotamiento_ojos', 0),
-                'duraciones_frotamiento_ojos_primera_mano': datos_reporte.get('frotamiento_ojos_primera_mano', {}).get('duraciones_frotamiento_ojos', []),
-                '|': '|',
-                'reporte_frotamiento_ojos_segunda_mano': datos_reporte.get('frotamiento_ojos_segunda_mano', {}).get('reporte_frotamiento_ojos', False),
-                'conteo_frotamiento_ojos_segunda_mano': datos_reporte.get('frotamiento_ojos_segunda_mano', {}).get('conteo_frotamiento_ojos', 0),
-                'duraciones_frotamiento_ojos_segunda_mano': datos_reporte.get('frotamiento_ojos_segunda_mano', {}).get('duraciones_frotamiento_ojos', []),
-                '|': '|',
-                'reporte_parpadeo': datos_reporte.get('parpadeo_y_microsueno', {}).get('reporte_parpadeo', False),
-                'conteo_parpadeo': datos_reporte.get('parpadeo_y_microsueno', {}).get('conteo_parpadeos', 0),
-                '|': '|',
-                'reporte_microsueno': datos_reporte.get('parpadeo_y_microsueno', {}).get('reporte_microsueno', False),
-                'conteo_microsueno': datos_reporte.get('parpadeo_y_microsueno', {}).get('conteo_microsueno', 0),
-                'duraciones_microsueno': datos_reporte.get('parpadeo_y_microsueno', {}).get('duraciones_microsueno', []),
-                '|': '|',
-                'reporte_inclinacion': datos_reporte.get('inclinacion', {}).get('reporte_inclinacion', False),
-                'conteo_inclinacion': datos_reporte.get('inclinacion', {}).get('conteo_inclinacion', 0),
-                'duraciones_inclinacion': datos_reporte.get('inclinacion', {}).get('duraciones_inclinacion', []),
-                '|': '|',
-                'reporte_bostezo': datos_reporte.get('bostezo', {}).get('reporte_bostezo', False),
-                'conteo_bostezo': datos_reporte.get('bostezo', {}).get('conteo_bostezo', 0),
-                'duraciones_bostezo': datos_reporte.get('bostezo', {}).get('duraciones_bostezo', [])
-            }
+            fila = self.crear_fila(datos_reporte, marca_tiempo)
+            if self.escritor is not None:
+                self.escritor.registrar(fila)
+            elif self.sumidero is not None:
+                self.sumidero.escribir([fila])
+
+    def crear_fila(self, datos_reporte: dict, marca_tiempo: float) -> dict:
+        # los detectores arman listas de duraciones nuevas en cada reporte (acotadas): no hace falta copiarlas;
+        # eventos_*: (número, marca de tiempo, duración) de cada evento reportado, para eventos_somnolencia (no van al CSV)
+        return {
+            **self.claves,
+            'marca_tiempo': round(marca_tiempo, 3),
+            'reporte_frotamiento_ojos_primera_mano': datos_reporte.get('frotamiento_ojos_primera_mano', {}).get('reporte_frotamiento_ojos', False),
+            'conteo_frotamiento_ojos_primera_mano': datos_reporte.get('frotamiento_ojos_primera_mano', {}).get('conteo_frotamiento_ojos', 0),
+            'duraciones_frotamiento_ojos_primera_mano': datos_reporte.get('frotamiento_ojos_primera_mano', {}).get('duraciones_frotamiento_ojos', []),
+            'eventos_frotamiento_ojos_primera_mano': datos_reporte.get('frotamiento_ojos_primera_mano', {}).get('eventos_frotamiento_ojos', []),
+            'reporte_frotamiento_ojos_segunda_mano': datos_reporte.get('frotamiento_ojos_segunda_mano', {}).get('reporte_frotamiento_ojos', False),
+            'conteo_frotamiento_ojos_segunda_mano': datos_reporte.get('frotamiento_ojos_segunda_mano', {}).get('conteo_frotamiento_ojos', 0),
+            'duraciones_frotamiento_ojos_segunda_mano': datos_reporte.get('frotamiento_ojos_segunda_mano', {}).get('duraciones_frotamiento_ojos', []),
+            'eventos_frotamiento_ojos_segunda_mano': datos_reporte.get('frotamiento_ojos_segunda_mano', {}).get('eventos_frotamiento_ojos', []),
+            'reporte_parpadeo': datos_reporte.get('parpadeo_y_microsueno', {}).get('reporte_parpadeo', False),
+            'conteo_parpadeo': datos_reporte.get('parpadeo_y_microsueno', {}).get('conteo_parpadeo', 0),
+            'eventos_parpadeo': datos_reporte.get('parpadeo_y_microsueno', {}).get('eventos_parpadeo', []),
+            'reporte_microsueno': datos_reporte.get('parpadeo_y_microsueno', {}).get('reporte_microsueno', False),
+            'conteo_microsueno': datos_reporte.get('parpadeo_y_microsueno', {}).get('conteo_microsueno', 0),
+            'duraciones_microsueno': datos_reporte.get('parpadeo_y_microsueno', {}).get('duraciones_microsueno', []),
+            'eventos_microsueno': datos_reporte.get('parpadeo_y_microsueno', {}).get('eventos_microsueno', []),
+            'reporte_inclinacion': datos_reporte.get('inclinacion', {}).get('reporte_inclinacion', False),
+            'conteo_inclinacion': datos_reporte.get('inclinacion', {}).get('conteo_inclinacion', 0),
+            'duraciones_inclinacion': datos_reporte.get('inclinacion', {}).get('duraciones_inclinacion', []),
+            'eventos_inclinacion': datos_reporte.get('inclinacion', {}).get('eventos_inclinacion', []),
+            'reporte_bostezo': datos_reporte.get('bostezo', {}).get('reporte_bostezo', False),
+            'conteo_bostezo': datos_reporte.get('bostezo', {}).get('conteo_bostezo', 0),
+            'duraciones_bostezo': datos_reporte.get('bostezo', {}).get('duraciones_bostezo', []),
+            'eventos_bostezo': datos_reporte.get('bostezo', {}).get('eventos_bostezo', [])
+        }
 
-            with open(self.nombre_archivo, mode='a', newline='') as archivo:
-                escritor = csv.DictWriter(archivo, fieldnames=self.campos)
-                escritor.writerow(fila)
+    def hay_alarma(self, datos_reporte: dict) -> bool:
+        # eventos que requieren alertar al conductor de inmediato
+        return bool(datos_reporte['parpadeo_y_microsueno']['reporte_microsueno'] or
+                    datos_reporte['inclinacion']['reporte_inclinacion'])
 
-    def generar_reporte_json(self, datos_reporte: dict) -> str:
-        reporte_json = {
-            'marca_tiempo': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    def generar_reporte_json(self, datos_reporte: dict, marca_tiempo: float) -> str:
+        return json.dumps(self.generar_reporte(datos_reporte, marca_tiempo))
+
+    def generar_reporte(self, datos_reporte: dict, marca_tiempo: float) -> dict:
+        # el monitoreo envía el diccionario (o solo sus cambios, ver EmisorDeltas) y lo serializa una vez al enviar;
+        # 'resumen' trae los agregados de todo el viaje (total, suma, máximo y p95 de las duraciones)
+        return {
+            'marca_tiempo': datetime.fromtimestamp(marca_tiempo).strftime('%Y-%m-%d %H:%M:%S'),
             'frotamiento_ojos_primera_mano': {
                 'reporte': datos_reporte.get('frotamiento_ojos_primera_mano', {}).get('reporte_frotamiento_ojos', False),
                 'conteo': datos_reporte.get('frotamiento_ojos_primera_mano', {}).get('conteo_frotamiento_ojos', 0),
-                'duraciones': datos_reporte.get('frotamiento_ojos_primera_mano', {}).get('duraciones_frotamiento_ojos', [])
+                'duraciones': datos_reporte.get('frotamiento_ojos_primera_mano', {}).get('duraciones_frotamiento_ojos', []),
+                'resumen': datos_reporte.get('frotamiento_ojos_primera_mano', {}).get('resumen_frotamiento_ojos', {})
             },
             'frotamiento_ojos_segunda_mano': {
                 'reporte': datos_reporte.get('frotamiento_ojos_segunda_mano', {}).get('reporte_frotamiento_ojos', False),
                 'conteo': datos_reporte.get('frotamiento_ojos_segunda_mano', {}).get('conteo_frotamiento_ojos', 0),
-                'duraciones': datos_reporte.get('frotamiento_ojos_segunda_mano', {}).get('duraciones_frotamiento_ojos', [])
+                'duraciones': datos_reporte.get('frotamiento_ojos_segunda_mano', {}).get('duraciones_frotamiento_ojos', []),
+                'resumen': datos_reporte.get('frotamiento_ojos_segunda_mano', {}).get('resumen_frotamiento_ojos', {})
             },
             'parpadeo': {
                 'reporte': datos_reporte.get('parpadeo_y_microsueno', {}).get('reporte_parpadeo', False),
-                'conteo': datos_reporte.get('parpadeo_y_microsueno', {}).get('conteo_parpadeos', 0)
+                'conteo': datos_reporte.get('parpadeo_y_microsueno', {}).get('conteo_parpadeo', 0)
             },
             'microsueno': {
                 'reporte': datos_reporte.get('parpadeo_y_microsueno', {}).get('reporte_microsueno', False),
                 'conteo': datos_reporte.get('parpadeo_y_microsueno', {}).get('conteo_microsueno', 0),
-                'duraciones': datos_reporte.get('parpadeo_y_microsueno', {}).get('duraciones_microsueno', [])
+                'duraciones': datos_reporte.get('parpadeo_y_microsueno', {}).get('duraciones_microsueno', []),
+                'resumen': datos_reporte.get('parpadeo_y_microsueno', {}).get('resumen_microsueno', {})
             },
             'inclinacion': {
                 'reporte': datos_reporte.get('inclinacion', {}).get('reporte_inclinacion', False),
                 'conteo': datos_reporte.get('inclinacion', {}).get('conteo_inclinacion', 0),
-                'duraciones': datos_reporte.get('inclinacion', {}).get('duraciones_inclinacion', [])
+                'duraciones': datos_reporte.get('inclinacion', {}).get('duraciones_inclinacion', []),
+                'resumen': datos_reporte.get('inclinacion', {}).get('resumen_inclinacion', {})
             },
             'bostezo': {
                 'reporte': datos_reporte.get('bostezo', {}).get('reporte_bostezo', False),
                 'conteo': datos_reporte.get('bostezo', {}).get('conteo_bostezo', 0),
-                'duraciones': datos_reporte.get('bostezo', {}).get('duraciones_bostezo', [])
+                'duraciones': datos_reporte.get('bostezo', {}).get('duraciones_bostezo', []),
+                'resumen': datos_reporte.get('bostezo', {}).get('resumen_bostezo', {})
             }
-        }
-        return json.dumps(reporte_json)
\ No newline at end of file
+        }
\ No newline at end of file
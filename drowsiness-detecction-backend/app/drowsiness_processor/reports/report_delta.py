@@ -0,0 +1,52 @@
+import re
+from typing import Any, Optional
+
+# "Contando parpadeos... 47.0 segundos restantes." -> 47.0
+PATRON_CUENTA_ATRAS = re.compile(r'(\d+(?:\.\d+)?) segundos restantes')
+
+
+class EmisorDeltas:
+    """
+    Cambios del reporte de somnolencia entre cuadros.
+
+    El primer reporte se devuelve completo (instantánea); después solo las
+    secciones (parpadeo, microsueno, ...) en las que cambió el reporte, el
+    conteo o las duraciones. Mientras un detector cuenta su
+    ventana el conteo es una cuenta atrás en texto que cambia cada segundo:
+    solo cuenta como cambio al pasar a otra cubeta de ``cubeta`` segundos.
+    marca_tiempo no se compara; acompaña a cada delta.
+    """
+
+    def __init__(self, cubeta: float = 10.0):
+        self.cubeta = cubeta
+        # valor comparable de cada sección del último reporte devuelto (None: falta la instantánea)
+        self.claves: Optional[dict] = None
+
+    def reiniciar(self):
+        self.claves = None
+
+    def clave_valor(self, valor: Any) -> Any:
+        if isinstance(valor, str):
+            coincidencia = PATRON_CUENTA_ATRAS.search(valor)
+            if coincidencia:
+                return 'cuenta_atras', int(float(coincidencia.group(1)) // self.cubeta)
+        elif isinstance(valor, list):
+            # duraciones: el historial está acotado, así que la longitud sola deja de cambiar al llenarse
+            return len(valor), valor[-1] if valor else None
+        elif isinstance(valor, dict):
+            return tuple((clave, self.clave_valor(dato)) for clave, dato in valor.items())
+        return valor
+
+    def calcular(self, reporte: dict) -> Optional[dict]:
+        # reporte completo la primera vez, las secciones cambiadas después, None sin cambios
+        claves = {seccion: self.clave_valor(valor) for seccion, valor in reporte.items() if seccion != 'marca_tiempo'}
+        if self.claves is None:
+            self.claves = claves
+            return reporte
+        cambios = {seccion: reporte[seccion] for seccion, clave in claves.items() if self.claves.get(seccion) != clave}
+        if not cambios:
+            return None
+        self.claves = claves
+        if 'marca_tiempo' in reporte:
+            cambios['marca_tiempo'] = reporte['marca_tiempo']
+        return cambios
@@ -1,7 +1,6 @@
 import numpy as np
 import cv2
-import time
-from typing import Tuple
+from typing import Tuple, Dict, Optional
 
 
 class VisualizadorReporte:
@@ -22,12 +21,14 @@ class VisualizadorReporte:
             'inclinacion': {'reporte': False, 'conteo': 0, 'duraciones': []},
             'bostezo': {'reporte': False, 'conteo': 0, 'duraciones': []}
         }
-        self.tiempos = {
-            'frotamiento_ojos_primera_mano': time.time(),
-            'frotamiento_ojos_segunda_mano': time.time(),
-            'parpadeo': time.time(),
-            'bostezo': time.time()
+        # inicio de cada conteo, fijado con la marca de tiempo del primer cuadro
+        self.tiempos: Dict[str, Optional[float]] = {
+            'frotamiento_ojos_primera_mano': None,
+            'frotamiento_ojos_segunda_mano': None,
+            'parpadeo': None,
+            'bostezo': None
         }
+        self.marca_tiempo: float = 0.0
         self.umbrales_advertencia = {
             'frotamiento_ojos_primera_mano': 10,
             'frotamiento_ojos_segunda_mano': 10,
@@ -41,6 +42,13 @@ class VisualizadorReporte:
         self.espaciado: int = 80
         self.margen: int = 40
 
+        # texto del reporte pre-renderizado; se regenera solo cuando cambia lo que muestra (ver clave_capa)
+        self.clave_capa_actual: Optional[tuple] = None
+        self.region_capa: Optional[Tuple[slice, slice]] = None
+        self.capa: Optional[np.ndarray] = None
+        self.mascara_capa: Optional[np.ndarray] = None
+        self.coordenadas_capa: Dict[str, Tuple[int, int]] = {}
+
     def dibujar_rectangulo(self, bosquejo: np.ndarray, superior_izquierda: Tuple[int, int], inferior_derecha: Tuple[int, int], color: Tuple[int, int, int]):
         cv2.rectangle(bosquejo, superior_izquierda, inferior_derecha, color, 2)
 
@@ -57,6 +65,30 @@ class VisualizadorReporte:
     def dibujar_texto_reporte(self, bosquejo: np.ndarray, texto: str, posicion: Tuple[int, int], color: Tuple[int, int, int]):
         cv2.putText(bosquejo, texto, posicion, cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 1)
 
+    def obtener_estado_overlay(self) -> dict:
+        # mismo estado que dibujan las advertencias, para que el cliente lo dibuje
+        estado = {}
+        tiempo_actual = self.marca_tiempo
+        duracion_conteo = {'frotamiento_ojos_primera_mano': 300, 'frotamiento_ojos_segunda_mano': 300,
+                           'parpadeo': 60, 'bostezo': 180}
+        for caracteristica, datos in self.visualizar_reportes.items():
+            conteo = datos['conteo']
+            if not datos['reporte']:
+                estado_reporte = 'esperando'
+            elif caracteristica == 'microsueno' or caracteristica == 'inclinacion':
+                estado_reporte = 'alarma' if conteo >= self.umbrales_advertencia[caracteristica] else 'normal'
+            else:
+                estado_reporte = 'advertencia' if conteo > self.umbrales_advertencia[caracteristica] else 'normal'
+
+            estado[caracteristica] = {'estado': estado_reporte, 'conteo': conteo}
+            if 'duraciones' in datos:
+                estado[caracteristica]['duraciones'] = datos['duraciones']
+            if caracteristica in duracion_conteo:
+                inicio = self.tiempos[caracteristica]
+                transcurrido = round(tiempo_actual - inicio, 0) if inicio is not None else 0
+                estado[caracteristica]['restante'] = duracion_conteo[caracteristica] - transcurrido
+        return estado
+
     def dibujar_advertencias_general(self, bosquejo: np.ndarray, caracteristica: str):
         posicion = self.coordenadas[caracteristica]
         color = self.obtener_color('esperando')
@@ -67,7 +99,7 @@ class VisualizadorReporte:
             if caracteristica == 'inclinacion':
                 self.dibujar_texto_reporte(bosquejo, f"evaluando: {caracteristica.replace('_', ' ')}: manténgase alerta", posicion, color)
         else:
-            tiempo_actual = time.time()
+            tiempo_actual = self.marca_tiempo
             tiempo_inicio_caracteristica = self.tiempos[caracteristica]
             tiempo_transcurrido = round(tiempo_actual - tiempo_inicio_caracteristica, 0)
 
@@ -148,46 +180,62 @@ class VisualizadorReporte:
                 duraciones = datos[f'duraciones_{caracteristica_base}']
                 self.visualizar_reportes[caracteristica]['duraciones'] = duraciones
 
-    def visualizar_todos_reportes(self, bosquejo: np.ndarray, datos_reporte: dict):
-        # primera mano
+    def actualizar_todos_reportes(self, datos_reporte: dict, marca_tiempo: float):
+        # actualiza el estado mostrado sin dibujar (cuando el cliente no pide bosquejo)
+        self.marca_tiempo = marca_tiempo
+        for caracteristica, inicio in self.tiempos.items():
+            if inicio is None:
+                self.tiempos[caracteristica] = marca_tiempo
         self.actualizar_reporte('frotamiento_ojos_primera_mano', datos_reporte['frotamiento_ojos_primera_mano'])
-        if self.visualizar_reportes['frotamiento_ojos_primera_mano']['reporte']:
-            self.dibujar_advertencias_reporte(bosquejo, 'frotamiento_ojos_primera_mano')
-        else:
-            self.dibujar_advertencias_general(bosquejo, 'frotamiento_ojos_primera_mano')
-
-        # segunda mano
         self.actualizar_reporte('frotamiento_ojos_segunda_mano', datos_reporte['frotamiento_ojos_segunda_mano'])
-        if self.visualizar_reportes['frotamiento_ojos_segunda_mano']['reporte']:
-            self.dibujar_advertencias_reporte(bosquejo, 'frotamiento_ojos_segunda_mano')
-        else:
-            self.dibujar_advertencias_general(bosquejo, 'frotamiento_ojos_segunda_mano')
-
-        # parpadeo
         self.actualizar_reporte('parpadeo', datos_reporte['parpadeo_y_microsueno'])
-        if self.visualizar_reportes['parpadeo']['reporte']:
-            self.dibujar_advertencias_reporte(bosquejo, 'parpadeo')
-        else:
-            self.dibujar_advertencias_general(bosquejo, 'parpadeo')
-
-        # microsueño
         self.actualizar_reporte('microsueno', datos_reporte['parpadeo_y_microsueno'])
-        if self.visualizar_reportes['microsueno']['reporte']:
-            self.dibujar_advertencias_reporte(bosquejo, 'microsueno')
-        else:
-            self.dibujar_advertencias_general(bosquejo, 'microsueno')
-
-        # inclinación
         self.actualizar_reporte('inclinacion', datos_reporte['inclinacion'])
-        if self.visualizar_reportes['inclinacion']['reporte']:
-            self.dibujar_advertencias_reporte(bosquejo, 'inclinacion')
-        else:
-            self.dibujar_advertencias_general(bosquejo, 'inclinacion')
-
-        # bostezo
         self.actualizar_reporte('bostezo', datos_reporte['bostezo'])
-        if self.visualizar_reportes['bostezo']['reporte']:
-            self.dibujar_advertencias_reporte(bosquejo, 'bostezo')
+
+    def dibujar_todos_reportes(self, bosquejo: np.ndarray):
+        for caracteristica in self.coordenadas:
+            if self.visualizar_reportes[caracteristica]['reporte']:
+                self.dibujar_advertencias_reporte(bosquejo, caracteristica)
+            else:
+                self.dibujar_advertencias_general(bosquejo, caracteristica)
+
+    def clave_capa(self, forma: tuple) -> tuple:
+        # estado de los reportes que muestra la capa: conteos (y con ellos los colores), duraciones
+        # y segundos enteros de las cuentas atrás; la posición de cada bloque se deriva de él
+        clave = [forma]
+        for caracteristica, datos in self.visualizar_reportes.items():
+            if datos['reporte']:
+                clave.append((True, datos['conteo'], tuple(datos.get('duraciones', ()))))
+            elif caracteristica in self.tiempos:
+                clave.append((False, round(self.marca_tiempo - self.tiempos[caracteristica], 0)))
+            else:
+                clave.append(False)
+        return tuple(clave)
+
+    def generar_capa(self, forma: tuple):
+        # el texto se dibuja sobre negro y se guarda recortado al rectángulo que ocupa, con la
+        # máscara de sus píxeles (ningún color de las advertencias es negro, tampoco en gris)
+        capa = np.zeros(forma, np.uint8)
+        self.dibujar_todos_reportes(capa)
+        gris = cv2.cvtColor(capa, cv2.COLOR_BGR2GRAY) if capa.ndim == 3 else capa
+        x, y, ancho, alto = cv2.boundingRect(gris)
+        if ancho == 0 or alto == 0:
+            self.region_capa = None
+            return
+        self.region_capa = (slice(y, y + alto), slice(x, x + ancho))
+        self.capa = capa[self.region_capa].copy()
+        self.mascara_capa = (gris[self.region_capa] > 0).astype(np.uint8)
+
+    def visualizar_todos_reportes(self, bosquejo: np.ndarray, datos_reporte: dict, marca_tiempo: float):
+        self.actualizar_todos_reportes(datos_reporte, marca_tiempo)
+        if self.clave_capa(bosquejo.shape) != self.clave_capa_actual:
+            self.generar_capa(bosquejo.shape)
+            self.clave_capa_actual = self.clave_capa(bosquejo.shape)
+            self.coordenadas_capa = dict(self.coordenadas)
         else:
-            self.dibujar_advertencias_general(bosquejo, 'bostezo')
-        return bosquejo
\ No newline at end of file
+            # mismo resultado que dibujar: el dibujo desplaza los bloques según las duraciones
+            self.coordenadas = dict(self.coordenadas_capa)
+        if self.region_capa is not None:
+            cv2.copyTo(self.capa, self.mascara_capa, bosquejo[self.region_capa])
+        return bosquejo
@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
@@ -6,6 +8,23 @@ from app.core.config import settings
 from app.core.middleware import setup_middlewares
 from app.api.v1.routers import auth, empresas, users, viajes
 from app.api.v1.routers import monitoring  
+from app.services.monitoring_executor import obtener_ejecutor, cerrar_ejecutor
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ciclo de vida de la aplicación
+    
+    Al iniciar, crea el ejecutor de monitoreo y precalienta los pools de
+    motores MediaPipe para que las conexiones no paguen ese costo.
+    Al apagar, detiene los trabajadores del ejecutor de monitoreo.
+    """
+    ejecutor = await asyncio.to_thread(obtener_ejecutor)
+    await ejecutor.estadisticas()
+    yield
+    cerrar_ejecutor()
+
 
 # Crear aplicación FastAPI
 app = FastAPI(
@@ -86,7 +105,8 @@ app = FastAPI(
     },
     license_info={
         "name": "MIT",
-    }
+    },
+    lifespan=lifespan
 )
 
 # Configurar esquema de seguridad OAuth2 en Swagger
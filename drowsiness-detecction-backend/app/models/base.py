@@ -3,6 +3,7 @@ from app.models.user import Usuario
 from app.models.empresa import Empresa
 from app.models.token_blacklist import TokenBlacklist
 from app.models.viaje import Viaje
+from app.models.evento_somnolencia import EventoSomnolencia
 
 # Exportar todos los modelos para que SQLAlchemy los registre
-__all__ = ["Base", "Usuario", "Empresa", "TokenBlacklist", "Viaje"]
\ No newline at end of file
+__all__ = ["Base", "Usuario", "Empresa", "TokenBlacklist", "Viaje", "EventoSomnolencia"]
\ No newline at end of file
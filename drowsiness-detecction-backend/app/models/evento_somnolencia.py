@@ -0,0 +1,66 @@
+from sqlalchemy import (
+    Column, BigInteger, Integer, String, DECIMAL, DateTime,
+    ForeignKey, CheckConstraint, Index
+)
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class EventoSomnolencia(Base):
+    """
+    Modelo de Evento de Somnolencia
+
+    Eventos detectados por el monitoreo en tiempo real, asociados al
+    chofer y, si tenía uno en curso, a su viaje. Se insertan por lotes
+    desde el escritor de eventos (ver app/services/monitoring_events.py).
+
+    Un registro por evento, con su marca de tiempo (fin del evento) y su
+    duración; el parpadeo no mide duración (NULL). ``conteo`` es el número
+    del evento: dentro de la sesión para microsueno e inclinacion, dentro
+    de la ventana del detector para bostezo, parpadeo y frotamiento_ojos
+    (3, 1 y 5 minutos).
+    """
+
+    __tablename__ = "eventos_somnolencia"
+
+    # Primary Key
+    # BIGSERIAL en PostgreSQL; INTEGER en SQLite, que solo autoincrementa "INTEGER PRIMARY KEY"
+    id_evento = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+
+    # RELACIONES
+    id_chofer = Column(
+        Integer,
+        ForeignKey("usuarios.id_usuario", ondelete="CASCADE"),
+        nullable=False
+    )
+    id_viaje = Column(
+        Integer,
+        ForeignKey("viajes.id_viaje", ondelete="SET NULL")
+    )
+    # Sesión de monitoreo (WebSocket) que detectó el evento
+    id_sesion = Column(String(32), nullable=False)
+
+    # EVENTO
+    tipo = Column(
+        String(20),
+        CheckConstraint(
+            "tipo IN ('microsueno', 'inclinacion', 'bostezo', 'parpadeo', 'frotamiento_ojos')",
+            name="chk_evento_tipo"
+        ),
+        nullable=False
+    )
+    marca_tiempo = Column(DateTime(timezone=True), nullable=False)
+    conteo = Column(Integer, nullable=False, default=1)
+    duracion_segundos = Column(DECIMAL(6, 2))
+
+    fecha_registro = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Historial por viaje y por chofer en orden temporal
+    __table_args__ = (
+        Index("idx_eventos_somnolencia_viaje_tiempo", "id_viaje", "marca_tiempo"),
+        Index("idx_eventos_somnolencia_chofer_tiempo", "id_chofer", "marca_tiempo"),
+    )
+
+    def __repr__(self):
+        return f"<EventoSomnolencia {self.id_evento}: {self.tipo} chofer={self.id_chofer} viaje={self.id_viaje}>"
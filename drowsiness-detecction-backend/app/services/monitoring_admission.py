@@ -0,0 +1,166 @@
+# ============================================
+# CONTROL DE ADMISIÓN DEL MONITOREO
+# Limita las sesiones por proceso según un presupuesto de CPU por sesión
+# ============================================
+
+import logging
+import os
+import random
+from typing import Optional
+
+from app.core.config import settings
+from app.drowsiness_processor.extract_points.inference_pool import MODO_SESION
+from app.services.monitoring_executor import TIPO_PROCESOS
+
+logger = logging.getLogger(__name__)
+
+
+def nucleos_disponibles() -> float:
+    """Núcleos que puede usar el proceso (afinidad de CPU si el sistema la informa)"""
+    try:
+        return float(len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return float(os.cpu_count() or 1)
+
+
+def motores_para_sesiones() -> Optional[int]:
+    """
+    Motores de inferencia que pueden reservar las sesiones de cuadros
+
+    En préstamo por sesión cada sesión de cuadros retiene un motor hasta
+    cerrarse: el pool de cada proceso trabajador (uno en modo "thread").
+    En préstamo por cuadro el motor no limita las sesiones (None).
+    """
+    if settings.MONITORING_INFERENCE_CHECKOUT != MODO_SESION:
+        return None
+    procesos = settings.MONITORING_MAX_WORKERS if settings.MONITORING_EXECUTOR == TIPO_PROCESOS else 1
+    return settings.MONITORING_INFERENCE_POOL_SIZE * procesos
+
+
+class ControlAdmision:
+    """
+    Reserva de CPU para las sesiones de monitoreo
+
+    Cada sesión reserva su presupuesto (núcleos) al conectarse y lo libera
+    al desconectarse; si la reserva no cabe en la capacidad del proceso la
+    sesión se rechaza con 1013 y una sugerencia de reintento, en lugar de
+    degradar a las que ya están conectadas. Las sesiones de cuadros
+    reservan además uno de los ``motores`` del pool de inferencia (None:
+    sin límite), así no se admite una sesión que no podría obtener motor.
+    Solo la usa el event loop, así que no necesita candados.
+
+    Con varios procesos de uvicorn cada uno tiene su propio control:
+    MONITORING_CPU_CORES debe repartir los núcleos entre ellos.
+    """
+
+    def __init__(self, capacidad: float, presupuesto_sesion: float, reintento: float = 5.0,
+                 motores: Optional[int] = None):
+        if presupuesto_sesion <= 0:
+            raise ValueError("El presupuesto de CPU por sesión debe ser positivo")
+        self.capacidad = capacidad
+        self.presupuesto_sesion = presupuesto_sesion
+        self.reintento = reintento
+        self.motores = motores
+        self.reservado = 0.0
+        self.sesiones = 0
+        self.motores_reservados = 0
+        self.rechazadas = 0
+
+    @property
+    def disponible(self) -> float:
+        return max(self.capacidad - self.reservado, 0.0)
+
+    @property
+    def motores_disponibles(self) -> Optional[int]:
+        if self.motores is None:
+            return None
+        return max(self.motores - self.motores_reservados, 0)
+
+    def admitir(self, presupuesto: float, con_motor: bool = True) -> bool:
+        """
+        Reservar CPU (y un motor de inferencia) para una sesión nueva
+
+        Args:
+            presupuesto: Núcleos que reserva la sesión
+            con_motor: La sesión retiene un motor del pool (sesiones de cuadros)
+
+        Returns:
+            True si la sesión fue admitida (debe llamar a ``liberar``)
+        """
+        # tolerancia para que N presupuestos de 1/N núcleos quepan pese al redondeo
+        sin_cpu = self.reservado + presupuesto > self.capacidad + 1e-9
+        sin_motor = con_motor and self.motores_disponibles == 0
+        if sin_cpu or sin_motor:
+            self.rechazadas += 1
+            logger.warning(
+                f"Sesión rechazada por capacidad: {self.reservado:.2f}/{self.capacidad:.2f} "
+                f"núcleos reservados, {self.motores_reservados}/{self.motores} motores, "
+                f"{self.sesiones} sesiones"
+            )
+            return False
+        self.reservado += presupuesto
+        self.sesiones += 1
+        if con_motor:
+            self.motores_reservados += 1
+        return True
+
+    def liberar(self, presupuesto: float, con_motor: bool = True) -> None:
+        self.reservado = max(self.reservado - presupuesto, 0.0)
+        self.sesiones = max(self.sesiones - 1, 0)
+        if con_motor:
+            self.motores_reservados = max(self.motores_reservados - 1, 0)
+
+    def liberar_rechazada(self, presupuesto: float, con_motor: bool = True) -> None:
+        """Liberar la reserva de una sesión admitida que no pudo abrirse y contarla como rechazada"""
+        self.liberar(presupuesto, con_motor)
+        self.rechazadas += 1
+
+    def sugerir_reintento(self) -> int:
+        """Segundos de espera sugeridos al cliente rechazado, con dispersión para no volver todos juntos"""
+        return int(round(self.reintento * (1 + random.random())))
+
+    def estado(self) -> dict:
+        """
+        Capacidad actual para el balanceador de carga
+
+        Returns:
+            Diccionario con "listo" (cabe al menos una sesión de cuadros más),
+            la reserva de CPU y los motores de inferencia reservados
+        """
+        # sesiones de cuadros que caben: el menor entre el presupuesto de CPU y los motores libres
+        sesiones_disponibles = int((self.disponible + 1e-9) // self.presupuesto_sesion)
+        if self.motores is not None:
+            sesiones_disponibles = min(sesiones_disponibles, self.motores_disponibles)
+        return {
+            "listo": sesiones_disponibles > 0,
+            "capacidad_nucleos": round(self.capacidad, 2),
+            "reservado_nucleos": round(self.reservado, 2),
+            "disponible_nucleos": round(self.disponible, 2),
+            "motores": self.motores,
+            "motores_reservados": self.motores_reservados,
+            "sesiones_activas": self.sesiones,
+            "sesiones_disponibles": sesiones_disponibles,
+            "presupuesto_sesion_nucleos": self.presupuesto_sesion,
+        }
+
+    def exponer(self) -> str:
+        """Reserva de CPU y sesiones rechazadas en formato de texto Prometheus"""
+        lineas = []
+        for nombre, tipo, descripcion, valor in (
+            ("monitoreo_capacidad_nucleos", "gauge", "Núcleos disponibles para sesiones", self.capacidad),
+            ("monitoreo_reservado_nucleos", "gauge", "Núcleos reservados por las sesiones activas", self.reservado),
+            ("monitoreo_sesiones_rechazadas_total", "counter", "Sesiones rechazadas por capacidad", self.rechazadas),
+        ):
+            lineas.append(f"# HELP {nombre} {descripcion}")
+            lineas.append(f"# TYPE {nombre} {tipo}")
+            lineas.append(f"{nombre} {valor}")
+        return "\n".join(lineas) + "\n"
+
+
+# Control del proceso del servidor (uno por proceso de uvicorn)
+control_admision = ControlAdmision(
+    capacidad=settings.MONITORING_CPU_CORES or nucleos_disponibles(),
+    presupuesto_sesion=settings.MONITORING_SESSION_CPU_BUDGET,
+    reintento=settings.MONITORING_RETRY_AFTER_SECONDS,
+    motores=motores_para_sesiones()
+)
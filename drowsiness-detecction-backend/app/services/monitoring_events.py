@@ -0,0 +1,159 @@
+# ============================================
+# EVENTOS DE SOMNOLENCIA DEL MONITOREO
+# Escritor en segundo plano compartido por las sesiones de cada proceso
+# ============================================
+
+import atexit
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.drowsiness_processor.reports.event_writer import (
+    EscritorEventos,
+    SumideroBaseDatos,
+    SumideroCSV,
+    SumideroEventos,
+    SumideroNDJSON
+)
+from app.drowsiness_processor.reports.main import CAMPOS_CLAVE, CAMPOS_REPORTE
+from app.db.session import SessionLocal
+from app.models.evento_somnolencia import EventoSomnolencia
+
+logger = logging.getLogger(__name__)
+
+# Escritor del proceso (el servidor en modo "thread", cada trabajador en modo "process")
+_escritor: Optional[EscritorEventos] = None
+
+# (tipo en eventos_somnolencia, columna de reporte, columna de eventos)
+# Cada fila trae en "eventos_*" los eventos que reporta: el que acaba de terminar (microsueño,
+# inclinación) o todos los de la ventana que se cierra (bostezo, parpadeo, frotamiento de ojos).
+TIPOS_EVENTO = (
+    ("microsueno", "reporte_microsueno", "eventos_microsueno"),
+    ("inclinacion", "reporte_inclinacion", "eventos_inclinacion"),
+    ("bostezo", "reporte_bostezo", "eventos_bostezo"),
+    ("parpadeo", "reporte_parpadeo", "eventos_parpadeo"),
+    ("frotamiento_ojos", "reporte_frotamiento_ojos_primera_mano", "eventos_frotamiento_ojos_primera_mano"),
+    ("frotamiento_ojos", "reporte_frotamiento_ojos_segunda_mano", "eventos_frotamiento_ojos_segunda_mano"),
+)
+
+
+def registros_eventos(fila: dict) -> List[dict]:
+    """
+    Convertir una fila del reporte en registros de eventos_somnolencia
+
+    Un registro por evento detectado, con su propia marca de tiempo y
+    duración. Las sesiones anónimas no se guardan en la BD.
+
+    Args:
+        fila: Fila de ReportesSomnolencia con sus claves de sesión
+
+    Returns:
+        Registros para la tabla (ninguno si la fila no reporta eventos)
+    """
+    if fila.get("id_chofer") is None:
+        return []
+    registros = []
+    for tipo, reporte, eventos in TIPOS_EVENTO:
+        if not fila.get(reporte):
+            continue
+        for numero, marca_tiempo, duracion in fila.get(eventos) or ():
+            registros.append({
+                "id_chofer": fila["id_chofer"],
+                "id_viaje": fila.get("id_viaje"),
+                "id_sesion": fila["id_sesion"],
+                "tipo": tipo,
+                "marca_tiempo": datetime.fromtimestamp(
+                    marca_tiempo if marca_tiempo is not None else fila["marca_tiempo"], tz=timezone.utc
+                ),
+                "conteo": numero,
+                "duracion_segundos": round(duracion, 2) if duracion is not None else None,
+            })
+    return registros
+
+
+def _ruta_archivo(nombre: str, sufijo: str) -> str:
+    base, extension = os.path.splitext(nombre)
+    return os.path.join(settings.MONITORING_EVENTS_DIR, f"{base}{sufijo}{extension}")
+
+
+def _max_bytes() -> int:
+    return int(settings.MONITORING_EVENTS_MAX_FILE_MB * 1024 * 1024)
+
+
+# Fábricas de sumideros por nombre en MONITORING_EVENT_SINKS; reciben el sufijo del proceso
+FABRICAS_SUMIDEROS: Dict[str, Callable[[str], SumideroEventos]] = {
+    "csv": lambda sufijo: SumideroCSV(
+        _ruta_archivo("eventos_somnolencia.csv", sufijo), CAMPOS_CLAVE + CAMPOS_REPORTE,
+        _max_bytes(), settings.MONITORING_EVENTS_BACKUPS
+    ),
+    "ndjson": lambda sufijo: SumideroNDJSON(
+        _ruta_archivo("eventos_somnolencia.ndjson", sufijo), _max_bytes(), settings.MONITORING_EVENTS_BACKUPS
+    ),
+    # un INSERT de varias filas por lote (no una transacción por evento)
+    "db": lambda sufijo: SumideroBaseDatos(SessionLocal, EventoSomnolencia.__table__, registros_eventos),
+}
+
+
+def crear_sumideros(sufijo: str = "") -> List[SumideroEventos]:
+    """
+    Crear los sumideros configurados en MONITORING_EVENT_SINKS
+
+    Args:
+        sufijo: Se añade al nombre de los archivos para que cada proceso
+            escriba en los suyos
+
+    Returns:
+        Lista de sumideros (vacía si no hay ninguno configurado)
+
+    Raises:
+        ValueError: Si un nombre no corresponde a ningún sumidero
+    """
+    sumideros = []
+    for nombre in filter(None, (parte.strip() for parte in settings.MONITORING_EVENT_SINKS.split(","))):
+        fabrica = FABRICAS_SUMIDEROS.get(nombre)
+        if fabrica is None:
+            raise ValueError(f"Sumidero de eventos no soportado: {nombre}")
+        sumideros.append(fabrica(sufijo))
+    return sumideros
+
+
+def iniciar_escritor_eventos(por_proceso: bool = False) -> Optional[EscritorEventos]:
+    """
+    Crear el escritor de eventos del proceso (una sola vez)
+
+    Args:
+        por_proceso: Añadir el pid a los archivos (trabajadores del modo
+            "process", que escriben a la vez)
+
+    Returns:
+        El escritor, o None si no hay sumideros configurados
+    """
+    global _escritor
+    if _escritor is None:
+        sumideros = crear_sumideros(f".{os.getpid()}" if por_proceso else "")
+        if not sumideros:
+            return None
+        _escritor = EscritorEventos(
+            sumideros,
+            tamano_lote=settings.MONITORING_EVENTS_BATCH_SIZE,
+            intervalo=settings.MONITORING_EVENTS_FLUSH_SECONDS,
+            capacidad=settings.MONITORING_EVENTS_QUEUE_SIZE
+        )
+        # los trabajadores no pasan por cerrar_escritor_eventos: se escribe lo pendiente al salir
+        atexit.register(cerrar_escritor_eventos)
+        logger.info(f"Escritor de eventos iniciado ({settings.MONITORING_EVENT_SINKS})")
+    return _escritor
+
+
+def obtener_escritor_eventos() -> Optional[EscritorEventos]:
+    return _escritor
+
+
+def cerrar_escritor_eventos() -> None:
+    """Escribir los eventos pendientes y detener el escritor si fue creado"""
+    global _escritor
+    if _escritor is not None:
+        _escritor.cerrar()
+        _escritor = None
@@ -0,0 +1,599 @@
+# ============================================
+# EJECUTOR DEL PROCESAMIENTO DE MONITOREO
+# Ejecuta la inferencia por cuadro fuera del event loop de asyncio
+# ============================================
+
+import asyncio
+import base64
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+
+import cv2
+
+from app.core.config import settings
+from app.drowsiness_processor.main import SistemaDeteccionSomnolencia
+from app.drowsiness_processor.quality_levels import NIVELES_CALIDAD
+from app.drowsiness_processor.extract_points.hands.hands_scheduler import PlanificadorManos
+from app.drowsiness_processor.extract_points.region_tracker import SeguidorRegionRostro
+from app.drowsiness_processor.reports.main import ReportesSomnolencia
+from app.services.monitoring_events import (
+    cerrar_escritor_eventos,
+    iniciar_escritor_eventos,
+    obtener_escritor_eventos
+)
+from app.services.monitoring_protocol import (
+    PERFIL_COMPLETO,
+    PERFIL_VECTORIAL,
+    PERFILES_CON_BOSQUEJO,
+    TIPO_PUNTOS
+)
+from app.drowsiness_processor.extract_points.inference_pool import (
+    MODO_CUADRO,
+    MODO_SESION,
+    configurar_pool,
+    obtener_pool
+)
+
+logger = logging.getLogger(__name__)
+
+TIPO_HILOS = "thread"
+TIPO_PROCESOS = "process"
+
+Buffer = Union[str, bytes, bytearray, memoryview]
+
+# Sistemas de detección por sesión, locales a cada proceso.
+# En modo "thread" viven en el proceso del servidor; en modo "process"
+# cada sesión queda fijada a un proceso trabajador y su estado vive allí.
+_sistemas: Dict[str, SistemaDeteccionSomnolencia] = {}
+# Un candado por sesión en el trabajador: cerrar la sesión espera al cuadro
+# en curso aunque la tarea asyncio que lo pidió haya sido cancelada.
+_candados_sistemas: Dict[str, threading.Lock] = {}
+# Hilos del trabajador para la inferencia de manos en paralelo con la del rostro
+_ejecutor_manos: Optional[ThreadPoolExecutor] = None
+# Modo "process": el trabajador adjunta su estado a los resultados, como mucho
+# una vez por INTERVALO_ESTADISTICAS, para que el servidor no tenga que
+# encolar una consulta detrás de los cuadros pendientes
+INTERVALO_ESTADISTICAS = 1.0
+_publicar_estadisticas = False
+_ultima_publicacion = 0.0
+
+
+@dataclass
+class ResultadoCuadro:
+    """Resultado del procesamiento de un cuadro, ya codificado para el envío"""
+    # reporte completo del sistema; la sesión decide qué parte enviar
+    reporte: dict
+    alarma: bool
+    # None cuando el perfil de respuesta no incluye la imagen
+    imagen_bosquejo: Optional[Union[bytes, str]] = None
+    imagen_original: Optional[Union[bytes, str]] = None
+    # perfil vectorial: puntos int16 (bytes o base64) y estado de las advertencias
+    malla_rostro: Optional[Union[bytes, str]] = None
+    manos: Optional[Union[bytes, str]] = None
+    overlay: Optional[dict] = None
+    dimensiones: Optional[List[int]] = None
+    # métricas: si se encontró un rostro y segundos por etapa (incluida la codificación)
+    rostro_detectado: bool = False
+    tiempos: Optional[Dict[str, float]] = None
+    # escalón de NIVELES_CALIDAD con el que se procesó el cuadro (None: sin inferencia en el servidor)
+    nivel_calidad: Optional[int] = None
+    # estado del pool del trabajador (modo "process"; None si no toca publicarlo)
+    estadisticas: Optional[dict] = None
+
+
+def inicializar_trabajador(
+    tamano_pool: int,
+    modo_pool: str,
+    tiempo_espera: float,
+    hilos_manos: int = 0,
+    eventos_por_proceso: bool = False,
+    publicar_estadisticas: bool = False
+) -> None:
+    """
+    Crear y precalentar el pool de motores de inferencia del proceso
+
+    Se ejecuta una vez en el proceso del servidor (modo "thread") o como
+    initializer de cada proceso trabajador (modo "process"). También
+    inicia el escritor de eventos de somnolencia del proceso.
+
+    Args:
+        hilos_manos: Hilos para inferir manos en paralelo con el rostro,
+            uno por cuadro que puede estar en curso (0: en serie)
+        eventos_por_proceso: Archivos de eventos propios de este proceso
+            (varios trabajadores escriben a la vez)
+        publicar_estadisticas: Adjuntar el estado del pool a los resultados
+            (el servidor no puede leerlo en otro proceso)
+    """
+    global _ejecutor_manos, _publicar_estadisticas
+    _publicar_estadisticas = publicar_estadisticas
+    # con calidad adaptativa los motores traen ya las variantes livianas de los modelos
+    configurar_pool(tamano_pool, modo=modo_pool, tiempo_espera=tiempo_espera,
+                    variantes_calidad=settings.MONITORING_QUALITY_ADAPTIVE)
+    iniciar_escritor_eventos(eventos_por_proceso)
+    if hilos_manos > 0 and _ejecutor_manos is None:
+        _ejecutor_manos = ThreadPoolExecutor(max_workers=hilos_manos, thread_name_prefix="manos")
+
+
+def abrir_sesion_local(
+    id_sesion: str,
+    con_motor: bool = True,
+    id_chofer: Optional[int] = None,
+    id_viaje: Optional[int] = None
+) -> dict:
+    """
+    Crear el estado de detección de una sesión en el proceso trabajador
+
+    En modo de préstamo "sesion" el motor de inferencia se reserva aquí y
+    queda asignado hasta ``cerrar_sesion_local``. Las sesiones de
+    landmarks (``con_motor=False``) no usan inferencia y no reservan motor.
+    Los eventos de la sesión van al escritor del proceso con su
+    ``id_sesion``, ``id_chofer`` e ``id_viaje``.
+
+    Returns:
+        Estado del pool del trabajador con la sesión ya abierta
+
+    Raises:
+        PoolAgotadoError: Si no hay motores libres (no espera: ocuparía un
+            hilo del ejecutor que procesa los cuadros de otras sesiones)
+    """
+    pool = obtener_pool()
+    motor = pool.obtener(tiempo_espera=0) if con_motor and pool.modo == MODO_SESION else None
+    _candados_sistemas[id_sesion] = threading.Lock()
+    try:
+        planificador_manos = PlanificadorManos(
+            intervalo=settings.MONITORING_HANDS_INTERVAL,
+            umbral_movimiento=settings.MONITORING_HANDS_MOTION_THRESHOLD,
+            habilitado=settings.MONITORING_EYE_RUB_ENABLED
+        )
+        seguidor_region = SeguidorRegionRostro(settings.MONITORING_FACE_ROI_MARGIN) if settings.MONITORING_FACE_ROI_ENABLED else None
+        _sistemas[id_sesion] = SistemaDeteccionSomnolencia(
+            motor, planificador_manos=planificador_manos, seguidor_region=seguidor_region,
+            lado_maximo=settings.MONITORING_MAX_FRAME_SIZE,
+            ejecutor_manos=_ejecutor_manos if con_motor else None,
+            reportes=ReportesSomnolencia(escritor=obtener_escritor_eventos(), id_sesion=id_sesion,
+                                         id_chofer=id_chofer, id_viaje=id_viaje)
+        )
+    except Exception:
+        # sin sistema la sesión no se cerrará: el motor reservado vuelve al pool aquí
+        _candados_sistemas.pop(id_sesion, None)
+        if motor is not None:
+            pool.liberar(motor)
+        raise
+    return estadisticas_pool_local()
+
+
+def _codificar_jpeg(imagen, calidad: int, en_base64: bool):
+    _, buffer = cv2.imencode('.jpg', imagen, [int(cv2.IMWRITE_JPEG_QUALITY), calidad])
+    if en_base64:
+        return base64.b64encode(buffer).decode('utf-8')
+    return buffer.tobytes()
+
+
+def _codificar_puntos(puntos, en_base64: bool):
+    datos = puntos.astype(TIPO_PUNTOS, copy=False).tobytes()
+    if en_base64:
+        return base64.b64encode(datos).decode('utf-8')
+    return datos
+
+
+def procesar_cuadro(
+    id_sesion: str,
+    datos: Buffer,
+    perfil: str,
+    calidad_jpeg: int,
+    en_base64: bool,
+    marca_tiempo: Optional[float] = None,
+    nivel_calidad: int = 0
+) -> ResultadoCuadro:
+    """
+    Procesar un cuadro de una sesión (se ejecuta en el trabajador)
+
+    Solo se dibujan y codifican las imágenes que pide el perfil: con
+    ``reporte`` o ``vectorial`` no se rasteriza el bosquejo ni se llama a
+    cv2.imencode; ``vectorial`` devuelve en su lugar los puntos en int16.
+
+    Args:
+        id_sesion: Identificador de la sesión de monitoreo
+        datos: JPEG en base64 (str) o bytes JPEG
+        perfil: Perfil de respuesta (ver PERFILES_VALIDOS)
+        calidad_jpeg: Calidad de compresión de las imágenes de respuesta
+        en_base64: Si las imágenes de respuesta se devuelven en base64
+        marca_tiempo: Segundos epoch de la captura del cuadro (reloj de los detectores)
+        nivel_calidad: Índice en NIVELES_CALIDAD (0: calidad completa)
+
+    Returns:
+        ResultadoCuadro con el reporte y las imágenes codificadas
+    """
+    with _candados_sistemas[id_sesion]:
+        sistema = _sistemas[id_sesion]
+        sistema.aplicar_calidad(NIVELES_CALIDAD[nivel_calidad])
+        resultado = _procesar_cuadro_sesion(
+            sistema, datos, perfil, calidad_jpeg, en_base64, marca_tiempo
+        )
+    resultado.nivel_calidad = nivel_calidad
+    return _adjuntar_estadisticas(resultado)
+
+
+def _procesar_cuadro_sesion(
+    sistema: SistemaDeteccionSomnolencia,
+    datos: Buffer,
+    perfil: str,
+    calidad_jpeg: int,
+    en_base64: bool,
+    marca_tiempo: Optional[float]
+) -> ResultadoCuadro:
+    # el último escalón de calidad omite el bosquejo aunque el perfil lo pida
+    dibujar = perfil in PERFILES_CON_BOSQUEJO and sistema.calidad.bosquejo
+    pool = obtener_pool()
+    if pool.modo == MODO_CUADRO:
+        # el motor se presta solo durante este cuadro
+        with pool.prestar() as motor:
+            sistema.extractor_puntos.asignar_motor(motor)
+            try:
+                imagen_original, bosquejo, reporte = sistema.ejecutar(datos, dibujar, marca_tiempo)
+            finally:
+                sistema.extractor_puntos.asignar_motor(None)
+    else:
+        imagen_original, bosquejo, reporte = sistema.ejecutar(datos, dibujar, marca_tiempo)
+
+    resultado = ResultadoCuadro(
+        reporte=reporte,
+        alarma=sistema.alarma,
+        rostro_detectado=sistema.rostro_detectado,
+        tiempos=sistema.tiempos_etapas
+    )
+    inicio_codificacion = time.perf_counter()
+    if dibujar:
+        resultado.imagen_bosquejo = _codificar_jpeg(bosquejo, calidad_jpeg, en_base64)
+    if perfil == PERFIL_COMPLETO:
+        resultado.imagen_original = _codificar_jpeg(imagen_original, calidad_jpeg, en_base64)
+    if perfil == PERFIL_VECTORIAL:
+        malla_rostro, manos, overlay = sistema.obtener_overlay_vectorial()
+        resultado.malla_rostro = _codificar_puntos(malla_rostro, en_base64)
+        resultado.manos = _codificar_puntos(manos, en_base64)
+        resultado.overlay = overlay
+        # los puntos van en píxeles del cuadro que envió el cliente, no de la imagen reducida
+        resultado.dimensiones = list(sistema.dimensiones_originales)
+    resultado.tiempos['codificacion'] = time.perf_counter() - inicio_codificacion
+    return resultado
+
+
+def procesar_landmarks(
+    id_sesion: str,
+    malla_rostro,
+    manos,
+    marca_tiempo: Optional[float] = None
+) -> ResultadoCuadro:
+    """
+    Procesar los landmarks enviados por el cliente (se ejecuta en el trabajador)
+
+    No hay imagen ni inferencia: solo mediciones, características y reportes.
+
+    Args:
+        id_sesion: Identificador de la sesión de monitoreo
+        malla_rostro: Malla (478, 2) en píxeles o None sin rostro
+        manos: Manos (M, 21, 2) en píxeles
+        marca_tiempo: Segundos epoch de la captura
+
+    Returns:
+        ResultadoCuadro solo con el reporte
+    """
+    with _candados_sistemas[id_sesion]:
+        sistema = _sistemas[id_sesion]
+        reporte = sistema.procesamiento_landmarks(malla_rostro, manos, marca_tiempo)
+        resultado = ResultadoCuadro(
+            reporte=reporte,
+            alarma=sistema.alarma,
+            rostro_detectado=sistema.rostro_detectado,
+            tiempos=sistema.tiempos_etapas
+        )
+    return _adjuntar_estadisticas(resultado)
+
+
+def cerrar_sesion_local(id_sesion: str) -> dict:
+    """Liberar el estado de una sesión y devolver su motor al pool (devuelve el estado del pool)"""
+    candado = _candados_sistemas.get(id_sesion)
+    if candado is not None:
+        with candado:
+            sistema = _sistemas.pop(id_sesion, None)
+            del _candados_sistemas[id_sesion]
+            if sistema is not None and sistema.extractor_puntos.motor is not None:
+                obtener_pool().liberar(sistema.extractor_puntos.motor)
+    return estadisticas_pool_local()
+
+
+def estadisticas_pool_local() -> dict:
+    """Uso y memoria del pool de inferencia del proceso trabajador"""
+    estadisticas = obtener_pool().estadisticas()
+    estadisticas["sesiones"] = len(_sistemas)
+    escritor = obtener_escritor_eventos()
+    if escritor is not None:
+        estadisticas["eventos"] = escritor.estadisticas()
+    return estadisticas
+
+
+def _adjuntar_estadisticas(resultado: ResultadoCuadro) -> ResultadoCuadro:
+    global _ultima_publicacion
+    ahora = time.monotonic()
+    if _publicar_estadisticas and ahora - _ultima_publicacion >= INTERVALO_ESTADISTICAS:
+        _ultima_publicacion = ahora
+        resultado.estadisticas = estadisticas_pool_local()
+    return resultado
+
+
+async def _esperar_trabajo(futuro: asyncio.Future):
+    """
+    Esperar un trabajo del ejecutor aunque la tarea que espera sea cancelada
+
+    Cancelar la tarea no detiene el hilo o proceso que ya ejecuta el cuadro.
+    Se sigue esperando su fin antes de propagar la cancelación para que el
+    candado de la sesión no se libere con el motor de inferencia todavía
+    en uso (cerrar la sesión lo reinicia y lo devuelve al pool).
+    """
+    try:
+        return await asyncio.shield(futuro)
+    except asyncio.CancelledError:
+        await asyncio.wait([futuro])
+        raise
+
+
+class EjecutorMonitoreo:
+    """
+    Ejecutor acotado para el procesamiento de cuadros de monitoreo
+
+    - "thread": un ThreadPoolExecutor compartido de ``max_trabajadores`` hilos.
+      MediaPipe y OpenCV liberan el GIL durante la inferencia y la codificación.
+    - "process": ``max_trabajadores`` procesos de un solo trabajador; cada
+      sesión se fija al proceso con menos sesiones para conservar su estado.
+
+    Cada proceso tiene su propio pool precalentado de motores MediaPipe
+    (MONITORING_INFERENCE_POOL_SIZE), prestados por sesión o por cuadro,
+    y con ``manos_en_paralelo`` hilos para inferir las manos de un cuadro
+    mientras se infiere su rostro.
+
+    Garantiza orden por sesión: los cuadros de una misma sesión se procesan
+    uno a la vez y en el orden en que se enviaron.
+    """
+
+    def __init__(
+        self,
+        tipo: str = TIPO_HILOS,
+        max_trabajadores: int = 4,
+        tamano_pool: int = 8,
+        modo_pool: str = MODO_SESION,
+        tiempo_espera_pool: float = 5.0,
+        manos_en_paralelo: bool = True
+    ):
+        if tipo not in (TIPO_HILOS, TIPO_PROCESOS):
+            raise ValueError(f"Tipo de ejecutor no soportado: {tipo}")
+        if max_trabajadores < 1:
+            raise ValueError("max_trabajadores debe ser al menos 1")
+
+        self.tipo = tipo
+        self.max_trabajadores = max_trabajadores
+        self._ejecutores: List[Executor] = []
+        self._sesiones_por_ejecutor: List[int] = []
+        self._ejecutor_sesion: Dict[str, int] = {}
+        self._candados: Dict[str, asyncio.Lock] = {}
+
+        argumentos_pool = (tamano_pool, modo_pool, tiempo_espera_pool)
+        if tipo == TIPO_HILOS:
+            inicializar_trabajador(*argumentos_pool, max_trabajadores if manos_en_paralelo else 0)
+            self._ejecutores.append(
+                ThreadPoolExecutor(max_workers=max_trabajadores, thread_name_prefix="monitoreo")
+            )
+        else:
+            contexto = multiprocessing.get_context("spawn")
+            for _ in range(max_trabajadores):
+                self._ejecutores.append(ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=contexto,
+                    initializer=inicializar_trabajador,
+                    initargs=argumentos_pool + (1 if manos_en_paralelo else 0, True, True)
+                ))
+        self._sesiones_por_ejecutor = [0] * len(self._ejecutores)
+        # último estado publicado por cada proceso trabajador (modo "process")
+        self._estadisticas: List[Optional[dict]] = [None] * len(self._ejecutores)
+
+        logger.info(f"Ejecutor de monitoreo iniciado (tipo: {tipo}, trabajadores: {max_trabajadores})")
+
+    @property
+    def sesiones_activas(self) -> int:
+        return len(self._ejecutor_sesion)
+
+    async def abrir_sesion(
+        self,
+        con_motor: bool = True,
+        id_chofer: Optional[int] = None,
+        id_viaje: Optional[int] = None
+    ) -> str:
+        """
+        Registrar una nueva sesión, asignarle un trabajador y un motor de inferencia
+
+        Args:
+            con_motor: False para sesiones de landmarks, que no ejecutan inferencia
+            id_chofer: Conductor de la sesión (clave de sus eventos; None si es anónima)
+            id_viaje: Viaje en curso del conductor (None si no tiene)
+
+        Returns:
+            Identificador de la sesión
+
+        Raises:
+            PoolAgotadoError: Si el trabajador no tiene motores libres
+        """
+        id_sesion = uuid.uuid4().hex
+        indice = min(range(len(self._ejecutores)), key=self._sesiones_por_ejecutor.__getitem__)
+        self._ejecutor_sesion[id_sesion] = indice
+        self._sesiones_por_ejecutor[indice] += 1
+        self._candados[id_sesion] = asyncio.Lock()
+
+        loop = asyncio.get_running_loop()
+        try:
+            estadisticas = await _esperar_trabajo(
+                loop.run_in_executor(self._ejecutores[indice], abrir_sesion_local, id_sesion, con_motor, id_chofer, id_viaje)
+            )
+        except Exception:
+            del self._ejecutor_sesion[id_sesion]
+            del self._candados[id_sesion]
+            self._sesiones_por_ejecutor[indice] -= 1
+            raise
+        self._guardar_estadisticas(indice, estadisticas)
+        return id_sesion
+
+    async def procesar(
+        self,
+        id_sesion: str,
+        datos: Buffer,
+        perfil: str = PERFIL_COMPLETO,
+        calidad_jpeg: int = 80,
+        en_base64: bool = True,
+        marca_tiempo: Optional[float] = None,
+        nivel_calidad: int = 0
+    ) -> ResultadoCuadro:
+        """
+        Procesar un cuadro sin bloquear el event loop
+
+        Args:
+            id_sesion: Sesión devuelta por ``abrir_sesion``
+            datos: JPEG en base64 (str) o bytes JPEG
+            perfil: Imágenes a devolver (ver PERFILES_VALIDOS)
+            calidad_jpeg: Calidad JPEG de las imágenes de respuesta
+            en_base64: Devolver las imágenes en base64 (protocolo de texto)
+            marca_tiempo: Segundos epoch de la captura (None: reloj del trabajador)
+            nivel_calidad: Escalón de NIVELES_CALIDAD elegido por el controlador de carga
+
+        Returns:
+            ResultadoCuadro
+        """
+        if isinstance(datos, memoryview) and self.tipo == TIPO_PROCESOS:
+            datos = datos.tobytes()
+        indice = self._ejecutor_sesion[id_sesion]
+        loop = asyncio.get_running_loop()
+        async with self._candados[id_sesion]:
+            resultado = await _esperar_trabajo(loop.run_in_executor(
+                self._ejecutores[indice], procesar_cuadro, id_sesion, datos, perfil, calidad_jpeg, en_base64,
+                marca_tiempo, nivel_calidad
+            ))
+        self._guardar_estadisticas(indice, resultado.estadisticas)
+        return resultado
+
+    async def procesar_landmarks(
+        self,
+        id_sesion: str,
+        malla_rostro,
+        manos,
+        marca_tiempo: Optional[float] = None
+    ) -> ResultadoCuadro:
+        """
+        Procesar los landmarks de una sesión sin bloquear el event loop
+
+        Args:
+            id_sesion: Sesión devuelta por ``abrir_sesion(con_motor=False)``
+            malla_rostro: Malla (478, 2) en píxeles o None sin rostro
+            manos: Manos (M, 21, 2) en píxeles
+            marca_tiempo: Segundos epoch de la captura
+
+        Returns:
+            ResultadoCuadro solo con el reporte
+        """
+        indice = self._ejecutor_sesion[id_sesion]
+        loop = asyncio.get_running_loop()
+        async with self._candados[id_sesion]:
+            resultado = await _esperar_trabajo(loop.run_in_executor(
+                self._ejecutores[indice], procesar_landmarks, id_sesion, malla_rostro, manos, marca_tiempo
+            ))
+        self._guardar_estadisticas(indice, resultado.estadisticas)
+        return resultado
+
+    async def cerrar_sesion(self, id_sesion: str) -> None:
+        """Liberar el estado de la sesión una vez procesado su último cuadro"""
+        indice = self._ejecutor_sesion.get(id_sesion)
+        if indice is None:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._candados[id_sesion]:
+            try:
+                estadisticas = await _esperar_trabajo(
+                    loop.run_in_executor(self._ejecutores[indice], cerrar_sesion_local, id_sesion)
+                )
+                self._guardar_estadisticas(indice, estadisticas)
+            finally:
+                del self._ejecutor_sesion[id_sesion]
+                del self._candados[id_sesion]
+                self._sesiones_por_ejecutor[indice] -= 1
+
+    def _guardar_estadisticas(self, indice: int, estadisticas: Optional[dict]) -> None:
+        if estadisticas is not None and self.tipo == TIPO_PROCESOS:
+            self._estadisticas[indice] = estadisticas
+
+    async def estadisticas(self) -> List[dict]:
+        """
+        Estado de los pools de inferencia (uno por proceso trabajador)
+
+        No se encola detrás de los cuadros pendientes: en modo "thread" los
+        contadores se leen en el event loop; en modo "process" se devuelve
+        el último estado que publicó cada trabajador (con sus resultados,
+        al abrir y al cerrar sesiones). Solo se consulta al trabajador que
+        aún no publicó nada, que por eso no tiene cuadros en cola; la
+        primera consulta además arranca y precalienta su proceso.
+
+        Returns:
+            Lista con tamaño, motores en uso y memoria de cada proceso
+        """
+        if self.tipo == TIPO_HILOS:
+            return [estadisticas_pool_local()]
+        loop = asyncio.get_running_loop()
+        pendientes = [indice for indice, estadisticas in enumerate(self._estadisticas) if estadisticas is None]
+        consultadas = await asyncio.gather(*[
+            loop.run_in_executor(self._ejecutores[indice], estadisticas_pool_local)
+            for indice in pendientes
+        ])
+        for indice, estadisticas in zip(pendientes, consultadas):
+            self._guardar_estadisticas(indice, estadisticas)
+        return [dict(estadisticas) for estadisticas in self._estadisticas]
+
+    def cerrar(self) -> None:
+        """Detener los trabajadores (apagado de la aplicación)"""
+        global _ejecutor_manos
+        for ejecutor in self._ejecutores:
+            ejecutor.shutdown(wait=False, cancel_futures=True)
+        self._ejecutores.clear()
+        if _ejecutor_manos is not None:
+            _ejecutor_manos.shutdown(wait=False)
+            _ejecutor_manos = None
+        cerrar_escritor_eventos()
+        logger.info("Ejecutor de monitoreo detenido")
+
+
+_ejecutor: Optional[EjecutorMonitoreo] = None
+
+
+def obtener_ejecutor() -> EjecutorMonitoreo:
+    """
+    Singleton del ejecutor de monitoreo (se crea en el primer uso)
+    """
+    global _ejecutor
+    if _ejecutor is None:
+        _ejecutor = EjecutorMonitoreo(
+            tipo=settings.MONITORING_EXECUTOR,
+            max_trabajadores=settings.MONITORING_MAX_WORKERS,
+            tamano_pool=settings.MONITORING_INFERENCE_POOL_SIZE,
+            modo_pool=settings.MONITORING_INFERENCE_CHECKOUT,
+            tiempo_espera_pool=settings.MONITORING_INFERENCE_POOL_TIMEOUT,
+            manos_en_paralelo=settings.MONITORING_PARALLEL_HANDS
+        )
+    return _ejecutor
+
+
+def cerrar_ejecutor() -> None:
+    """Detener el ejecutor si fue creado"""
+    global _ejecutor
+    if _ejecutor is not None:
+        _ejecutor.cerrar()
+        _ejecutor = None
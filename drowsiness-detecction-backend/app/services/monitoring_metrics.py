@@ -0,0 +1,160 @@
+# ============================================
+# MÉTRICAS DEL MONITOREO
+# Contadores e histogramas de las sesiones en formato de texto Prometheus
+# ============================================
+
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set
+
+# Límites superiores (segundos) de los buckets de latencia
+LIMITES_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Etapas medidas en el trabajador (ver SistemaDeteccionSomnolencia.tiempos_etapas)
+# más "cuadro": ida y vuelta completa al ejecutor vista desde la sesión
+ETAPAS = (
+    "decodificacion",
+    "extraccion",
+    "mediciones",
+    "caracteristicas",
+    "visualizacion",
+    "reportes",
+    "codificacion",
+    "cuadro",
+)
+
+# (nombre, descripción, atributo del acumulador)
+CONTADORES = (
+    ("monitoreo_cuadros_recibidos_total", "Cuadros recibidos de los clientes", "recibidos"),
+    ("monitoreo_cuadros_procesados_total", "Cuadros procesados y respondidos", "procesados"),
+    ("monitoreo_cuadros_descartados_total", "Cuadros descartados por el buzón sin procesar", "descartados"),
+    ("monitoreo_cuadros_error_total", "Cuadros que terminaron en error", "errores"),
+    ("monitoreo_cuadros_sin_rostro_total", "Cuadros procesados sin rostro detectado", "sin_rostro"),
+    ("monitoreo_bytes_enviados_total", "Bytes de respuesta enviados a los clientes", "bytes_enviados"),
+    ("monitoreo_cuadros_calidad_reducida_total", "Cuadros procesados con calidad reducida por carga",
+     "calidad_reducida"),
+)
+
+
+class HistogramaLatencia:
+    """Histograma de buckets fijos; cada observación es una búsqueda y una suma"""
+
+    __slots__ = ("conteos", "suma")
+
+    def __init__(self):
+        # un bucket por límite más el de +Inf, no acumulados
+        self.conteos: List[int] = [0] * (len(LIMITES_LATENCIA) + 1)
+        self.suma: float = 0.0
+
+    def observar(self, segundos: float) -> None:
+        self.conteos[bisect_left(LIMITES_LATENCIA, segundos)] += 1
+        self.suma += segundos
+
+    def acumular(self, otro: "HistogramaLatencia") -> None:
+        for indice, conteo in enumerate(otro.conteos):
+            self.conteos[indice] += conteo
+        self.suma += otro.suma
+
+
+class AcumuladorSesion:
+    """
+    Métricas de una sesión de monitoreo
+
+    Solo las escribe la tarea de su sesión en el event loop, así que no
+    necesita candados; los histogramas se crean una vez al abrir la sesión.
+    """
+
+    __slots__ = ("recibidos", "procesados", "descartados", "errores", "sin_rostro",
+                 "bytes_enviados", "calidad_reducida", "latencias")
+
+    def __init__(self):
+        self.recibidos = 0
+        self.procesados = 0
+        self.descartados = 0
+        self.errores = 0
+        self.sin_rostro = 0
+        self.bytes_enviados = 0
+        self.calidad_reducida = 0
+        self.latencias: Dict[str, HistogramaLatencia] = {etapa: HistogramaLatencia() for etapa in ETAPAS}
+
+    def registrar_buzon(self, recibidos: int, descartados: int) -> None:
+        self.recibidos = recibidos
+        self.descartados = descartados
+
+    def registrar_cuadro(self, rostro_detectado: bool, tiempos: Optional[Dict[str, float]], duracion: float) -> None:
+        self.procesados += 1
+        if not rostro_detectado:
+            self.sin_rostro += 1
+        for etapa, segundos in (tiempos or {}).items():
+            histograma = self.latencias.get(etapa)
+            if histograma is not None:
+                histograma.observar(segundos)
+        self.latencias["cuadro"].observar(duracion)
+
+    def acumular(self, otro: "AcumuladorSesion") -> None:
+        for _, _, atributo in CONTADORES:
+            setattr(self, atributo, getattr(self, atributo) + getattr(otro, atributo))
+        for etapa, histograma in otro.latencias.items():
+            self.latencias[etapa].acumular(histograma)
+
+
+class RegistroMetricas:
+    """
+    Métricas del proceso del servidor
+
+    Las sesiones activas se suman al exponer; al cerrar una sesión sus
+    valores pasan al acumulado histórico para que los contadores nunca
+    retrocedan.
+    """
+
+    def __init__(self):
+        self.historico = AcumuladorSesion()
+        self.activas: Set[AcumuladorSesion] = set()
+
+    def registrar(self, acumulador: AcumuladorSesion) -> None:
+        self.activas.add(acumulador)
+
+    def retirar(self, acumulador: AcumuladorSesion) -> None:
+        if acumulador in self.activas:
+            self.activas.discard(acumulador)
+            self.historico.acumular(acumulador)
+
+    def total(self) -> AcumuladorSesion:
+        total = AcumuladorSesion()
+        total.acumular(self.historico)
+        for acumulador in self.activas:
+            total.acumular(acumulador)
+        return total
+
+    def exponer(self) -> str:
+        """
+        Generar el texto de exposición de Prometheus (versión 0.0.4)
+
+        Returns:
+            Contadores, sesiones activas e histogramas de latencia por etapa
+        """
+        total = self.total()
+        lineas = []
+        for nombre, descripcion, atributo in CONTADORES:
+            lineas.append(f"# HELP {nombre} {descripcion}")
+            lineas.append(f"# TYPE {nombre} counter")
+            lineas.append(f"{nombre} {getattr(total, atributo)}")
+
+        lineas.append("# HELP monitoreo_sesiones_activas Sesiones WebSocket de monitoreo abiertas")
+        lineas.append("# TYPE monitoreo_sesiones_activas gauge")
+        lineas.append(f"monitoreo_sesiones_activas {len(self.activas)}")
+
+        nombre = "monitoreo_latencia_etapa_segundos"
+        lineas.append(f"# HELP {nombre} Latencia de procesamiento por etapa del cuadro")
+        lineas.append(f"# TYPE {nombre} histogram")
+        for etapa, histograma in total.latencias.items():
+            acumulado = 0
+            for limite, conteo in zip(LIMITES_LATENCIA + ("+Inf",), histograma.conteos):
+                acumulado += conteo
+                lineas.append(f'{nombre}_bucket{{etapa="{etapa}",le="{limite}"}} {acumulado}')
+            lineas.append(f'{nombre}_sum{{etapa="{etapa}"}} {histograma.suma}')
+            lineas.append(f'{nombre}_count{{etapa="{etapa}"}} {acumulado}')
+        return "\n".join(lineas) + "\n"
+
+
+# Registro del proceso del servidor (uno por proceso de uvicorn)
+registro_metricas = RegistroMetricas()
@@ -0,0 +1,303 @@
+# ============================================
+# PROTOCOLO DEL WEBSOCKET DE MONITOREO
+# Define el formato de los mensajes intercambiados con el cliente
+# ============================================
+
+import json
+import math
+import struct
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+from starlette.websockets import WebSocket
+
+# Protocolos soportados
+PROTOCOLO_BASE64 = "base64"
+PROTOCOLO_BINARIO = "binario"
+PROTOCOLOS_VALIDOS = (PROTOCOLO_BASE64, PROTOCOLO_BINARIO)
+
+# Perfiles de respuesta: qué imágenes se codifican y devuelven con el reporte
+PERFIL_REPORTE = "reporte"      # solo reporte_json y alarma
+PERFIL_BOSQUEJO = "bosquejo"    # reporte + imagen_bosquejo
+PERFIL_COMPLETO = "completo"    # reporte + imagen_bosquejo + imagen_original (por defecto)
+PERFIL_VECTORIAL = "vectorial"  # reporte + puntos cuantizados + estado del overlay (dibuja el cliente)
+PERFILES_VALIDOS = (PERFIL_REPORTE, PERFIL_BOSQUEJO, PERFIL_COMPLETO, PERFIL_VECTORIAL)
+PERFILES_CON_BOSQUEJO = (PERFIL_BOSQUEJO, PERFIL_COMPLETO)
+
+# Envío del reporte de somnolencia (``?reporte=``):
+#   delta (por defecto): {"tipo": "instantanea"} con el reporte completo en el
+#       primer mensaje; después {"tipo": "delta"} solo con las secciones que
+#       cambiaron y "alarma" / "calidad" cuando cambian. Sin cambios ni
+#       imágenes que enviar no se envía nada salvo {"tipo": "keepalive"}
+#       cada MONITORING_REPORT_KEEPALIVE_SECONDS. El mensaje de control
+#       {"instantanea": true} pide de nuevo el reporte completo.
+#   completo: reporte completo, alarma y contadores en cada cuadro
+MODO_REPORTE_DELTA = "delta"
+MODO_REPORTE_COMPLETO = "completo"
+MODOS_REPORTE_VALIDOS = (MODO_REPORTE_DELTA, MODO_REPORTE_COMPLETO)
+MENSAJE_INSTANTANEA = "instantanea"
+MENSAJE_DELTA = "delta"
+MENSAJE_KEEPALIVE = "keepalive"
+
+# Subprotocolo WebSocket equivalente a ?protocolo=binario
+SUBPROTOCOLO_BINARIO = "somnolencia.binario.v1"
+
+# Sobre binario de respuesta:
+#   cabecera: version (uint8) + cantidad de segmentos (uint8)
+#   por segmento: tipo (uint8) + longitud (uint32) + bytes
+# Todos los enteros en big-endian (orden de red)
+VERSION_SOBRE = 1
+CABECERA_SOBRE = struct.Struct("!BB")
+CABECERA_SEGMENTO = struct.Struct("!BI")
+
+# Tipos de segmento
+SEGMENTO_METADATOS = 1   # JSON UTF-8 (reporte_json, alarma, error, ...)
+SEGMENTO_BOSQUEJO = 2    # JPEG
+SEGMENTO_ORIGINAL = 3    # JPEG
+SEGMENTO_MALLA_ROSTRO = 4  # int16 little-endian, pares (x, y) en píxeles: 478 puntos
+SEGMENTO_MANOS = 5         # int16 little-endian, pares (x, y): 21 puntos por mano
+
+# Tipo de los puntos cuantizados del perfil vectorial (mismo orden de bytes
+# que los typed arrays de JavaScript en las plataformas habituales)
+TIPO_PUNTOS = "<i2"
+
+# Cuadro binario con marca de tiempo de captura (opcional):
+#   prefijo 0x01 (uint8) + milisegundos epoch (float64) + bytes JPEG
+# Un JPEG empieza siempre con 0xFF, así que el prefijo no es ambiguo.
+# En el protocolo de texto: {"cuadro": "<base64>", "marca_tiempo": <ms epoch>}
+PREFIJO_MARCA_TIEMPO = 0x01
+CABECERA_CUADRO = struct.Struct("!Bd")
+
+# Ingesta de landmarks (/ws/landmarks): el cliente ejecuta el seguimiento
+# de rostro y manos y envía solo los puntos, en el mismo formato que
+# devuelve el perfil vectorial.
+#   binario: sobre con SEGMENTO_MALLA_ROSTRO (478 puntos, o vacío sin rostro),
+#            SEGMENTO_MANOS (0 a 2 manos) y opcionalmente SEGMENTO_METADATOS
+#            con {"marca_tiempo": <ms epoch>}
+#   texto:   {"malla_rostro": [[x, y], ...], "manos": [[[x, y], ...], ...],
+#             "marca_tiempo": <ms epoch>}
+# Coordenadas en píxeles de la imagen de la cámara del cliente.
+PUNTOS_MALLA_ROSTRO = 478
+PUNTOS_MANO = 21
+MAXIMO_MANOS = 2
+
+Buffer = Union[bytes, bytearray, memoryview]
+Landmarks = Tuple[Optional[np.ndarray], np.ndarray, Optional[float]]
+
+
+def negociar_protocolo(websocket: WebSocket, protocolo: Optional[str]) -> Tuple[str, Optional[str]]:
+    """
+    Determinar el protocolo de la conexión
+
+    El cliente puede pedir el protocolo binario con el query param
+    ``protocolo=binario`` o con el subprotocolo ``somnolencia.binario.v1``.
+
+    Args:
+        websocket: Conexión entrante (aún sin aceptar)
+        protocolo: Valor del query param ``protocolo``
+
+    Returns:
+        Tupla (protocolo, subprotocolo a confirmar en accept)
+
+    Raises:
+        ValueError: Si el protocolo solicitado no existe
+    """
+    subprotocolos = websocket.scope.get("subprotocols", [])
+    if SUBPROTOCOLO_BINARIO in subprotocolos:
+        return PROTOCOLO_BINARIO, SUBPROTOCOLO_BINARIO
+
+    protocolo = (protocolo or PROTOCOLO_BASE64).lower()
+    if protocolo not in PROTOCOLOS_VALIDOS:
+        raise ValueError(f"Protocolo no soportado: {protocolo}")
+    return protocolo, None
+
+
+def validar_perfil(perfil: Optional[str]) -> str:
+    """
+    Normalizar el perfil de respuesta pedido por el cliente
+
+    Args:
+        perfil: Valor del query param ``perfil`` o del mensaje de control
+
+    Returns:
+        Perfil válido (``completo`` si no se indicó ninguno)
+
+    Raises:
+        ValueError: Si el perfil solicitado no existe
+    """
+    perfil = (perfil or PERFIL_COMPLETO).lower()
+    if perfil not in PERFILES_VALIDOS:
+        raise ValueError(f"Perfil de respuesta no soportado: {perfil}")
+    return perfil
+
+
+def validar_modo_reporte(modo: Optional[str]) -> str:
+    """
+    Normalizar el modo de envío del reporte pedido por el cliente
+
+    Args:
+        modo: Valor del query param ``reporte``
+
+    Returns:
+        Modo válido (``delta`` si no se indicó ninguno)
+
+    Raises:
+        ValueError: Si el modo solicitado no existe
+    """
+    modo = (modo or MODO_REPORTE_DELTA).lower()
+    if modo not in MODOS_REPORTE_VALIDOS:
+        raise ValueError(f"Modo de reporte no soportado: {modo}")
+    return modo
+
+
+def separar_cuadro_binario(datos: Buffer) -> Tuple[Buffer, Optional[float]]:
+    """
+    Separar la marca de tiempo de captura de un cuadro binario
+
+    Args:
+        datos: Mensaje binario recibido (JPEG, con o sin prefijo)
+
+    Returns:
+        Tupla (bytes JPEG sin copiar, marca de tiempo en segundos o None)
+
+    Raises:
+        ValueError: Si el prefijo está truncado
+    """
+    if not datos or datos[0] != PREFIJO_MARCA_TIEMPO:
+        return datos, None
+    if len(datos) < CABECERA_CUADRO.size:
+        raise ValueError("Cabecera de cuadro truncada")
+    _, milisegundos = CABECERA_CUADRO.unpack_from(datos, 0)
+    return memoryview(datos)[CABECERA_CUADRO.size:], milisegundos / 1000
+
+
+def empaquetar_sobre(segmentos: Iterable[Tuple[int, Buffer]]) -> bytes:
+    """
+    Construir el sobre binario de respuesta
+
+    Args:
+        segmentos: Pares (tipo de segmento, bytes). Se aceptan buffers
+            (por ejemplo el ndarray devuelto por cv2.imencode) sin copiarlos
+            antes del ensamblado final.
+
+    Returns:
+        Mensaje listo para ``send_bytes``
+    """
+    partes = []
+    for tipo, contenido in segmentos:
+        contenido = memoryview(contenido).cast("B")
+        partes.append(CABECERA_SEGMENTO.pack(tipo, contenido.nbytes))
+        partes.append(contenido)
+    return CABECERA_SOBRE.pack(VERSION_SOBRE, len(partes) // 2) + b"".join(partes)
+
+
+def desempaquetar_sobre(datos: Buffer) -> Dict[int, memoryview]:
+    """
+    Leer un sobre binario (utilidad para clientes y pruebas)
+
+    Args:
+        datos: Mensaje binario recibido
+
+    Returns:
+        Diccionario tipo de segmento -> contenido
+
+    Raises:
+        ValueError: Si el sobre está truncado o la versión no es soportada
+    """
+    vista = memoryview(datos).cast("B")
+    if vista.nbytes < CABECERA_SOBRE.size:
+        raise ValueError("Sobre binario truncado")
+
+    version, cantidad = CABECERA_SOBRE.unpack_from(vista, 0)
+    if version != VERSION_SOBRE:
+        raise ValueError(f"Versión de sobre no soportada: {version}")
+
+    segmentos: Dict[int, memoryview] = {}
+    desplazamiento = CABECERA_SOBRE.size
+    for _ in range(cantidad):
+        if desplazamiento + CABECERA_SEGMENTO.size > vista.nbytes:
+            raise ValueError("Sobre binario truncado")
+        tipo, longitud = CABECERA_SEGMENTO.unpack_from(vista, desplazamiento)
+        desplazamiento += CABECERA_SEGMENTO.size
+        if desplazamiento + longitud > vista.nbytes:
+            raise ValueError("Sobre binario truncado")
+        segmentos[tipo] = vista[desplazamiento:desplazamiento + longitud]
+        desplazamiento += longitud
+    return segmentos
+
+
+def codificar_metadatos(metadatos: dict) -> bytes:
+    """Serializar los metadatos de respuesta como JSON UTF-8 compacto"""
+    return json.dumps(metadatos, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _validar_landmarks(malla: np.ndarray, manos: np.ndarray) -> Tuple[Optional[np.ndarray], np.ndarray]:
+    if malla.size and malla.shape != (PUNTOS_MALLA_ROSTRO, 2):
+        raise ValueError(f"La malla del rostro debe tener {PUNTOS_MALLA_ROSTRO} puntos (x, y)")
+    if manos.shape[1:] != (PUNTOS_MANO, 2) or len(manos) > MAXIMO_MANOS:
+        raise ValueError(f"Se esperan hasta {MAXIMO_MANOS} manos de {PUNTOS_MANO} puntos (x, y)")
+    return (malla if malla.size else None), manos
+
+
+def _leer_marca_tiempo(valor) -> Optional[float]:
+    # milisegundos epoch del cliente a segundos; None si no la envía
+    if valor is None:
+        return None
+    try:
+        segundos = float(valor) / 1000
+    except (TypeError, ValueError):
+        raise ValueError("marca_tiempo debe ser un número (milisegundos epoch)")
+    if not math.isfinite(segundos):
+        raise ValueError("marca_tiempo debe ser un número finito")
+    return segundos
+
+
+def decodificar_landmarks_binario(datos: Buffer) -> Landmarks:
+    """
+    Leer un mensaje binario de landmarks del cliente
+
+    Args:
+        datos: Sobre binario con los segmentos de malla, manos y metadatos
+
+    Returns:
+        Tupla (malla (478, 2) o None sin rostro, manos (M, 21, 2), marca de tiempo en segundos o None)
+
+    Raises:
+        ValueError: Si el sobre está truncado, los metadatos no son un objeto
+            JSON, la marca de tiempo no es numérica o los puntos no tienen la
+            forma esperada
+    """
+    segmentos = desempaquetar_sobre(datos)
+    marca_tiempo = None
+    if SEGMENTO_METADATOS in segmentos:
+        metadatos = json.loads(bytes(segmentos[SEGMENTO_METADATOS]))
+        if not isinstance(metadatos, dict):
+            raise ValueError("Los metadatos deben ser un objeto JSON")
+        marca_tiempo = _leer_marca_tiempo(metadatos.get("marca_tiempo"))
+    try:
+        malla = np.frombuffer(segmentos.get(SEGMENTO_MALLA_ROSTRO, b""), TIPO_PUNTOS).reshape(-1, 2)
+        manos = np.frombuffer(segmentos.get(SEGMENTO_MANOS, b""), TIPO_PUNTOS).reshape(-1, PUNTOS_MANO, 2)
+    except ValueError:
+        raise ValueError("Segmento de puntos con longitud inválida")
+    return (*_validar_landmarks(malla, manos), marca_tiempo)
+
+
+def decodificar_landmarks_json(contenido: dict) -> Landmarks:
+    """
+    Leer un mensaje de texto de landmarks del cliente
+
+    Args:
+        contenido: Objeto JSON con "malla_rostro", "manos" y "marca_tiempo"
+
+    Returns:
+        Igual que ``decodificar_landmarks_binario``
+
+    Raises:
+        ValueError: Si la marca de tiempo no es numérica o los puntos no tienen la forma esperada
+    """
+    malla = np.asarray(contenido.get("malla_rostro") or [], dtype=np.float32).reshape(-1, 2)
+    manos = np.asarray(contenido.get("manos") or [], dtype=np.float32)
+    if not manos.size:
+        manos = manos.reshape(0, PUNTOS_MANO, 2)
+    marca_tiempo = _leer_marca_tiempo(contenido.get("marca_tiempo"))
+    return (*_validar_landmarks(malla, manos), marca_tiempo)
\ No newline at end of file
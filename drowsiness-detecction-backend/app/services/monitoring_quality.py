@@ -0,0 +1,96 @@
+# ============================================
+# CALIDAD ADAPTATIVA DEL MONITOREO
+# Baja la calidad del pipeline cuando la latencia de los cuadros crece
+# ============================================
+
+import logging
+import time
+from typing import Optional
+
+from app.core.config import settings
+from app.drowsiness_processor.quality_levels import NIVEL_MAXIMO
+
+logger = logging.getLogger(__name__)
+
+# Peso de cada cuadro en la latencia suavizada
+PESO_MUESTRA = 0.2
+# Se sube de nivel con la latencia por debajo de esta fracción del objetivo
+FRACCION_SUBIDA = 0.5
+# Bajar espera ESPERA_BAJADA segundos desde el último cambio (que el nivel nuevo se note en la media);
+# subir necesita ESPERA_SUBIDA segundos seguidos con poca latencia
+ESPERA_BAJADA = 1.0
+ESPERA_SUBIDA = 5.0
+
+
+class ControladorCalidad:
+    """
+    Controlador de calidad por latencia
+
+    Observa la latencia de ida y vuelta de cada cuadro (cola del ejecutor
+    incluida) y la suaviza con una media exponencial. Si supera el
+    objetivo baja un escalón de NIVELES_CALIDAD; si se mantiene por debajo
+    de la mitad del objetivo durante ESPERA_SUBIDA segundos sube uno. Cada
+    sesión tiene su controlador y el nodo uno compartido por todas; la
+    sesión usa el más bajo de los dos niveles (el número mayor).
+    """
+
+    def __init__(self, objetivo: float, nombre: str = "sesion"):
+        self.objetivo = objetivo
+        self.nombre = nombre
+        self.nivel = 0
+        self.latencia: Optional[float] = None
+        self.ultimo_cambio = 0.0
+        # desde cuándo la latencia está por debajo de FRACCION_SUBIDA del objetivo
+        self.inicio_holgura: Optional[float] = None
+
+    def observar(self, segundos: float, ahora: Optional[float] = None) -> bool:
+        """
+        Registrar la latencia de un cuadro y ajustar el nivel
+
+        Args:
+            segundos: Duración de ida y vuelta del cuadro al ejecutor
+            ahora: Reloj monotónico (None: time.monotonic())
+
+        Returns:
+            True si el nivel cambió
+        """
+        ahora = time.monotonic() if ahora is None else ahora
+        if self.latencia is None:
+            self.latencia = segundos
+        else:
+            self.latencia += PESO_MUESTRA * (segundos - self.latencia)
+
+        nivel = self.nivel
+        if self.latencia > self.objetivo:
+            self.inicio_holgura = None
+            if ahora - self.ultimo_cambio >= ESPERA_BAJADA:
+                nivel = min(self.nivel + 1, NIVEL_MAXIMO)
+        elif self.latencia < self.objetivo * FRACCION_SUBIDA:
+            if self.inicio_holgura is None:
+                self.inicio_holgura = ahora
+            if ahora - self.inicio_holgura >= ESPERA_SUBIDA:
+                nivel = max(self.nivel - 1, 0)
+                # el siguiente escalón vuelve a esperar su propio intervalo sin carga
+                self.inicio_holgura = ahora
+        else:
+            self.inicio_holgura = None
+        if nivel == self.nivel:
+            return False
+
+        logger.info(
+            f"Calidad de {self.nombre}: nivel {self.nivel} -> {nivel} "
+            f"(latencia {self.latencia * 1000:.0f} ms, objetivo {self.objetivo * 1000:.0f} ms)"
+        )
+        self.nivel = nivel
+        self.ultimo_cambio = ahora
+        return True
+
+
+def crear_controlador(nombre: str = "sesion") -> Optional[ControladorCalidad]:
+    if not settings.MONITORING_QUALITY_ADAPTIVE:
+        return None
+    return ControladorCalidad(settings.MONITORING_QUALITY_TARGET_MS / 1000, nombre)
+
+
+# Controlador del nodo (uno por proceso de uvicorn), alimentado por todas las sesiones
+controlador_nodo = crear_controlador("nodo")
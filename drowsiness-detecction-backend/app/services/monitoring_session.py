@@ -0,0 +1,500 @@
+# ============================================
+# SESIÓN DE MONITOREO
+# Recepción, procesamiento y envío de cuadros de un cliente WebSocket
+# ============================================
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Optional
+
+from fastapi import WebSocket, WebSocketDisconnect, status
+
+from app.core.config import settings
+from app.drowsiness_processor.extract_points.inference_pool import PoolAgotadoError
+from app.drowsiness_processor.quality_levels import NIVELES_CALIDAD
+from app.drowsiness_processor.reports.report_delta import EmisorDeltas
+from app.services.monitoring_executor import EjecutorMonitoreo, ResultadoCuadro
+from app.services.monitoring_admission import control_admision
+from app.services.monitoring_metrics import AcumuladorSesion, registro_metricas
+from app.services.monitoring_quality import controlador_nodo, crear_controlador
+from app.services.monitoring_protocol import (
+    PROTOCOLO_BINARIO,
+    SEGMENTO_METADATOS,
+    SEGMENTO_BOSQUEJO,
+    SEGMENTO_ORIGINAL,
+    SEGMENTO_MALLA_ROSTRO,
+    SEGMENTO_MANOS,
+    PERFIL_COMPLETO,
+    MODO_REPORTE_DELTA,
+    MENSAJE_INSTANTANEA,
+    MENSAJE_DELTA,
+    MENSAJE_KEEPALIVE,
+    validar_perfil,
+    separar_cuadro_binario,
+    decodificar_landmarks_binario,
+    decodificar_landmarks_json,
+    empaquetar_sobre,
+    codificar_metadatos
+)
+
+logger = logging.getLogger(__name__)
+
+# Marca de fin del buzón de cuadros (cliente desconectado)
+_FIN = object()
+
+
+class BuzonCuadros:
+    """
+    Buzón de cuadros con descarte de los más antiguos
+
+    Guarda a lo sumo ``capacidad`` cuadros. Si llega uno nuevo con el buzón
+    lleno se descarta el más antiguo: la latencia de una alarma importa más
+    que procesar todos los cuadros.
+    """
+
+    def __init__(self, capacidad: int = 1):
+        if capacidad < 1:
+            raise ValueError("El buzón necesita al menos un espacio")
+        self._cuadros: deque = deque()
+        self._capacidad = capacidad
+        self._disponible = asyncio.Event()
+        self._cerrado = False
+        self.recibidos = 0
+        self.descartados = 0
+
+    def depositar(self, datos) -> None:
+        """Guardar un cuadro nuevo sin bloquear, descartando el más antiguo si hace falta"""
+        self.recibidos += 1
+        if len(self._cuadros) >= self._capacidad:
+            self._cuadros.popleft()
+            self.descartados += 1
+        self._cuadros.append(datos)
+        self._disponible.set()
+
+    def cerrar(self) -> None:
+        """Marcar el fin de la sesión; los cuadros pendientes se descartan"""
+        self.descartados += len(self._cuadros)
+        self._cuadros.clear()
+        self._cerrado = True
+        self._disponible.set()
+
+    async def tomar(self):
+        """
+        Esperar y retirar el cuadro más antiguo que queda en el buzón
+
+        Returns:
+            Datos del cuadro o ``_FIN`` si el buzón fue cerrado
+        """
+        while not self._cuadros:
+            if self._cerrado:
+                return _FIN
+            self._disponible.clear()
+            await self._disponible.wait()
+        return self._cuadros.popleft()
+
+
+class SesionMonitoreo:
+    """
+    Sesión de monitoreo de un cliente
+
+    La recepción corre en una tarea propia y deja los cuadros en un buzón
+    de ``MONITORING_MAILBOX_SLOTS`` espacios que descarta los cuadros viejos;
+    el bucle principal procesa siempre los más recientes, en orden, en el
+    ejecutor y envía las respuestas. Así el socket se sigue leyendo mientras
+    la inferencia corre fuera del event loop y la latencia no crece aunque
+    el cliente envíe más rápido de lo que se procesa.
+
+    Cada cuadro lleva su marca de tiempo de captura (enviada por el cliente
+    o, si no la envía, la hora de recepción); es el único reloj que usan los
+    detectores, así que las duraciones no dependen de la cola ni del
+    tiempo de inferencia.
+
+    El perfil de respuesta se fija al conectar (``?perfil=``) y puede
+    cambiarse en cualquier momento con un mensaje de control de texto
+    ``{"perfil": "reporte"}``; aplica desde el siguiente cuadro procesado.
+
+    Con MONITORING_QUALITY_ADAPTIVE la calidad del pipeline baja por
+    escalones cuando crece la latencia de la sesión o del nodo (ver
+    ControladorCalidad) y cada respuesta informa el nivel en "calidad".
+
+    Al conectarse la sesión reserva su presupuesto de CPU y un motor de
+    inferencia (ver ControlAdmision); si no caben se cierra con 1013 y
+    "reintentar_en".
+
+    En modo de reporte "delta" el reporte va completo en el primer
+    mensaje y después solo lo que cambia (ver EmisorDeltas); los cuadros
+    sin cambios ni imágenes no generan mensaje, salvo un keepalive
+    periódico con los contadores de cuadros.
+    """
+
+    # las sesiones sin inferencia en el servidor no tienen calidad que ajustar
+    adaptar_calidad = True
+    # las sesiones de cuadros retienen un motor del pool de inferencia
+    con_motor = True
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        protocolo: str,
+        ejecutor: EjecutorMonitoreo,
+        perfil: str = PERFIL_COMPLETO,
+        id_chofer: Optional[int] = None,
+        id_viaje: Optional[int] = None,
+        modo_reporte: str = MODO_REPORTE_DELTA
+    ):
+        self.websocket = websocket
+        self.protocolo = protocolo
+        self.ejecutor = ejecutor
+        self.perfil = perfil
+        # claves de conductor y viaje de los eventos de somnolencia (None: sesión anónima / sin viaje)
+        self.id_chofer = id_chofer
+        self.id_viaje = id_viaje
+        self.buzon = BuzonCuadros(settings.MONITORING_MAILBOX_SLOTS)
+        self.conteo_cuadros = 0
+        # métricas de la sesión; se exponen en /monitoring/metrics mientras está activa
+        self.metricas = AcumuladorSesion()
+        self.controlador_calidad = crear_controlador() if self.adaptar_calidad else None
+        # modo delta: último estado enviado de alarma y calidad y reloj del último mensaje
+        self.emisor_deltas = (
+            EmisorDeltas(settings.MONITORING_REPORT_COUNTDOWN_BUCKET_SECONDS)
+            if modo_reporte == MODO_REPORTE_DELTA else None
+        )
+        self.alarma_enviada: Optional[bool] = None
+        self.calidad_enviada: Optional[int] = None
+        self.ultimo_envio = 0.0
+
+    @property
+    def nivel_calidad(self) -> int:
+        """Escalón de NIVELES_CALIDAD: el más bajo entre el de la sesión y el del nodo"""
+        if self.controlador_calidad is None:
+            return 0
+        return max(self.controlador_calidad.nivel, controlador_nodo.nivel if controlador_nodo else 0)
+
+    def observar_latencia(self, segundos: float) -> None:
+        if self.controlador_calidad is None:
+            return
+        self.controlador_calidad.observar(segundos)
+        if controlador_nodo is not None:
+            controlador_nodo.observar(segundos)
+
+    def presupuesto_cpu(self) -> float:
+        """Núcleos que reserva la sesión en el control de admisión"""
+        return settings.MONITORING_SESSION_CPU_BUDGET
+
+    def estadisticas_cuadros(self) -> dict:
+        return {
+            "recibidos": self.buzon.recibidos,
+            "procesados": self.conteo_cuadros,
+            "descartados": self.buzon.descartados,
+        }
+
+    def aplicar_control(self, control: dict) -> None:
+        """
+        Aplicar un mensaje de control JSON del cliente
+
+        Un control inválido se registra y se ignora: la sesión sigue con
+        el perfil anterior.
+        """
+        try:
+            if "perfil" in control:
+                self.perfil = validar_perfil(control["perfil"])
+                logger.info(f"Perfil de respuesta cambiado a: {self.perfil}")
+            if control.get(MENSAJE_INSTANTANEA) and self.emisor_deltas is not None:
+                # el siguiente mensaje vuelve a llevar el reporte completo
+                self.emisor_deltas.reiniciar()
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Mensaje de control inválido: {str(e)}")
+
+    def interpretar_mensaje(self, mensaje: dict):
+        """
+        Obtener (datos JPEG, marca de tiempo en segundos) de un mensaje
+
+        - bytes: JPEG, opcionalmente con prefijo de marca de tiempo
+        - texto base64: JPEG sin marca de tiempo
+        - texto JSON con "cuadro": JPEG base64 y "marca_tiempo" en ms
+        - otro texto JSON: mensaje de control (devuelve None)
+
+        Sin marca de tiempo del cliente se usa la hora de recepción.
+        """
+        datos = mensaje.get("bytes")
+        marca_tiempo = None
+        if datos is not None:
+            datos, marca_tiempo = separar_cuadro_binario(datos)
+        else:
+            datos = mensaje.get("text")
+            # el alfabeto base64 no incluye llaves: lo que empieza con "{" es JSON
+            if datos is not None and datos.startswith("{"):
+                try:
+                    contenido = json.loads(datos)
+                    if not isinstance(contenido, dict):
+                        raise ValueError("se esperaba un objeto JSON")
+                except ValueError as e:
+                    logger.warning(f"Mensaje de control inválido: {str(e)}")
+                    return None
+                if "cuadro" not in contenido:
+                    self.aplicar_control(contenido)
+                    return None
+                datos = contenido["cuadro"]
+                if contenido.get("marca_tiempo") is not None:
+                    marca_tiempo = float(contenido["marca_tiempo"]) / 1000
+        if marca_tiempo is None:
+            marca_tiempo = time.time()
+        return datos, marca_tiempo
+
+    async def recibir_cuadros(self):
+        """Leer mensajes del socket y depositar los cuadros en el buzón"""
+        try:
+            while True:
+                mensaje = await self.websocket.receive()
+                if mensaje["type"] == "websocket.disconnect":
+                    return
+                try:
+                    cuadro = self.interpretar_mensaje(mensaje)
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"Cuadro inválido descartado: {str(e)}")
+                    continue
+                if cuadro is not None:
+                    self.buzon.depositar(cuadro)
+                    self.metricas.registrar_buzon(self.buzon.recibidos, self.buzon.descartados)
+        finally:
+            # Despertar al bucle de procesamiento
+            self.buzon.cerrar()
+            self.metricas.registrar_buzon(self.buzon.recibidos, self.buzon.descartados)
+
+    def metadatos_reporte(self, resultado: ResultadoCuadro) -> dict:
+        """
+        Reporte, alarma, contadores y calidad del mensaje de un cuadro
+
+        En modo "completo" van siempre; en modo "delta" solo lo que cambió
+        desde el último mensaje (todo en la instantánea inicial).
+
+        Returns:
+            Metadatos del mensaje (vacío en modo delta si nada cambió)
+        """
+        calidad = None
+        if resultado.nivel_calidad is not None:
+            calidad = {
+                "nivel": resultado.nivel_calidad,
+                "nombre": NIVELES_CALIDAD[resultado.nivel_calidad].nombre,
+            }
+        if self.emisor_deltas is None:
+            metadatos = {
+                "reporte_json": resultado.reporte,
+                "alarma": resultado.alarma,
+                "cuadros": self.estadisticas_cuadros(),
+            }
+            if calidad is not None:
+                metadatos["calidad"] = calidad
+            return metadatos
+
+        instantanea = self.emisor_deltas.claves is None
+        cambios = self.emisor_deltas.calcular(resultado.reporte)
+        metadatos = {}
+        if cambios is not None:
+            metadatos["reporte_json"] = cambios
+        if instantanea or resultado.alarma != self.alarma_enviada:
+            metadatos["alarma"] = self.alarma_enviada = resultado.alarma
+        if calidad is not None and (instantanea or resultado.nivel_calidad != self.calidad_enviada):
+            metadatos["calidad"] = calidad
+            self.calidad_enviada = resultado.nivel_calidad
+        if instantanea:
+            metadatos["tipo"] = MENSAJE_INSTANTANEA
+            metadatos["cuadros"] = self.estadisticas_cuadros()
+        elif metadatos:
+            metadatos["tipo"] = MENSAJE_DELTA
+        return metadatos
+
+    async def enviar_resultado(self, resultado: ResultadoCuadro) -> int:
+        """
+        Enviar el reporte y solo las imágenes incluidas en el perfil
+
+        Returns:
+            Bytes enviados (0 si en modo delta no había nada que enviar)
+        """
+        metadatos = self.metadatos_reporte(resultado)
+        if resultado.overlay is not None:
+            metadatos["overlay"] = resultado.overlay
+            metadatos["dimensiones"] = resultado.dimensiones
+
+        # campos de texto / segmentos binarios opcionales según el perfil
+        opcionales = [
+            ("imagen_bosquejo", SEGMENTO_BOSQUEJO, resultado.imagen_bosquejo),
+            ("imagen_original", SEGMENTO_ORIGINAL, resultado.imagen_original),
+            ("malla_rostro", SEGMENTO_MALLA_ROSTRO, resultado.malla_rostro),
+            ("manos", SEGMENTO_MANOS, resultado.manos),
+        ]
+        ahora = time.monotonic()
+        if not metadatos and all(valor is None for _, _, valor in opcionales):
+            if ahora - self.ultimo_envio < settings.MONITORING_REPORT_KEEPALIVE_SECONDS:
+                return 0
+            metadatos = {"tipo": MENSAJE_KEEPALIVE, "cuadros": self.estadisticas_cuadros()}
+        elif self.emisor_deltas is not None:
+            # solo imágenes: el reporte del cliente sigue vigente
+            metadatos.setdefault("tipo", MENSAJE_DELTA)
+        self.ultimo_envio = ahora
+        if self.protocolo == PROTOCOLO_BINARIO:
+            segmentos = [(SEGMENTO_METADATOS, codificar_metadatos(metadatos))]
+            segmentos.extend((tipo, valor) for _, tipo, valor in opcionales if valor is not None)
+            sobre = empaquetar_sobre(segmentos)
+            await self.websocket.send_bytes(sobre)
+            return len(sobre)
+        metadatos.update((campo, valor) for campo, _, valor in opcionales if valor is not None)
+        # JSON solo ASCII: la longitud del texto son los bytes enviados
+        texto = json.dumps(metadatos, separators=(",", ":"))
+        await self.websocket.send_text(texto)
+        return len(texto)
+
+    async def enviar_error(self, error: Exception, reintentar_en: Optional[int] = None):
+        metadatos = {"error": str(error), "reporte_json": {}}
+        if reintentar_en is not None:
+            # segundos sugeridos antes de reconectar (a este u otro nodo)
+            metadatos["reintentar_en"] = reintentar_en
+        if self.protocolo == PROTOCOLO_BINARIO:
+            await self.websocket.send_bytes(empaquetar_sobre([
+                (SEGMENTO_METADATOS, codificar_metadatos(metadatos)),
+            ]))
+        else:
+            await self.websocket.send_json({
+                **metadatos,
+                "imagen_bosquejo": "",
+                "imagen_original": "",
+            })
+
+    async def rechazar(self, error: Exception) -> None:
+        """Avisar al cliente que reintente más tarde o en otro nodo y cerrar con 1013"""
+        reintentar_en = control_admision.sugerir_reintento()
+        await self.enviar_error(error, reintentar_en)
+        await self.websocket.close(
+            code=status.WS_1013_TRY_AGAIN_LATER,
+            reason=f"Sin capacidad de inferencia; reintentar en {reintentar_en} s"
+        )
+
+    async def abrir_sesion_ejecutor(self) -> str:
+        return await self.ejecutor.abrir_sesion(id_chofer=self.id_chofer, id_viaje=self.id_viaje)
+
+    async def procesar_cuadro(self, id_sesion: str, datos, marca_tiempo: float) -> ResultadoCuadro:
+        return await self.ejecutor.procesar(
+            id_sesion,
+            datos,
+            perfil=self.perfil,
+            marca_tiempo=marca_tiempo,
+            calidad_jpeg=settings.MONITORING_JPEG_QUALITY,
+            en_base64=self.protocolo != PROTOCOLO_BINARIO,
+            nivel_calidad=self.nivel_calidad
+        )
+
+    async def ejecutar(self):
+        """
+        Atender la sesión hasta que el cliente se desconecte
+        """
+        presupuesto = self.presupuesto_cpu()
+        if not control_admision.admitir(presupuesto, self.con_motor):
+            await self.rechazar(PoolAgotadoError("El servidor no tiene capacidad para más sesiones"))
+            return
+        try:
+            id_sesion = await self.abrir_sesion_ejecutor()
+        except PoolAgotadoError as e:
+            logger.warning(f"Sesión rechazada: {str(e)}")
+            control_admision.liberar_rechazada(presupuesto, self.con_motor)
+            await self.rechazar(e)
+            return
+        except BaseException:
+            control_admision.liberar(presupuesto, self.con_motor)
+            raise
+
+        registro_metricas.registrar(self.metricas)
+        tarea_recepcion = asyncio.create_task(self.recibir_cuadros())
+        try:
+            while True:
+                cuadro = await self.buzon.tomar()
+                if cuadro is _FIN:
+                    break
+                datos, marca_tiempo = cuadro
+
+                inicio = time.perf_counter()
+                try:
+                    # Procesar cuadro con el sistema de detección fuera del event loop
+                    resultado = await self.procesar_cuadro(id_sesion, datos, marca_tiempo)
+                except Exception as e:
+                    logger.error(f"Error al procesar cuadro: {str(e)}", exc_info=True)
+                    self.metricas.errores += 1
+                    # Enviar error al cliente pero mantener conexión
+                    await self.enviar_error(e)
+                    continue
+
+                self.conteo_cuadros += 1
+                duracion = time.perf_counter() - inicio
+                self.metricas.registrar_cuadro(resultado.rostro_detectado, resultado.tiempos, duracion)
+                if resultado.nivel_calidad:
+                    self.metricas.calidad_reducida += 1
+                self.observar_latencia(duracion)
+                self.metricas.bytes_enviados += await self.enviar_resultado(resultado)
+
+                # Logging cada 30 cuadros
+                if self.conteo_cuadros % 30 == 0:
+                    logger.info(
+                        f"Cuadros procesados: {self.conteo_cuadros} "
+                        f"(descartados: {self.buzon.descartados})"
+                    )
+        except WebSocketDisconnect:
+            pass
+        finally:
+            tarea_recepcion.cancel()
+            try:
+                await tarea_recepcion
+            except (asyncio.CancelledError, Exception):
+                pass
+            # antes de esperar al ejecutor: si la tarea se cancela ahí, la sesión ya no cuenta como activa
+            registro_metricas.retirar(self.metricas)
+            control_admision.liberar(presupuesto, self.con_motor)
+            await self.ejecutor.cerrar_sesion(id_sesion)
+
+
+class SesionLandmarks(SesionMonitoreo):
+    """
+    Sesión de monitoreo con landmarks calculados en el cliente
+
+    El dispositivo ejecuta el seguimiento de rostro y manos y envía solo
+    los puntos (ver decodificar_landmarks_*): el servidor salta la
+    decodificación de la imagen y la inferencia de MediaPipe, no reserva
+    motor del pool y responde solo con el reporte y la alarma.
+    """
+
+    adaptar_calidad = False
+    con_motor = False
+
+    def presupuesto_cpu(self) -> float:
+        return settings.MONITORING_LANDMARKS_CPU_BUDGET
+
+    def interpretar_mensaje(self, mensaje: dict):
+        """
+        Obtener ((malla, manos), marca de tiempo en segundos) de un mensaje
+
+        - bytes: sobre binario con los segmentos de puntos
+        - texto JSON con "malla_rostro" o "manos": puntos como listas
+        - otro texto JSON: mensaje de control (devuelve None)
+        """
+        datos = mensaje.get("bytes")
+        if datos is not None:
+            malla_rostro, manos, marca_tiempo = decodificar_landmarks_binario(datos)
+        else:
+            contenido = json.loads(mensaje.get("text") or "null")
+            if not isinstance(contenido, dict):
+                raise ValueError("se esperaba un objeto JSON")
+            if "malla_rostro" not in contenido and "manos" not in contenido:
+                self.aplicar_control(contenido)
+                return None
+            malla_rostro, manos, marca_tiempo = decodificar_landmarks_json(contenido)
+        if marca_tiempo is None:
+            marca_tiempo = time.time()
+        return (malla_rostro, manos), marca_tiempo
+
+    async def abrir_sesion_ejecutor(self) -> str:
+        return await self.ejecutor.abrir_sesion(con_motor=self.con_motor, id_chofer=self.id_chofer, id_viaje=self.id_viaje)
+
+    async def procesar_cuadro(self, id_sesion: str, datos, marca_tiempo: float) -> ResultadoCuadro:
+        malla_rostro, manos = datos
+        return await self.ejecutor.procesar_landmarks(id_sesion, malla_rostro, manos, marca_tiempo)
@@ -0,0 +1,280 @@
+"""
+Benchmark por etapas del pipeline de somnolencia
+
+Mide por separado cada etapa del procesamiento de un cuadro, en el mismo
+orden que SistemaDeteccionSomnolencia:
+
+    decodificar_base64, decodificar_jpeg, inferencia_rostro, inferencia_manos,
+    extraccion_landmarks, procesamiento_puntos, caracteristicas,
+    visualizacion, reportes, codificar_jpeg
+
+La entrada es sintética por defecto (imagen generada y malla de 478 puntos)
+o grabada (--video / --imagen). Si en la entrada no se detecta un rostro,
+las etapas posteriores a la inferencia usan la malla sintética y la
+inferencia del rostro no llega a ejecutar el modelo de la malla: esas
+etapas (ETAPAS_ROSTRO) se miden pero no se guardan en la línea base ni se
+controlan. La entrada sintética nunca tiene un rostro detectable.
+
+Los resultados (mediana y p95 en ms por etapa) se comparan con una línea
+base JSON en benchmarks/baselines/; si la mediana de alguna etapa empeora
+más de --umbral por ciento la ejecución termina con código 1. Las líneas
+base dependen de la máquina: solo controlan las guardadas con --guardar
+--referencia en la máquina de referencia y comparadas en esa misma máquina;
+cualquier otra comparación es informativa.
+
+Uso (desde drowsiness-detecction-backend):
+    python benchmarks/bench_etapas.py [--video grabacion.mp4] [--repeticiones 200] [--umbral 20] [--guardar [--referencia]]
+"""
+import argparse
+import base64
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+# Añade la raíz del proyecto al path
+project_root = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.abspath(project_root))
+
+import cv2
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+from app.drowsiness_processor.extract_points.face_mesh.face_mesh_processor import (
+    InferenciaRostroMalla,
+    ExtractorRostroMalla
+)
+from app.drowsiness_processor.extract_points.hands.hands_processor import InferenciaManos, ExtractorManos
+from app.drowsiness_processor.data_processing.main import ProcesamientoPuntos
+from app.drowsiness_processor.drowsiness_features.processing import ProcesamientoCaracteristicasSomnolencia
+from app.drowsiness_processor.visualization.main import VisualizadorReporte
+from app.drowsiness_processor.reports.main import ReportesSomnolencia
+
+from bench_bosquejo import InfoMallaSintetica
+
+
+DIRECTORIO_BASELINES = os.path.join(os.path.dirname(__file__), "baselines")
+CALIDAD_JPEG = 80
+# etapas que solo miden el camino real con un rostro detectado en la entrada
+ETAPAS_ROSTRO = ("inferencia_rostro", "extraccion_landmarks", "procesamiento_puntos", "caracteristicas", "visualizacion")
+
+
+class InfoManosSintetica:
+    """Imita el resultado de Hands.process con dos manos de 21 puntos cerca del rostro"""
+
+    def __init__(self, semilla: int = 0):
+        generador = np.random.default_rng(semilla)
+        self.multi_hand_landmarks = []
+        for centro_x in (0.35, 0.65):
+            mano = landmark_pb2.NormalizedLandmarkList()
+            for x, y in zip(generador.normal(centro_x, 0.04, 21), generador.normal(0.45, 0.05, 21)):
+                mano.landmark.add(x=x, y=y, z=0.0)
+            self.multi_hand_landmarks.append(mano)
+
+
+def cuadros_sinteticos(ancho: int, alto: int, cantidad: int = 8) -> list:
+    # fondo con gradiente y ruido: el JPEG resultante tiene un tamaño parecido al de una cámara
+    generador = np.random.default_rng(0)
+    base = np.linspace(0, 200, ancho, dtype=np.float32)[None, :, None].repeat(alto, 0).repeat(3, 2)
+    cuadros = []
+    for _ in range(cantidad):
+        ruido = generador.normal(0, 12, (alto, ancho, 3))
+        cuadro = np.clip(base + ruido, 0, 255).astype(np.uint8)
+        cv2.ellipse(cuadro, (ancho // 2, alto // 2), (ancho // 8, alto // 4), 0, 0, 360, (150, 170, 200), -1)
+        cuadros.append(cuadro)
+    return cuadros
+
+
+def cuadros_grabados(ruta: str, cantidad: int) -> list:
+    captura = cv2.VideoCapture(ruta)
+    cuadros = []
+    while len(cuadros) < cantidad:
+        exito, cuadro = captura.read()
+        if not exito:
+            break
+        cuadros.append(cuadro)
+    captura.release()
+    if not cuadros:
+        raise SystemExit(f"❌ No se pudieron leer cuadros de {ruta}")
+    return cuadros
+
+
+def medir(funcion, entradas: list, repeticiones: int, calentamiento: int = 5) -> dict:
+    for i in range(calentamiento):
+        funcion(entradas[i % len(entradas)])
+    tiempos = np.empty(repeticiones)
+    for i in range(repeticiones):
+        entrada = entradas[i % len(entradas)]
+        inicio = time.perf_counter()
+        funcion(entrada)
+        tiempos[i] = time.perf_counter() - inicio
+    tiempos *= 1000
+    return {"mediana_ms": round(float(np.median(tiempos)), 4), "p95_ms": round(float(np.percentile(tiempos, 95)), 4)}
+
+
+def ejecutar_etapas(cuadros: list, repeticiones: int) -> dict:
+    alto, ancho, _ = cuadros[0].shape
+    jpegs = [cv2.imencode(".jpg", c, [cv2.IMWRITE_JPEG_QUALITY, CALIDAD_JPEG])[1].tobytes() for c in cuadros]
+    textos = [base64.b64encode(jpeg).decode("ascii") for jpeg in jpegs]
+
+    inferencia_rostro = InferenciaRostroMalla()
+    inferencia_manos = InferenciaManos()
+    # con un rostro real en la grabación se usan sus landmarks; si no, la malla sintética
+    exito, info_rostro = inferencia_rostro.procesar(cuadros[0])
+    info_rostro = info_rostro if exito else InfoMallaSintetica()
+    exito, info_manos = inferencia_manos.procesar(cuadros[0])
+    info_manos = info_manos if exito else InfoManosSintetica()
+
+    extractor_rostro = ExtractorRostroMalla()
+    extractor_manos = ExtractorManos()
+
+    def extraer_landmarks(cuadro):
+        malla = extractor_rostro.extraer_puntos(cuadro, info_rostro)
+        puntos = {
+            "ojos": dict(extractor_rostro.obtener_puntos_ojos(malla)),
+            "boca": dict(extractor_rostro.obtener_puntos_boca(malla)),
+            "cabeza": dict(extractor_rostro.obtener_puntos_cabeza(malla)),
+        }
+        for indice, nombre in enumerate(("primera_mano", "segunda_mano")[:len(info_manos.multi_hand_landmarks)]):
+            mano = extractor_manos.extraer_puntos(cuadro, info_manos, indice)
+            puntos[nombre] = extractor_manos.obtener_puntos_mano(mano)
+        return puntos
+
+    puntos = extraer_landmarks(cuadros[0])
+    procesamiento_puntos = ProcesamientoPuntos()
+    distancias = procesamiento_puntos.principal(puntos)
+    caracteristicas = ProcesamientoCaracteristicasSomnolencia()
+    visualizador = VisualizadorReporte()
+    bosquejo = np.zeros_like(cuadros[0])
+
+    # reloj simulado a 30 fps para que los detectores avancen como en una sesión real
+    reloj = {"marca": time.time()}
+
+    def avanzar_caracteristicas(_):
+        reloj["marca"] += 1 / 30
+        return caracteristicas.principal(distancias, reloj["marca"])
+
+    datos_reporte = avanzar_caracteristicas(None)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        reportes = ReportesSomnolencia(os.path.join(directorio, "reporte.csv"))
+
+        def generar_reportes(_):
+            reportes.principal(datos_reporte, reloj["marca"])
+            return reportes.generar_reporte_json(datos_reporte, reloj["marca"])
+
+        etapas = [
+            ("decodificar_base64", base64.b64decode, textos),
+            ("decodificar_jpeg", lambda jpeg: cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR), jpegs),
+            ("inferencia_rostro", inferencia_rostro.procesar, cuadros),
+            ("inferencia_manos", inferencia_manos.procesar, cuadros),
+            ("extraccion_landmarks", extraer_landmarks, cuadros),
+            ("procesamiento_puntos", procesamiento_puntos.principal, [puntos]),
+            ("caracteristicas", avanzar_caracteristicas, [None]),
+            ("visualizacion", lambda _: visualizador.visualizar_todos_reportes(bosquejo, datos_reporte, reloj["marca"]), [None]),
+            ("reportes", generar_reportes, [None]),
+            ("codificar_jpeg", lambda c: cv2.imencode(".jpg", c, [cv2.IMWRITE_JPEG_QUALITY, CALIDAD_JPEG]), cuadros),
+        ]
+        resultados = {}
+        for nombre, funcion, entradas in etapas:
+            resultados[nombre] = medir(funcion, entradas, repeticiones)
+            print(f"  {nombre:<22} mediana {resultados[nombre]['mediana_ms']:>9.4f} ms   "
+                  f"p95 {resultados[nombre]['p95_ms']:>9.4f} ms")
+    return {
+        "entrada": {"ancho": ancho, "alto": alto, "rostro_detectado": not isinstance(info_rostro, InfoMallaSintetica)},
+        "maquina": {"plataforma": platform.platform(), "procesador": platform.processor() or platform.machine(),
+                    "python": platform.python_version(), "opencv": cv2.__version__},
+        "repeticiones": repeticiones,
+        "etapas": resultados,
+    }
+
+
+def etapas_controladas(resultados: dict) -> dict:
+    # sin rostro detectado las etapas del rostro no miden el camino real
+    if resultados["entrada"]["rostro_detectado"]:
+        return resultados["etapas"]
+    return {nombre: medida for nombre, medida in resultados["etapas"].items() if nombre not in ETAPAS_ROSTRO}
+
+
+def comparar(actual: dict, base: dict, umbral: float, minimo_ms: float) -> list:
+    # regresión: la mediana sube más del umbral y además más de minimo_ms (ruido en etapas muy cortas)
+    regresiones = []
+    for nombre, medida in etapas_controladas(actual).items():
+        if nombre not in base["etapas"]:
+            continue
+        anterior = base["etapas"][nombre]["mediana_ms"]
+        nueva = medida["mediana_ms"]
+        cambio = (nueva - anterior) / anterior * 100 if anterior > 0 else 0.0
+        marca = ""
+        if cambio > umbral and nueva - anterior > minimo_ms:
+            regresiones.append(nombre)
+            marca = "  ❌ regresión"
+        print(f"  {nombre:<22} {anterior:>9.4f} -> {nueva:>9.4f} ms ({cambio:+.1f}%){marca}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark por etapas del pipeline de somnolencia")
+    entrada = parser.add_mutually_exclusive_group()
+    entrada.add_argument("--video", help="Video grabado (se usan los primeros --cuadros cuadros)")
+    entrada.add_argument("--imagen", help="Imagen grabada")
+    parser.add_argument("--cuadros", type=int, default=30)
+    parser.add_argument("--ancho", type=int, default=640)
+    parser.add_argument("--alto", type=int, default=480)
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--umbral", type=float, default=20.0, help="Porcentaje de empeoramiento tolerado")
+    parser.add_argument("--minimo-ms", type=float, default=0.01, help="Empeoramiento absoluto mínimo para fallar")
+    parser.add_argument("--baseline", help="Archivo de línea base (por defecto según la entrada)")
+    parser.add_argument("--guardar", action="store_true", help="Guardar los resultados como nueva línea base")
+    parser.add_argument("--referencia", action="store_true",
+                        help="Con --guardar: la línea base es de la máquina de referencia y controla las regresiones")
+    args = parser.parse_args()
+
+    if args.video:
+        cuadros, nombre_entrada = cuadros_grabados(args.video, args.cuadros), os.path.splitext(os.path.basename(args.video))[0]
+    elif args.imagen:
+        imagen = cv2.imread(args.imagen)
+        if imagen is None:
+            raise SystemExit(f"❌ No se pudo leer {args.imagen}")
+        cuadros, nombre_entrada = [imagen], os.path.splitext(os.path.basename(args.imagen))[0]
+    else:
+        cuadros, nombre_entrada = cuadros_sinteticos(args.ancho, args.alto), "sintetica"
+    ruta_base = args.baseline or os.path.join(DIRECTORIO_BASELINES, f"etapas_{nombre_entrada}.json")
+
+    print(f"Entrada: {nombre_entrada} ({cuadros[0].shape[1]}x{cuadros[0].shape[0]}), repeticiones: {args.repeticiones}")
+    actual = ejecutar_etapas(cuadros, args.repeticiones)
+
+    if args.guardar:
+        base = {**actual, "referencia": args.referencia, "etapas": etapas_controladas(actual)}
+        os.makedirs(os.path.dirname(os.path.abspath(ruta_base)), exist_ok=True)
+        with open(ruta_base, "w") as archivo:
+            json.dump(base, archivo, indent=2, ensure_ascii=False)
+            archivo.write("\n")
+        if not actual["entrada"]["rostro_detectado"]:
+            print(f"⚠️  Sin rostro en la entrada: no se guardan {', '.join(ETAPAS_ROSTRO)}")
+        print(f"✅ Línea base guardada en {ruta_base}" + ("" if args.referencia else " (informativa)"))
+        return
+
+    if not os.path.exists(ruta_base):
+        print(f"⚠️  Sin línea base en {ruta_base}; créala con --guardar")
+        return
+    with open(ruta_base) as archivo:
+        base = json.load(archivo)
+    print(f"Comparación con {ruta_base} (umbral {args.umbral:.0f}%):")
+    if not actual["entrada"]["rostro_detectado"]:
+        print(f"  sin rostro en la entrada: no se controlan {', '.join(ETAPAS_ROSTRO)}")
+    regresiones = comparar(actual, base, args.umbral, args.minimo_ms)
+    if not base.get("referencia", False) or base.get("maquina") != actual["maquina"]:
+        # los tiempos de otra máquina (o de una línea base de desarrollo) no sirven para fallar
+        print("⚠️  La línea base no es de referencia para esta máquina: comparación informativa")
+        return
+    if regresiones:
+        print(f"❌ Regresión en: {', '.join(regresiones)}")
+        sys.exit(1)
+    print("✅ Sin regresiones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Tests de la persistencia de eventos de somnolencia
+
+Recorren el camino detector -> fila del reporte -> registros_eventos ->
+SumideroBaseDatos sobre una base SQLite en memoria.
+
+Ejecutar desde drowsiness-detecction-backend:
+    python -m pytest test/test_eventos_somnolencia.py
+"""
+import os
+from datetime import datetime, timezone
+
+# la configuración exige estas variables; los tests no se conectan a PostgreSQL
+for variable, valor in {"DB_HOST": "localhost", "DB_USER": "test", "DB_PASSWORD": "test",
+                        "DB_NAME": "test", "SECRET_KEY": "test"}.items():
+    os.environ.setdefault(variable, valor)
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models.base  # noqa: F401  registra las tablas referenciadas por las claves foráneas
+from app.drowsiness_processor.drowsiness_features.flicker_and_microsleep.processing import EstimadorParpadeos
+from app.drowsiness_processor.drowsiness_features.yawn.processing import EstimadorBostezo
+from app.drowsiness_processor.reports.event_writer import SumideroBaseDatos
+from app.drowsiness_processor.reports.main import ReportesSomnolencia
+from app.models.evento_somnolencia import EventoSomnolencia
+from app.services.monitoring_events import registros_eventos
+
+CUADROS_POR_SEGUNDO = 30
+OJOS_ABIERTOS = {
+    "distancia_parpado_superior_derecho": 10, "distancia_parpado_inferior_derecho": 5,
+    "distancia_parpado_superior_izquierdo": 10, "distancia_parpado_inferior_izquierdo": 5,
+}
+OJOS_CERRADOS = {
+    "distancia_parpado_superior_derecho": 2, "distancia_parpado_inferior_derecho": 5,
+    "distancia_parpado_superior_izquierdo": 2, "distancia_parpado_inferior_izquierdo": 5,
+}
+BOCA_CERRADA = {"distancia_labios": 1, "distancia_menton": 5}
+BOCA_ABIERTA = {"distancia_labios": 9, "distancia_menton": 5}
+INICIO = 1_700_000_000
+
+
+@pytest.fixture
+def fabrica_sesiones():
+    """Sesiones sobre una única conexión SQLite en memoria (compartida entre hilos)"""
+    motor = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    EventoSomnolencia.__table__.create(motor)
+    yield sessionmaker(bind=motor)
+    motor.dispose()
+
+
+def eventos_guardados(fabrica_sesiones):
+    with fabrica_sesiones() as sesion:
+        return sesion.execute(select(EventoSomnolencia.__table__)).mappings().all()
+
+
+def test_ventana_de_parpadeos_guarda_eventos_parpadeo(fabrica_sesiones):
+    """Al cerrar la ventana de 60 s los parpadeos contados llegan a eventos_somnolencia"""
+    estimador = EstimadorParpadeos()
+    reportes = ReportesSomnolencia(id_sesion="sesion", id_chofer=7, id_viaje=3)
+    sumidero = SumideroBaseDatos(fabrica_sesiones, EventoSomnolencia.__table__, registros_eventos)
+    filas = []
+    # un parpadeo (3 cuadros con los ojos cerrados) por segundo durante algo más de un minuto
+    for cuadro in range(61 * CUADROS_POR_SEGUNDO + 1):
+        marca_tiempo = INICIO + cuadro / CUADROS_POR_SEGUNDO
+        ojos = OJOS_CERRADOS if cuadro % CUADROS_POR_SEGUNDO < 3 else OJOS_ABIERTOS
+        resultado = estimador.procesar(ojos, marca_tiempo)
+        if resultado["reporte_parpadeo"]:
+            filas.append(reportes.crear_fila({"parpadeo_y_microsueno": resultado}, marca_tiempo))
+
+    assert len(filas) == 1
+    assert filas[0]["conteo_parpadeo"] > 0
+    sumidero.escribir(filas)
+
+    guardados = eventos_guardados(fabrica_sesiones)
+    # un registro por parpadeo, no uno por ventana
+    assert len(guardados) == filas[0]["conteo_parpadeo"]
+    assert {evento["tipo"] for evento in guardados} == {"parpadeo"}
+    assert all(evento["id_chofer"] == 7 and evento["id_viaje"] == 3 for evento in guardados)
+    assert all(evento["duracion_segundos"] is None for evento in guardados)
+    assert len({evento["marca_tiempo"] for evento in guardados}) == len(guardados)
+
+
+def test_dos_bostezos_en_una_ventana_guardan_dos_eventos(fabrica_sesiones):
+    """Cada bostezo de la ventana de 3 minutos se guarda con su hora y su duración"""
+    estimador = EstimadorBostezo()
+    reportes = ReportesSomnolencia(id_sesion="sesion", id_chofer=7)
+    sumidero = SumideroBaseDatos(fabrica_sesiones, EventoSomnolencia.__table__, registros_eventos)
+    # bostezos de 6 s (segundos 10-16) y 8 s (segundos 60-68)
+    bostezos = [(10, 16), (60, 68)]
+    filas = []
+    for cuadro in range(181 * CUADROS_POR_SEGUNDO + 1):
+        segundo = cuadro / CUADROS_POR_SEGUNDO
+        boca = BOCA_ABIERTA if any(inicio <= segundo < fin for inicio, fin in bostezos) else BOCA_CERRADA
+        resultado = estimador.procesar(boca, INICIO + segundo)
+        if resultado["reporte_bostezo"]:
+            filas.append(reportes.crear_fila({"bostezo": resultado}, INICIO + segundo))
+
+    assert len(filas) == 1
+    assert filas[0]["conteo_bostezo"] == 2
+    sumidero.escribir(filas)
+
+    guardados = sorted(eventos_guardados(fabrica_sesiones), key=lambda evento: evento["conteo"])
+    assert [evento["tipo"] for evento in guardados] == ["bostezo", "bostezo"]
+    assert [evento["conteo"] for evento in guardados] == [1, 2]
+    assert [float(evento["duracion_segundos"]) for evento in guardados] == [6.0, 8.0]
+    assert [evento["marca_tiempo"].replace(tzinfo=None) for evento in guardados] == [
+        datetime.fromtimestamp(INICIO + fin, tz=timezone.utc).replace(tzinfo=None) for _, fin in bostezos
+    ]
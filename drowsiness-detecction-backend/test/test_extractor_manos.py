@@ -0,0 +1,89 @@
+"""
+Tests de la extracción de manos en cuadros sin inferencia
+
+El planificador de manos omite la inferencia en algunos cuadros; en ellos
+el extractor reutiliza las últimas manos detectadas (hasta
+EDAD_MAXIMA_MANOS cuadros) para que un frotamiento de ojos no se corte.
+
+Ejecutar desde drowsiness-detecction-backend:
+    python -m pytest test/test_extractor_manos.py
+"""
+import numpy as np
+
+from app.drowsiness_processor.data_processing.main import ProcesamientoPuntos
+from app.drowsiness_processor.drowsiness_features.eye_rub.processing import EstimadorFrotamientoOjos
+from app.drowsiness_processor.extract_points.hands.hands_scheduler import PlanificadorManos
+from app.drowsiness_processor.extract_points.point_extractor import ExtractorPuntos
+
+CUADROS_POR_SEGUNDO = 30
+INICIO = 1_700_000_000
+IMAGEN = np.zeros((240, 320, 3), dtype=np.uint8)
+# iris en (100, 100) y (160, 100): 60 px entre ojos
+PUNTOS_ROSTRO = {
+    'ojos': {'distancias': np.array([[100, 90], [100, 95], [160, 90], [160, 95], [100, 105], [100, 110],
+                                     [160, 105], [160, 110], [100, 100], [160, 100]], dtype=np.float32)},
+    'boca': {'distancias': np.array([[130, 150], [130, 152], [130, 140], [130, 170]], dtype=np.float32)},
+    'cabeza': {'distancias': np.array([[130, 120], [130, 150], [130, 120], [130, 60],
+                                       [130, 120], [90, 120], [170, 120]], dtype=np.float32)},
+}
+# dedos sobre el ojo derecho
+MANO_EN_OJO = {'primera_mano': {'distancias': np.full((5, 2), 100, dtype=np.float32)}}
+
+
+class PlanificadorCadaTres(PlanificadorManos):
+    """Infiere manos solo uno de cada tres cuadros, haya o no manos"""
+
+    def __init__(self):
+        super().__init__()
+        self.cuadro = 0
+
+    def debe_inferir(self, imagen, malla, indices_ojos) -> bool:
+        self.cuadro += 1
+        return self.cuadro % 3 == 1
+
+
+def crear_extractor(frotando):
+    extractor = ExtractorPuntos(planificador_manos=PlanificadorCadaTres())
+    # sin MediaPipe: rostro siempre detectado y manos según el cuadro
+    extractor.motor = object()
+    extractor.malla_rostro.puntos_malla = np.zeros((478, 3), dtype=np.float32)
+    extractor.procesar_rostro = lambda imagen, dibujar: (dict(PUNTOS_ROSTRO), True, None, None)
+
+    def procesar_manos(imagen, bosquejo, dibujar=False, region=None, resultado_inferencia=None):
+        if frotando():
+            return MANO_EN_OJO, True, bosquejo
+        return {}, False, bosquejo
+
+    extractor.manos.procesar = procesar_manos
+    return extractor
+
+
+def test_frotamiento_continua_en_cuadros_sin_inferencia_de_manos():
+    """Un frotamiento de 3 s cuenta una vez aunque dos de cada tres cuadros no infieran manos"""
+    cuadro_actual = 0
+    # la mano frota el ojo derecho entre los segundos 1 y 4
+    extractor = crear_extractor(lambda: CUADROS_POR_SEGUNDO <= cuadro_actual < 4 * CUADROS_POR_SEGUNDO)
+    procesamiento = ProcesamientoPuntos()
+    estimador = EstimadorFrotamientoOjos()
+    manos_por_cuadro = []
+    for cuadro_actual in range(6 * CUADROS_POR_SEGUNDO):
+        puntos, exito, _ = extractor.procesar(IMAGEN, dibujar=False)
+        assert exito
+        manos_por_cuadro.append('primera_mano' in puntos)
+        distancias = procesamiento.principal(puntos)
+        estimador.procesar(distancias.get('primera_mano', {}), INICIO + cuadro_actual / CUADROS_POR_SEGUNDO)
+
+    # manos en todos los cuadros del frotamiento, también en los que no se infirieron
+    assert all(manos_por_cuadro[CUADROS_POR_SEGUNDO:4 * CUADROS_POR_SEGUNDO])
+    contador = estimador.contador_frotamiento_ojos_derecho
+    assert contador.conteo_frotamiento_ojos == 1
+    assert contador.historial_frotamiento_ojos.eventos[0][2] == 3.0
+
+
+def test_manos_retenidas_caducan():
+    """Sin nuevas detecciones las manos retenidas dejan de usarse tras EDAD_MAXIMA_MANOS cuadros"""
+    extractor = crear_extractor(lambda: False)
+    extractor.registrar_manos(MANO_EN_OJO, True)
+    reutilizadas = [extractor.reutilizar_manos()[1] for _ in range(ExtractorPuntos.EDAD_MAXIMA_MANOS + 2)]
+    assert reutilizadas == [True] * ExtractorPuntos.EDAD_MAXIMA_MANOS + [False, False]
+    assert extractor.manos_recientes is None
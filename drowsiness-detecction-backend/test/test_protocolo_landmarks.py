@@ -0,0 +1,40 @@
+"""
+Tests de la lectura de mensajes de landmarks del cliente
+
+Un mensaje mal formado debe fallar con ValueError: la sesión lo descarta
+y sigue recibiendo (cualquier otra excepción cierra la sesión).
+
+Ejecutar desde drowsiness-detecction-backend:
+    python -m pytest test/test_protocolo_landmarks.py
+"""
+import pytest
+
+from app.services.monitoring_protocol import (
+    SEGMENTO_METADATOS,
+    decodificar_landmarks_binario,
+    decodificar_landmarks_json,
+    empaquetar_sobre
+)
+
+
+def sobre_con_metadatos(metadatos: bytes) -> bytes:
+    return bytes(empaquetar_sobre([(SEGMENTO_METADATOS, metadatos)]))
+
+
+@pytest.mark.parametrize("metadatos", [
+    b"[]", b"1", b'"x"', b"null",
+    b'{"marca_tiempo": "abc"}', b'{"marca_tiempo": [1]}', b'{"marca_tiempo": "nan"}',
+])
+def test_metadatos_invalidos_dan_value_error(metadatos):
+    with pytest.raises(ValueError):
+        decodificar_landmarks_binario(sobre_con_metadatos(metadatos))
+
+
+def test_marca_tiempo_en_milisegundos():
+    _, _, marca_tiempo = decodificar_landmarks_binario(sobre_con_metadatos(b'{"marca_tiempo": 1500}'))
+    assert marca_tiempo == 1.5
+
+
+def test_marca_tiempo_no_numerica_en_json_da_value_error():
+    with pytest.raises(ValueError):
+        decodificar_landmarks_json({"malla_rostro": [], "marca_tiempo": {"ms": 1}})
@@ -0,0 +1,80 @@
+"""
+Tests de la identificación del chofer en los WebSocket de monitoreo
+
+Solo el token de un chofer activo, no invalidado, identifica la sesión;
+en otro caso la sesión es anónima y sus eventos no llevan id_chofer.
+
+Ejecutar desde drowsiness-detecction-backend:
+    python -m pytest test/test_websocket_chofer.py
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+# la configuración exige estas variables; los tests no se conectan a PostgreSQL
+for variable, valor in {"DB_HOST": "localhost", "DB_USER": "test", "DB_PASSWORD": "test",
+                        "DB_NAME": "test", "SECRET_KEY": "test"}.items():
+    os.environ.setdefault(variable, valor)
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models.base  # noqa: F401  registra las tablas referenciadas por las claves foráneas
+from app.api.deps import get_websocket_user_id
+from app.core.security import create_access_token
+from app.crud.token_blacklist import token_blacklist
+from app.models.token_blacklist import TokenBlacklist
+from app.models.user import Usuario
+
+
+@pytest.fixture
+def db():
+    """Sesión sobre una única conexión SQLite en memoria con un chofer, un admin y un chofer inactivo"""
+    motor = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Usuario.__table__.create(motor)
+    TokenBlacklist.__table__.create(motor)
+    sesion = sessionmaker(bind=motor)()
+    for id_usuario, rol, activo in ((1, "chofer", True), (2, "admin", True), (3, "chofer", False)):
+        sesion.add(Usuario(id_usuario=id_usuario, usuario=f"usuario{id_usuario}", password_hash="x", rol=rol,
+                           nombre_completo=f"Usuario {id_usuario}", email=f"usuario{id_usuario}@test.com",
+                           activo=activo, primer_inicio=False))
+    sesion.commit()
+    yield sesion
+    sesion.close()
+    motor.dispose()
+
+
+def token_de(id_usuario: int, rol: str = "chofer") -> str:
+    return create_access_token(data={"sub": str(id_usuario), "rol": rol})
+
+
+def identificar(token, db):
+    return asyncio.run(get_websocket_user_id(token, db))
+
+
+def test_chofer_activo_identifica_la_sesion(db):
+    assert identificar(token_de(1), db) == 1
+
+
+def test_token_invalidado_es_anonimo(db):
+    token = token_de(1)
+    token_blacklist.add_token(db, token=token, id_usuario=1, fecha_expiracion=datetime.utcnow() + timedelta(hours=1))
+    assert identificar(token, db) is None
+
+
+@pytest.mark.parametrize("id_usuario", [2, 3, 99])
+def test_admin_inactivo_o_inexistente_es_anonimo(db, id_usuario):
+    assert identificar(token_de(id_usuario), db) is None
+
+
+def test_sin_token_o_invalido_es_anonimo(db):
+    assert identificar(None, db) is None
+    assert identificar("no-es-un-jwt", db) is None
+
+
+def test_error_de_bd_es_anonimo(db):
+    # la consulta del usuario falla: la sesión sigue, anónima
+    Usuario.__table__.drop(db.get_bind())
+    assert identificar(token_de(1), db) is None
@@ -1,10 +1,24 @@
 import { useEffect, useRef, useState, useCallback } from 'react';
 import { storage } from '../../../lib/utils/storage';
 import { TOKEN_KEY } from '../../../lib/constants';
-import type { WebSocketResponse } from '../types';
+import type { ReporteSomnolencia, WebSocketMensaje, WebSocketResponse } from '../types';
 
 const WS_URL = import.meta.env.VITE_API_URL.replace('http', 'ws') + '/api/v1/monitoring/ws';
 
+// Combina un mensaje delta con el estado anterior: el reporte y la alarma
+// se conservan hasta que el servidor envía un cambio
+const combinarMensaje = (
+    anterior: WebSocketResponse | null,
+    mensaje: WebSocketMensaje
+): WebSocketResponse => {
+    const reporteBase = mensaje.tipo === 'instantanea' ? undefined : anterior?.reporte_json;
+    return {
+        ...mensaje,
+        reporte_json: { ...reporteBase, ...mensaje.reporte_json } as ReporteSomnolencia,
+        alarma: mensaje.alarma ?? anterior?.alarma,
+    };
+};
+
 export const useWebSocket = () => {
     const [isConnected, setIsConnected] = useState(false);
     const [error, setError] = useState<string | null>(null);
@@ -37,8 +51,8 @@ export const useWebSocket = () => {
 
             wsRef.current.onmessage = (event) => {
                 try {
-                    const data: WebSocketResponse = JSON.parse(event.data);
-                    setLastMessage(data);
+                    const data: WebSocketMensaje = JSON.parse(event.data);
+                    setLastMessage((anterior) => combinarMensaje(anterior, data));
 
                     if (data.error) {
                         console.error('Error del servidor:', data.error);
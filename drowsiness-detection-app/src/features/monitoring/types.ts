@@ -1,14 +1,24 @@
+// Agregados de todo el viaje; las duraciones solo traen los últimos eventos
+export interface ResumenEventos {
+    total: number;
+    suma: number;
+    maximo: number;
+    p95: number;
+}
+
 export interface ReporteSomnolencia {
     marca_tiempo: string;
     frotamiento_ojos_primera_mano: {
         reporte: boolean;
         conteo: number;
         duraciones: string[];
+        resumen?: ResumenEventos | Record<string, never>;
     };
     frotamiento_ojos_segunda_mano: {
         reporte: boolean;
         conteo: number;
         duraciones: string[];
+        resumen?: ResumenEventos | Record<string, never>;
     };
     parpadeo: {
         reporte: boolean;
@@ -18,26 +28,40 @@ export interface ReporteSomnolencia {
         reporte: boolean;
         conteo: number;
         duraciones: string[];
+        resumen?: ResumenEventos | Record<string, never>;
     };
     inclinacion: {
         reporte: boolean;
         conteo: number;
         duraciones: string[];
+        resumen?: ResumenEventos | Record<string, never>;
     };
     bostezo: {
         reporte: boolean;
         conteo: number;
         duraciones: string[];
+        resumen?: ResumenEventos | Record<string, never>;
     };
 }
 
+// En modo delta el servidor envía el reporte completo en la "instantanea"
+// y después solo las secciones que cambian; "keepalive" no trae reporte.
+export type TipoMensaje = 'instantanea' | 'delta' | 'keepalive';
+
 export interface WebSocketResponse {
+    tipo?: TipoMensaje;
     reporte_json: ReporteSomnolencia;
+    alarma?: boolean;
     imagen_bosquejo: string;
     imagen_original: string;
     error?: string;
 }
 
+// Mensaje tal como llega del servidor, antes de combinarlo con el anterior
+export type WebSocketMensaje = Omit<WebSocketResponse, 'reporte_json'> & {
+    reporte_json?: Partial<ReporteSomnolencia>;
+};
+
 export interface ConfiguracionCamara {
     with: number;
     height: number;